@@ -0,0 +1,82 @@
+import threading
+
+import pygame
+from pygame import mixer
+
+# Background asset loading. Sounds, music and images (sprite sheets) are
+# queued with add_*() and decoded on a worker thread once start() is called,
+# so the splash screen keeps animating while they load. The game asks for an
+# asset with get(), which returns None until it is ready or if it failed to
+# load; nothing waits for loading to finish.
+class AssetLoader:
+    def __init__(self):
+        self.queue = []    # (name, loader function, path, volume)
+        self.assets = {}
+        self.failed = {}   # Name -> error message
+        self.loaded = 0
+        self.audio = False
+        self.thread = None
+
+    def add_sound(self, name, path, volume=1.0):
+        self.queue.append((name, self.load_sound, path, volume))
+
+    def add_music(self, name, path, volume=1.0):
+        # Only one music track can be loaded at a time; get(name) returns the
+        # volume to play it at once it is
+        self.queue.append((name, self.load_music, path, volume))
+
+    def add_image(self, name, path):
+        self.queue.append((name, self.load_image, path, None))
+
+    def start(self):
+        # The mixer is opened here, on the caller's thread
+        try:
+            if not mixer.get_init():
+                mixer.init()
+            self.audio = True
+        except pygame.error as e:
+            print(f"Audio unavailable ({e}). Game will run without audio.")
+        self.thread = threading.Thread(target=self.run, name="assets", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        for name, load, path, volume in self.queue:
+            try:
+                self.assets[name] = load(path, volume)
+            except (pygame.error, FileNotFoundError) as e:
+                self.failed[name] = str(e)
+            self.loaded += 1
+        if self.failed:
+            print(f"Could not load {', '.join(self.failed)}. Game will run without them.")
+
+    def load_sound(self, path, volume):
+        if not self.audio:
+            raise pygame.error("no audio")
+        sound = mixer.Sound(path)
+        sound.set_volume(volume)
+        return sound
+
+    def load_music(self, path, volume):
+        if not self.audio:
+            raise pygame.error("no audio")
+        mixer.music.load(path)
+        return volume
+
+    def load_image(self, path, volume):
+        image = pygame.image.load(path)
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha()
+        return image
+
+    def get(self, name):
+        return self.assets.get(name)
+
+    def ready(self, name):
+        return name in self.assets
+
+    def progress(self):
+        # Fraction of the queued assets that are done loading (or failed)
+        return self.loaded / len(self.queue) if self.queue else 1.0
+
+    def finished(self):
+        return self.loaded == len(self.queue)
@@ -0,0 +1,183 @@
+import argparse
+import csv
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import rng
+from constants import ISLANDS
+from world import World
+
+# Batch runs of seeded headless games, for balance and regression sweeps:
+#   python batch_sim.py [--games N] [--difficulty EASY MEDIUM HARD]
+#                       [--workers N] [--max-frames N] [--output FILE]
+# Each game is played by the AutoPlayer below on a headless World, in a pool
+# of worker processes. Game i of every difficulty uses seed --seed + i, so the
+# difficulties are compared on the same seeds and a run is reproducible. One
+# CSV row per game is written as results come in, in job order, and a
+# summary per difficulty is printed (and written with --summary FILE).
+#
+# Per game the CSV has the score, the frames survived (capped at
+# --max-frames, 60 per second), the frame each island's boss was first
+# defeated and the frame each crew member was unlocked; those are empty when
+# it never happened.
+
+MAX_FRAMES = 60 * 60 * 10  # Ten minutes of play
+DIFFICULTIES = ["EASY", "MEDIUM", "HARD"]
+
+class AutoPlayer:
+    # Scripted player: fires Gear Second whenever it is off cooldown and
+    # otherwise punches the nearest pirate, or the boss once the pirates are
+    # gone. It never moves (Luffy stays in the middle of the screen) and
+    # doesn't use crew abilities.
+    def inputs(self, world):
+        luffy = world.luffy
+        if luffy.special_cooldown <= 0:
+            return {'gear_second': True}
+        if luffy.cooldown > 0:
+            return None
+
+        target = None
+        best = None
+        for pirate in world.pirates:
+            distance = (pirate.x - luffy.x) ** 2 + (pirate.y - luffy.y) ** 2
+            if best is None or distance < best:
+                target, best = pirate, distance
+        if target is None and world.boss_battle and world.boss and not world.boss.defeated:
+            target = world.boss
+        if target is None:
+            return None
+        return {'punch': (target.x, target.y)}
+
+def slug(name):
+    return name.lower().replace(' ', '_')
+
+def columns():
+    crew = [member.name for member in World().crew_members]
+    return (['difficulty', 'seed', 'score', 'frames', 'game_over', 'bosses_defeated']
+            + [f"boss_{slug(island)}" for island in ISLANDS]
+            + [f"unlock_{slug(name)}" for name in crew])
+
+def play_game(difficulty, seed, max_frames=MAX_FRAMES, swarm=False):
+    # Play one game and return its CSV row as a dict
+    rng.seed(seed)
+    world = World(difficulty, swarm=swarm)
+    player = AutoPlayer()
+    row = {'difficulty': difficulty, 'seed': seed}
+    bosses_defeated = 0
+    last_boss = None
+    locked = [member for member in world.crew_members if not member.unlocked]
+
+    while world.frame < max_frames and not world.game_over:
+        world.step(player.inputs(world))
+
+        boss = world.boss
+        if boss is not None and boss is not last_boss and boss.defeated:
+            last_boss = boss
+            bosses_defeated += 1
+            row.setdefault(f"boss_{slug(world.islands[world.current_island])}", world.frame)
+
+        if any(member.unlocked for member in locked):
+            for member in locked:
+                if member.unlocked:
+                    row[f"unlock_{slug(member.name)}"] = world.frame
+            locked = [member for member in locked if not member.unlocked]
+
+    row.update(score=world.score, frames=world.frame, game_over=int(world.game_over),
+               bosses_defeated=bosses_defeated)
+    return row
+
+def run_job(job):
+    return play_game(*job)
+
+def summarize(rows, fields):
+    # One summary dict per difficulty, in the order they were played
+    by_difficulty = {}
+    for row in rows:
+        by_difficulty.setdefault(row['difficulty'], []).append(row)
+
+    summaries = []
+    for difficulty, games in by_difficulty.items():
+        scores = [game['score'] for game in games]
+        frames = [game['frames'] for game in games]
+        summary = {
+            'difficulty': difficulty,
+            'games': len(games),
+            'score_mean': round(statistics.mean(scores), 2),
+            'score_median': statistics.median(scores),
+            'score_max': max(scores),
+            'frames_mean': round(statistics.mean(frames), 1),
+            'frames_median': statistics.median(frames),
+            'game_over_rate': round(sum(game['game_over'] for game in games) / len(games), 3),
+            'bosses_mean': round(statistics.mean(game['bosses_defeated'] for game in games), 2),
+        }
+        # Mean frame of each milestone over the games that reached it
+        for column in fields:
+            if column.startswith(('boss_', 'unlock_')):
+                reached = [game[column] for game in games if game.get(column) is not None]
+                summary[f"{column}_rate"] = round(len(reached) / len(games), 3)
+                summary[f"{column}_mean"] = round(statistics.mean(reached), 1) if reached else None
+        summaries.append(summary)
+    return summaries
+
+def print_summary(summaries):
+    print(f"{'difficulty':<11}{'games':>7}{'score mean':>12}{'median':>8}{'max':>6}"
+          f"{'frames mean':>13}{'game over':>11}{'bosses':>8}")
+    for s in summaries:
+        print(f"{s['difficulty']:<11}{s['games']:>7}{s['score_mean']:>12.2f}{s['score_median']:>8}"
+              f"{s['score_max']:>6}{s['frames_mean']:>13.1f}{s['game_over_rate']:>10.0%}{s['bosses_mean']:>8.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many seeded headless games in parallel")
+    parser.add_argument('--games', type=int, default=1000,
+                        help="games per difficulty")
+    parser.add_argument('--difficulty', nargs='+', choices=DIFFICULTIES, default=DIFFICULTIES)
+    parser.add_argument('--seed', type=int, default=0,
+                        help="seed of the first game; game i uses seed + i")
+    parser.add_argument('--max-frames', type=int, default=MAX_FRAMES,
+                        help="stop a game that is still going after this many frames")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument('--swarm', action='store_true',
+                        help="store pirates in NumPy arrays")
+    parser.add_argument('--output', default='batch_results.csv',
+                        help="CSV file for the per-game results")
+    parser.add_argument('--summary', metavar='FILE',
+                        help="also write the per-difficulty summary as CSV")
+    args = parser.parse_args()
+
+    jobs = [(difficulty, args.seed + i, args.max_frames, args.swarm)
+            for difficulty in args.difficulty for i in range(args.games)]
+    # Large chunks keep the workers busy without a round trip per game
+    chunksize = max(1, len(jobs) // (args.workers * 16))
+
+    fields = columns()
+    rows = []
+    start = time.perf_counter()
+    with open(args.output, 'w', newline='') as f, ProcessPoolExecutor(args.workers) as executor:
+        writer = csv.DictWriter(f, fields)
+        writer.writeheader()
+        for row in executor.map(run_job, jobs, chunksize=chunksize):
+            writer.writerow(row)
+            rows.append(row)
+            if len(rows) % 100 == 0:
+                f.flush()
+                print(f"{len(rows)}/{len(jobs)} games", end='\r', file=sys.stderr)
+    elapsed = time.perf_counter() - start
+
+    frames = sum(row['frames'] for row in rows)
+    print(f"Played {len(rows)} games ({frames} frames) in {elapsed:.1f}s on {args.workers} workers "
+          f"- {frames / max(elapsed, 1e-9):.0f} frames/s. Results in {args.output}")
+    summaries = summarize(rows, fields)
+    print_summary(summaries)
+
+    if args.summary:
+        with open(args.summary, 'w', newline='') as f:
+            writer = csv.DictWriter(f, list(summaries[0]))
+            writer.writeheader()
+            writer.writerows(summaries)
+
+if __name__ == "__main__":
+    main()
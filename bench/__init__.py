@@ -0,0 +1,2 @@
+# Performance benchmarks. Run a benchmark module from the repository root,
+# e.g. python -m bench.spatial_hash
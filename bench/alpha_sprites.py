@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+import rng
+import sprite_atlas
+from bosses import GroundDesiccation
+from luffy import GearSecond
+from special_attacks import DiableJambe, FireStar, WaterWave
+
+# Counts Surface allocations per frame for the translucent effects, drawing
+# every circle from scratch (as before the sprite atlas) and from the atlas:
+#   python -m bench.alpha_sprites [frames]
+
+WIDTH, HEIGHT = 800, 600
+
+class CountingSurface(pygame.Surface):
+    created = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        CountingSurface.created += 1
+
+def make_scenarios():
+    cx, cy = WIDTH // 2, HEIGHT // 2
+    return [
+        ("Gear Second", lambda: [GearSecond(cx, cy)]),
+        ("Fish-Man Karate", lambda: [WaterWave(cx, cy)]),
+        ("Diable Jambe", lambda: [DiableJambe(cx, cy)]),
+        ("Fire Star", lambda: [FireStar(cx, cy, cx + 200 * (i - 2), 0) for i in range(5)]),
+        ("Ground Desiccation", lambda: [GroundDesiccation(cx, cy)]),
+    ]
+
+def run(make_effects, frames, screen):
+    # Replay the effect, restarting it whenever it finishes
+    effects = make_effects()
+    CountingSurface.created = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        for effect in effects:
+            effect.update()
+        effects = [effect for effect in effects if effect.active] or make_effects()
+        for effect in effects:
+            effect.draw(screen)
+    elapsed = time.perf_counter() - start
+    return CountingSurface.created / frames, elapsed * 1000 / frames
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.Surface = CountingSurface
+
+    print(f"{'effect':<20}{'allocs/frame':>13}{'ms':>8}{'atlas allocs/frame':>20}{'ms':>8}")
+    for name, make_effects in make_scenarios():
+        results = []
+        for enabled in (False, True):
+            sprite_atlas.enabled = enabled
+            sprite_atlas.clear()
+            rng.seed(1234)
+            results.append(run(make_effects, frames, screen))
+        (before, before_ms), (after, after_ms) = results
+        print(f"{name:<20}{before:>13.2f}{before_ms:>8.3f}{after:>20.2f}{after_ms:>8.3f}")
+
+if __name__ == "__main__":
+    main()
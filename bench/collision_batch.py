@@ -0,0 +1,98 @@
+import math
+import random
+import sys
+import time
+
+import numpy as np
+
+import rng
+from pirates import Pirate
+from special_attacks import SwordSlash, ThunderAttack, FireStar, DiableJambe, RadicalBeam, WaterWave
+
+# Compares scalar SpecialAttack.check_collision calls with the vectorized
+# check_collision_batch kernels for each crew attack:
+#   python -m bench.collision_batch [frames]
+
+WIDTH, HEIGHT = 800, 600
+CROWD_SIZES = [10, 50, 100, 500, 2000]
+
+def make_pirates(count):
+    pirates = []
+    for _ in range(count):
+        pirate = Pirate()
+        pirate.x = random.uniform(0, WIDTH)
+        pirate.y = random.uniform(0, HEIGHT)
+        pirates.append(pirate)
+    return pirates
+
+def advance(attack, frames):
+    for _ in range(frames):
+        attack.update()
+    return attack
+
+def make_scenarios():
+    cx, cy = WIDTH // 2, HEIGHT // 2
+    three_sword_style = [advance(SwordSlash(cx, cy, cx + 400 * dx, cy + 400 * dy), 5)
+                         for dx, dy in [(1, 0), (-0.5, 0.866), (-0.5, -0.866)]]
+    return [
+        ("Three Sword Style", three_sword_style),
+        ("Radical Beam", [advance(RadicalBeam(cx, cy, 0, 0), 10)]),
+        ("Diable Jambe", [advance(DiableJambe(cx, cy), 8)]),
+        ("Fish-Man Karate", [advance(WaterWave(cx, cy), 12)]),
+        ("Fire Star", [FireStar(cx, cy, cx + 200 * (i - 2), 0) for i in range(5)]),
+        ("Thunder (10 bolts)", [ThunderAttack(random.uniform(0, WIDTH), random.uniform(0, HEIGHT))
+                                for _ in range(10)]),
+    ]
+
+def hits(attack, pirate):
+    # check_collision without the side effects of Fire Star and Fish-Man Karate
+    if isinstance(attack, FireStar):
+        distance = math.sqrt((pirate.x - attack.current_x)**2 + (pirate.y - attack.current_y)**2)
+        return distance < pirate.size + attack.radius
+    if isinstance(attack, WaterWave):
+        distance = math.sqrt((pirate.x - attack.x)**2 + (pirate.y - attack.y)**2)
+        return attack.radius - 20 < distance < attack.radius
+    return attack.check_collision(pirate)
+
+def scalar(pirates, attacks):
+    hit_count = 0
+    for pirate in pirates:
+        for attack in attacks:
+            if hits(attack, pirate):
+                hit_count += 1
+                break
+    return hit_count
+
+def batch(pirates, attacks):
+    xs = np.fromiter((pirate.x for pirate in pirates), dtype=float, count=len(pirates))
+    ys = np.fromiter((pirate.y for pirate in pirates), dtype=float, count=len(pirates))
+    sizes = np.fromiter((pirate.size for pirate in pirates), dtype=float, count=len(pirates))
+    hits = np.zeros(len(pirates), dtype=bool)
+    for attack in attacks:
+        hits |= attack.check_collision_batch(xs, ys, sizes)
+    return int(hits.sum())
+
+def time_frames(function, frames, *args):
+    start = time.perf_counter()
+    for _ in range(frames):
+        result = function(*args)
+    return (time.perf_counter() - start) * 1000 / frames, result
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    random.seed(1234)
+    rng.seed(1234)
+    scenarios = make_scenarios()
+
+    print(f"{'attack':<20}{'pirates':>8}{'scalar ms':>11}{'batch ms':>10}{'speedup':>9}")
+    for name, attacks in scenarios:
+        for count in CROWD_SIZES:
+            pirates = make_pirates(count)
+            scalar_ms, scalar_hits = time_frames(scalar, frames, pirates, attacks)
+            batch_ms, batch_hits = time_frames(batch, frames, pirates, attacks)
+            assert scalar_hits == batch_hits, f"{name}: batch kernel disagrees with check_collision"
+            print(f"{name:<20}{count:>8}{scalar_ms:>11.3f}{batch_ms:>10.3f}"
+                  f"{scalar_ms / max(batch_ms, 1e-9):>8.1f}x")
+
+if __name__ == "__main__":
+    main()
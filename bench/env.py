@@ -0,0 +1,60 @@
+import argparse
+import math
+import time
+
+import numpy as np
+
+from luffy_env import ACTION_SIZE, LuffyEnv, VectorEnv
+
+# Steps per second of the bot environments with random actions, for one
+# LuffyEnv (also with pixel observations) and for VectorEnvs of several sizes:
+#   python -m bench.env [--steps N] [--workers N]
+
+ENV_COUNTS = [8, 32, 128]
+PIXELS = (84, 84)
+PIXEL_EVERY = 4
+
+def random_actions(rand, count):
+    actions = rand.random((count, ACTION_SIZE), dtype=np.float32)
+    actions[:, 1] *= 2 * math.pi
+    return actions
+
+def bench_single(steps, rand, pixels=None):
+    env = LuffyEnv("HARD", pixels=pixels, pixel_every=PIXEL_EVERY)
+    env.reset(0)
+    actions = random_actions(rand, steps)
+    start = time.perf_counter()
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+def bench_vector(num_envs, steps, workers, rand):
+    with VectorEnv(num_envs, "HARD", workers=workers) as env:
+        env.reset(0)
+        batches = max(1, steps // num_envs)
+        actions = random_actions(rand, num_envs)
+        start = time.perf_counter()
+        for _ in range(batches):
+            env.step(actions)
+        return batches * num_envs / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure bot environment throughput")
+    parser.add_argument('--steps', type=int, default=20000,
+                        help="env steps per measurement")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="VectorEnv worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    rand = np.random.default_rng(0)
+
+    print(f"{'envs':>6}{'steps/s':>10}")
+    print(f"{'1':>6}{bench_single(args.steps, rand):>10.0f}  (LuffyEnv)")
+    print(f"{'1':>6}{bench_single(args.steps // 10, rand, PIXELS):>10.0f}  "
+          f"(LuffyEnv, {PIXELS[0]}x{PIXELS[1]} pixels every {PIXEL_EVERY} steps)")
+    for num_envs in ENV_COUNTS:
+        print(f"{num_envs:>6}{bench_vector(num_envs, args.steps, args.workers, rand):>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import tracemalloc
+
+# Start tracing before the game modules are imported, so the total heap
+# includes everything the game allocates
+tracemalloc.start()
+
+import gc
+import os
+import sys
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import rng
+import islands
+from bosses import WaterShot, SharkToothAttack, SandTornado, GroundDesiccation, ElThor, Raigo, LightningBolt
+from luffy import RubberPunch, GearSecond
+from pirates import Pirate
+from power_ups import MeatPowerUp, DevilFruitPowerUp, LogPosePowerUp, TreasurePowerUp, RumbleBallPowerUp
+from special_attacks import SwordSlash, ThunderAttack, FireStar, DiableJambe, RadicalBeam, WaterWave
+
+# Memory footprint of the game's entities, measured with tracemalloc: bytes
+# per entity of each type, and the traced heap with 1,000 live pirates plus a
+# typical mix of attacks, power-ups and island scenery:
+#   python -m bench.memory [pirates]
+# Each figure is given twice: for the entities as they are, with __slots__,
+# and for the same entities laid out with a per-instance __dict__. For that
+# layout every slotted object is copied into an unslotted class of the same
+# name that shares its attribute values, and the bytes the copies take
+# replace the bytes of the slotted objects. Records that are plain tuples
+# (the devil fruit swirl spots) are counted as tuples in both layouts.
+
+WIDTH, HEIGHT = 800, 600
+ISLANDS = [islands.EastBlue, islands.Alabasta, islands.Skypiea, islands.WaterSeven,
+           islands.ThrillerBark, islands.Marineford]
+
+def advanced(entity, frames):
+    # Some effects only fill in their particles and segments as they run
+    for _ in range(frames):
+        entity.update()
+    return entity
+
+def island_elements(island_class):
+    # The island's scenery, without baking its background surface
+    island = island_class.__new__(island_class)
+    island.width, island.height = WIDTH, HEIGHT
+    island.rand = rng.fx
+    island.elements = []
+    island.create_elements()
+    return island.elements
+
+def make_entities(pirates):
+    cx, cy = WIDTH // 2, HEIGHT // 2
+    return [
+        ("Pirate", pirates, lambda: Pirate()),
+        ("RubberPunch", 100, lambda: RubberPunch(cx, cy, 700, 100)),
+        ("GearSecond", 10, lambda: advanced(GearSecond(cx, cy), 10)),
+        ("SwordSlash", 100, lambda: SwordSlash(cx, cy, 700, 100)),
+        ("ThunderAttack", 300, lambda: ThunderAttack(cx, cy)),
+        ("FireStar", 100, lambda: advanced(FireStar(cx, cy, cx, 0), 10)),
+        ("DiableJambe", 10, lambda: advanced(DiableJambe(cx, cy), 10)),
+        ("RadicalBeam", 10, lambda: RadicalBeam(cx, cy, 700, 100)),
+        ("WaterWave", 10, lambda: WaterWave(cx, cy)),
+        ("WaterShot", 100, lambda: WaterShot(cx, cy, 700, 100)),
+        ("SharkToothAttack", 100, lambda: SharkToothAttack(cx, cy, 700, 100)),
+        ("SandTornado", 10, lambda: advanced(SandTornado(cx, cy), 10)),
+        ("GroundDesiccation", 10, lambda: advanced(GroundDesiccation(cx, cy), 10)),
+        ("ElThor", 10, lambda: advanced(ElThor(cx, cy), 10)),
+        ("Raigo", 10, lambda: advanced(Raigo(cx, cy), 10)),
+        ("LightningBolt", 100, lambda: advanced(LightningBolt(cx, cy), 20)),
+        ("MeatPowerUp", 100, lambda: MeatPowerUp(cx, cy)),
+        ("DevilFruitPowerUp", 100, lambda: DevilFruitPowerUp(cx, cy)),
+        ("LogPosePowerUp", 100, lambda: LogPosePowerUp(cx, cy)),
+        ("TreasurePowerUp", 100, lambda: TreasurePowerUp(cx, cy)),
+        ("RumbleBallPowerUp", 100, lambda: RumbleBallPowerUp(cx, cy)),
+    ]
+
+def slot_names(obj):
+    for klass in type(obj).__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+        yield from (slots,) if isinstance(slots, str) else slots
+
+def slotted_objects(value, seen):
+    # The slotted objects reachable from value through slots, lists and tuples
+    if id(value) in seen:
+        return
+    if isinstance(value, (list, tuple)):
+        seen.add(id(value))
+        for item in value:
+            yield from slotted_objects(item, seen)
+    elif hasattr(type(value), '__slots__') and not hasattr(value, '__dict__'):
+        seen.add(id(value))
+        yield value
+        for name in slot_names(value):
+            if name != '__weakref__' and hasattr(value, name):
+                yield from slotted_objects(getattr(value, name), seen)
+
+def unslotted(obj, classes):
+    # A __dict__-based copy of obj sharing its attribute values
+    copy = classes[type(obj)]()
+    for name in slot_names(obj):
+        if name != '__weakref__' and hasattr(obj, name):
+            setattr(copy, name, getattr(obj, name))
+    return copy
+
+def dict_layout_extra(entities):
+    # Bytes the entities would take on top of their slotted size if every
+    # slotted object in them had a __dict__ instead
+    objects = list(slotted_objects(entities, set()))
+    classes = {klass: type(klass.__name__, (), {}) for klass in {type(obj) for obj in objects}}
+    copies = [None] * len(objects)
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    for i, obj in enumerate(objects):
+        copies[i] = unslotted(obj, classes)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    return size - sum(sys.getsizeof(obj) for obj in objects)
+
+def measure(make, count):
+    # Bytes allocated for `count` live instances. The list holding them is
+    # allocated before measuring so it isn't counted.
+    entities = [None] * count
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        entities[i] = make()
+    gc.collect()
+    return entities, tracemalloc.get_traced_memory()[0] - before
+
+def main():
+    pirates = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rng.seed(1234)
+
+    # Everything measured stays alive, so the total below is the heap of a
+    # busy frame
+    alive = []
+    extra = 0  # Bytes the __dict__ layout adds over all entities
+
+    def report(name, count, entities, size):
+        nonlocal extra
+        alive.append(entities)
+        dict_size = size + dict_layout_extra(entities)
+        extra += dict_size - size
+        print(f"{name:<20}{count:>7}{dict_size / count:>11.0f}{size / count:>11.0f}"
+              f"{dict_size / 1024:>11.1f}{size / 1024:>11.1f}")
+
+    gc.collect()
+    start = tracemalloc.get_traced_memory()[0]
+    print(f"{'':<27}{'bytes/entity':^22}{'total KB':^22}")
+    print(f"{'entity':<20}{'count':>7}{'__dict__':>11}{'slots':>11}{'__dict__':>11}{'slots':>11}")
+    for name, count, make in make_entities(pirates):
+        report(name, count, *measure(make, count))
+
+    elements, size = measure(lambda: [element for island in ISLANDS
+                                      for element in island_elements(island)], 1)
+    report("BackgroundElement", len(elements[0]), elements, size)
+
+    gc.collect()
+    current = tracemalloc.get_traced_memory()[0]
+    entities = current - start
+    print(f"Entities: {(entities + extra) / 1024:.1f} KB with __dict__, {entities / 1024:.1f} KB with slots")
+    print(f"Traced heap with {pirates} live pirates: {(current + extra) / 1024:.1f} KB with __dict__, "
+          f"{current / 1024:.1f} KB with slots")
+
+if __name__ == "__main__":
+    main()
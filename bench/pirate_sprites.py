@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+import rng
+import pirate_sprites
+from pirates import Pirate
+
+# Time to draw a crowd of walking pirates, from primitives (as before the
+# sprite cache) and from the cache, with the number of sprites baked:
+#   python -m bench.pirate_sprites [frames]
+
+WIDTH, HEIGHT = 800, 600
+CROWDS = [50, 200, 500]
+
+def make_pirates(count):
+    # Spread over the screen, some frozen or immobilized
+    pirates = []
+    for i in range(count):
+        pirate = Pirate("HARD", score=10)
+        pirate.x = rng.sim.uniform(0, WIDTH)
+        pirate.y = rng.sim.uniform(0, HEIGHT)
+        pirate.frozen = i % 10 == 0
+        pirate.immobilized = i % 10 == 5
+        pirates.append(pirate)
+    return pirates
+
+def run(pirates, frames, screen):
+    start = time.perf_counter()
+    for _ in range(frames):
+        for pirate in pirates:
+            pirate.update()
+        screen.fill((0, 100, 200))
+        pirate_sprites.draw(screen, pirates)
+    return (time.perf_counter() - start) * 1000 / frames
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+
+    print(f"{'pirates':>8}{'shapes ms':>11}{'sprites ms':>12}{'speedup':>9}{'baked':>7}")
+    for count in CROWDS:
+        results = []
+        for enabled in (False, True):
+            pirate_sprites.enabled = enabled
+            pirate_sprites.clear()
+            pirate_sprites.stats['bakes'] = 0
+            rng.seed(1234)
+            results.append(run(make_pirates(count), frames, screen))
+        shapes_ms, sprites_ms = results
+        print(f"{count:>8}{shapes_ms:>11.3f}{sprites_ms:>12.3f}{shapes_ms / sprites_ms:>8.1f}x"
+              f"{pirate_sprites.stats['bakes']:>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import random
+import sys
+import time
+
+import rng
+from luffy import RubberPunch, GearSecond
+from pirates import Pirate
+from special_attacks import SwordSlash, ThunderAttack, DiableJambe, RadicalBeam
+from spatial_hash import SpatialHash
+
+# Compares brute-force pirate-vs-attack collision detection with the spatial
+# hash broad phase, at growing crowd sizes:
+#   python -m bench.spatial_hash [frames]
+
+WIDTH, HEIGHT = 800, 600
+CROWD_SIZES = [10, 100, 1000, 5000]
+
+def hits(attack, pirate):
+    if hasattr(attack, 'collides_with_pirate'):
+        return attack.collides_with_pirate(pirate)
+    return attack.check_collision(pirate)
+
+def make_pirates(count):
+    pirates = []
+    for _ in range(count):
+        pirate = Pirate()
+        pirate.x = random.uniform(0, WIDTH)
+        pirate.y = random.uniform(0, HEIGHT)
+        pirates.append(pirate)
+    return pirates
+
+def make_attacks(pirates, thunderbolt_tempo):
+    cx, cy = WIDTH // 2, HEIGHT // 2
+    attacks = []
+
+    # A few punches caught at full extension
+    for target in [(100, 100), (700, 150), (300, 550)]:
+        punch = RubberPunch(cx, cy, target[0], target[1])
+        for _ in range(20):
+            punch.update()
+            if not punch.extending:
+                break
+        attacks.append(punch)
+
+    attacks.append(GearSecond(cx, cy))
+
+    # Zoro's Three Sword Style and Franky's Radical Beam
+    for end in [(cx + 400, cy), (cx - 200, cy + 346), (cx - 200, cy - 346)]:
+        slash = SwordSlash(cx, cy, end[0], end[1])
+        slash.update()
+        attacks.append(slash)
+    beam = RadicalBeam(cx, cy, 0, 0)
+    for _ in range(10):
+        beam.update()
+    attacks.append(beam)
+
+    diable_jambe = DiableJambe(cx, cy)
+    diable_jambe.radius = 80
+    attacks.append(diable_jambe)
+
+    # Nami's Thunderbolt Tempo drops one bolt on every pirate
+    if thunderbolt_tempo:
+        for pirate in pirates:
+            attacks.append(ThunderAttack(pirate.x, pirate.y))
+    return attacks
+
+def brute_force(pirates, attacks):
+    hit_count = 0
+    for pirate in pirates:
+        for attack in attacks:
+            if hits(attack, pirate):
+                hit_count += 1
+                break
+    return hit_count
+
+def broad_phase(pirates, attacks, grid):
+    margin = max([pirate.size for pirate in pirates], default=0)
+    grid.build(attacks, margin)
+
+    hit_count = 0
+    for pirate in pirates:
+        for attack in grid.query_point(pirate.x, pirate.y):
+            if hits(attack, pirate):
+                hit_count += 1
+                break
+    return hit_count
+
+def time_frames(function, frames, *args):
+    start = time.perf_counter()
+    for _ in range(frames):
+        result = function(*args)
+    return (time.perf_counter() - start) * 1000 / frames, result
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    random.seed(1234)
+    rng.seed(1234)
+    grid = SpatialHash()
+
+    print(f"{'scenario':<22}{'pirates':>8}{'attacks':>9}{'brute ms':>11}{'hash ms':>10}{'speedup':>9}")
+    for thunderbolt_tempo in (False, True):
+        scenario = "Thunderbolt Tempo" if thunderbolt_tempo else "punches + crew"
+        for count in CROWD_SIZES:
+            pirates = make_pirates(count)
+            attacks = make_attacks(pirates, thunderbolt_tempo)
+
+            # Quadratic brute force gets a single frame on the largest crowds
+            brute_frames = 1 if thunderbolt_tempo and count >= 1000 else frames
+            brute_ms, brute_hits = time_frames(brute_force, brute_frames, pirates, attacks)
+            hash_ms, hash_hits = time_frames(broad_phase, frames, pirates, attacks, grid)
+            assert brute_hits == hash_hits, "broad phase missed a collision"
+
+            print(f"{scenario:<22}{count:>8}{len(attacks):>9}{brute_ms:>11.2f}{hash_ms:>10.2f}"
+                  f"{brute_ms / max(hash_ms, 1e-9):>8.1f}x")
+
+if __name__ == "__main__":
+    main()
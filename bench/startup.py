@@ -0,0 +1,100 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# Cold start of the windowed game: time from launching the interpreter to the
+# first frame on screen, and the import time of every module loaded before it:
+#   python -m bench.startup [--runs N] [--target-ms MS]
+# Each run is a fresh process that starts the game with main.main() and exits
+# on the first display flip. The run exits with status 1 when the median time
+# to first frame is over the target.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGET_MS = 1000
+TOP_MODULES = 15
+RESULT = re.compile(r'first_frame_ms (\d+(?:\.\d+)?)')
+
+# Run in the child process; writes the time to first frame in ms to the
+# pipe at RESULT_FD. The game prints to stdout from other threads (the asset
+# loader reports missing sounds), so the measurement gets its own channel.
+CHILD = '''
+import os, sys, time
+import pygame
+
+def first_flip(*args):
+    os.write(RESULT_FD, f"first_frame_ms {(time.time() - START) * 1000:.2f}\\n".encode())
+    os._exit(0)
+
+pygame.display.flip = first_flip
+pygame.display.update = first_flip
+import main
+main.main([])
+'''
+
+def run_once():
+    # (time to first frame in ms, {module: cumulative import us})
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy',
+               PYGAME_HIDE_SUPPORT_PROMPT='1')
+    read_fd, write_fd = os.pipe()
+    start = time.time()
+    code = f"START = {start!r}\nRESULT_FD = {write_fd}\n" + CHILD
+    try:
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                                cwd=ROOT, env=env, capture_output=True, text=True,
+                                pass_fds=(write_fd,))
+    finally:
+        os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        match = RESULT.search(pipe.read())
+    if match is None:
+        raise RuntimeError(f"game exited with status {result.returncode} before drawing a frame:\n"
+                           f"{result.stdout}{result.stderr[-2000:]}")
+    return float(match.group(1)), parse_importtime(result.stderr)
+
+def parse_importtime(output):
+    # Cumulative time of each top-level import (the ones not nested in
+    # another module's import), from python -X importtime
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        if name.startswith('  '):
+            continue  # Nested import, counted in its parent
+        modules[name.strip()] = int(cumulative_us)
+    return modules
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the game's cold start")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, default=TARGET_MS,
+                        help="fail when the median time to first frame is above this")
+    options = parser.parse_args()
+
+    first_frames = []
+    imports = {}
+    for _ in range(options.runs):
+        first_frame_ms, modules = run_once()
+        first_frames.append(first_frame_ms)
+        for name, us in modules.items():
+            imports.setdefault(name, []).append(us)
+
+    print(f"{'module':<32}{'import ms':>10}")
+    medians = {name: statistics.median(times) / 1000 for name, times in imports.items()}
+    for name, ms in sorted(medians.items(), key=lambda item: -item[1])[:TOP_MODULES]:
+        print(f"{name:<32}{ms:>10.1f}")
+    print(f"{'all imports':<32}{sum(medians.values()):>10.1f}")
+
+    median = statistics.median(first_frames)
+    print(f"time to first frame: {median:.1f} ms median of {options.runs} "
+          f"(min {min(first_frames):.1f}, max {max(first_frames):.1f}), target {options.target_ms:.0f} ms")
+    if median > options.target_ms:
+        print("FAIL: cold start is over the target")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame
+
+import rng
+from rng import sim
+from canvas import Canvas, RESOLUTION_SCALES
+from constants import WIDTH, HEIGHT
+from bosses import Arlong, Crocodile, Enel
+from crew_members import Nami, Franky
+from islands import EastBlue, Alabasta, Skypiea, WaterSeven, ThrillerBark, Marineford
+from world import World
+
+# Scripted stress scenarios built from the game classes. Each scenario runs
+# for a number of frames and times every phase of update and draw; results
+# are written as JSON and compared against a stored baseline:
+#   python -m bench.stress [--frames N] [--output FILE] [--baseline FILE]
+#   python -m bench.stress --update-baseline
+# With --render-scale the game scene is drawn at that resolution
+# and scaled up to the screen, as in the game (see canvas.py); the scaling is
+# part of draw. Each scale is compared against its own baseline,
+# bench/baseline_<scale>.json.
+# The run exits with status 1 when a phase got slower than the baseline by
+# more than the threshold. Baselines are machine-specific; regenerate them
+# with --update-baseline on the machine that runs the comparison.
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+THRESHOLD = 0.25   # Allowed slowdown of a phase, as a fraction of its baseline
+NOISE_FLOOR = 0.05  # ms; smaller differences are never reported
+WARMUP_FRAMES = 30
+
+PIRATE_TYPES = ["normal", "logia", "paramecia", "zoan"]
+ISLANDS = [EastBlue, Alabasta, Skypiea, WaterSeven, ThrillerBark, Marineford]
+
+class PhaseTimer:
+    def __init__(self):
+        self.samples = {}
+        self.recording = False
+
+    def wrap(self, phase, function):
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                if self.recording:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    self.samples.setdefault(phase, []).append(elapsed)
+        return timed
+
+    def summary(self):
+        phases = {}
+        for phase, samples in self.samples.items():
+            ordered = sorted(samples)
+            phases[phase] = {
+                'mean_ms': round(sum(ordered) / len(ordered), 4),
+                'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+            }
+        return phases
+
+def place_pirate(world, pirate, type_index):
+    # Somewhere on screen, but not close enough to catch Luffy
+    pirate.type = PIRATE_TYPES[type_index % len(PIRATE_TYPES)]
+    while True:
+        pirate.x = sim.uniform(0, world.width)
+        pirate.y = sim.uniform(0, world.height)
+        if math.hypot(pirate.x - world.luffy.x, pirate.y - world.luffy.y) > 150:
+            return pirate
+
+def top_up_pirates(world, count):
+    # Replace pirates that were defeated or are about to reach Luffy, so the
+    # crowd stays the same size and the game never ends
+    luffy = world.luffy
+    for pirate in world.pirates:
+        if math.hypot(pirate.x - luffy.x, pirate.y - luffy.y) <= pirate.size + luffy.radius + 10:
+            world.pirates.remove(pirate)
+    world.apply_despawns()
+    index = len(world.pirates)
+    while len(world.pirates) < count:
+        world.pirates.append(place_pirate(world, world.create_pirate(), index))
+        index += 1
+
+class WorldScenario:
+    # A headless World with spawning disabled and a fixed crowd. Update time
+    # is split into World.step's boss, attack and pirate phases.
+    crowd = 0
+
+    def __init__(self, timer):
+        self.world = World("MEDIUM")
+        self.world.pirate_spawn_interval = float('inf')
+        for phase in ('update_boss', 'update_attacks', 'update_pirates'):
+            setattr(self.world, phase, timer.wrap(phase[len('update_'):], getattr(self.world, phase)))
+        self.setup()
+
+    def setup(self):
+        pass
+
+    def inputs(self):
+        return {}
+
+    def update(self):
+        world = self.world
+        top_up_pirates(world, self.crowd)
+        world.game_over = False
+        world.step(self.inputs())
+
+    def draw(self, canvas):
+        scene = canvas.scene()
+        scene.fill((0, 100, 200))
+        self.world.draw(scene, scale=canvas.scale)
+        canvas.show_scene(scene)
+
+class Pirates500(WorldScenario):
+    crowd = 500
+
+class NamiFullScreen(WorldScenario):
+    # Thunderbolt Tempo strikes every pirate of a full screen, recast as
+    # soon as the strikes are over
+    crowd = 300
+
+    def setup(self):
+        nami = next(member for member in self.world.crew_members if isinstance(member, Nami))
+        nami.unlocked = True
+        self.world.active_crew_member = nami
+
+    def inputs(self):
+        if self.world.special_attacks:
+            return {}
+        self.world.active_crew_member.current_cooldown = 0
+        return {'crew_ability': True}
+
+class GearSecondRadicalBeam(WorldScenario):
+    # Gear Second and Franky's Radical Beam at the same time, both refired
+    # whenever they finish
+    crowd = 200
+
+    def setup(self):
+        franky = next(member for member in self.world.crew_members if isinstance(member, Franky))
+        franky.unlocked = True
+        self.world.active_crew_member = franky
+
+    def inputs(self):
+        world = self.world
+        inputs = {'mouse_pos': (world.width, world.height // 3)}
+        if not world.special_moves:
+            world.luffy.special_cooldown = 0
+            inputs['gear_second'] = True
+        if not world.special_attacks:
+            world.active_crew_member.current_cooldown = 0
+            inputs['crew_ability'] = True
+        return inputs
+
+class BossRotation(WorldScenario):
+    # The boss attacks every ATTACK_INTERVAL frames, cycling through its
+    # whole attack rotation several times over the run
+    boss_class = None
+    ATTACK_INTERVAL = 40
+
+    def setup(self):
+        world = self.world
+        world.boss = self.boss_class(world.width // 2, world.height // 4)
+        world.boss_battle = True
+        world.boss.health = world.boss.max_health = 10 ** 9
+
+    def update(self):
+        if self.world.frame % self.ATTACK_INTERVAL == 0:
+            self.world.boss.attack_cooldown = 0
+        super().update()
+
+class ArlongRotation(BossRotation):
+    boss_class = Arlong
+
+class CrocodileRotation(BossRotation):
+    boss_class = Crocodile
+
+class EnelRotation(BossRotation):
+    boss_class = Enel
+
+class IslandScenario:
+    island_class = None
+
+    def __init__(self, timer):
+        self.island = self.island_class(WIDTH, HEIGHT)
+
+    def update(self):
+        self.island.update()
+
+    def draw(self, canvas):
+        scene = canvas.scene()
+        self.island.draw(scene, canvas.scale)
+        canvas.show_scene(scene)
+
+def island_scenario(island_class):
+    return type(island_class.__name__, (IslandScenario,), {'island_class': island_class})
+
+SCENARIOS = [
+    ("pirates_500", Pirates500),
+    ("nami_full_screen", NamiFullScreen),
+    ("gear_second_radical_beam", GearSecondRadicalBeam),
+    ("boss_arlong", ArlongRotation),
+    ("boss_crocodile", CrocodileRotation),
+    ("boss_enel", EnelRotation),
+] + [("island_" + island.__name__.lower(), island_scenario(island)) for island in ISLANDS]
+
+def run_scenario(scenario_class, frames, canvas):
+    rng.seed(1234)
+    timer = PhaseTimer()
+    scenario = scenario_class(timer)
+    update = timer.wrap('update', scenario.update)
+    draw = timer.wrap('draw', scenario.draw)
+    for frame in range(WARMUP_FRAMES + frames):
+        timer.recording = frame >= WARMUP_FRAMES
+        update()
+        draw(canvas)
+    return timer.summary()
+
+def baseline_path(scale):
+    if scale == 1:
+        return BASELINE
+    return os.path.join(os.path.dirname(__file__), f'baseline_{scale}.json')
+
+def compare(results, baseline, threshold):
+    # Phases slower than the baseline by more than the threshold
+    regressions = []
+    for name, phases in results['scenarios'].items():
+        for phase, timing in phases.items():
+            base = baseline.get('scenarios', {}).get(name, {}).get(phase)
+            if base is None:
+                continue
+            slower = timing['mean_ms'] - base['mean_ms']
+            if slower > NOISE_FLOOR and slower > base['mean_ms'] * threshold:
+                regressions.append((name, phase, base['mean_ms'], timing['mean_ms']))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress scenario benchmarks")
+    parser.add_argument('--frames', type=int, default=300,
+                        help="frames timed per scenario, after a short warmup")
+    parser.add_argument('--output', default='stress_results.json',
+                        help="where to write the results")
+    parser.add_argument('--baseline',
+                        help="results to compare against (default: the stored baseline for the render scale)")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="allowed slowdown per phase, e.g. 0.25 for 25%%")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="store this run as the new baseline")
+    parser.add_argument('--only', action='append',
+                        help="run only the named scenario (repeatable)")
+    parser.add_argument('--render-scale', type=float, choices=RESOLUTION_SCALES, default=1.0,
+                        help="draw the game scene at this resolution")
+    args = parser.parse_args()
+    if args.baseline is None:
+        args.baseline = baseline_path(args.render_scale)
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    canvas = Canvas(screen, args.render_scale)
+
+    results = {'frames': args.frames, 'render_scale': args.render_scale, 'scenarios': {}}
+    print(f"{'scenario':<28}{'phase':<10}{'mean ms':>10}{'p95 ms':>10}")
+    for name, scenario_class in SCENARIOS:
+        if args.only and name not in args.only:
+            continue
+        phases = run_scenario(scenario_class, args.frames, canvas)
+        results['scenarios'][name] = phases
+        for phase, timing in phases.items():
+            print(f"{name:<28}{phase:<10}{timing['mean_ms']:>10.3f}{timing['p95_ms']:>10.3f}")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Updated baseline {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('render_scale', 1.0) != args.render_scale:
+        print(f"{args.baseline} was measured at render scale {baseline.get('render_scale', 1.0)}; not comparing")
+        return
+    regressions = compare(results, baseline, args.threshold)
+    for name, phase, before, after in regressions:
+        print(f"REGRESSION {name} {phase}: {before:.3f} ms -> {after:.3f} ms "
+              f"(+{(after / before - 1) * 100:.0f}%)")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions above {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
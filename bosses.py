@@ -1,7 +1,14 @@
 import pygame
-import random
 import math
 
+import canvas
+import particles
+import pools
+import sprite_atlas
+from constants import WIDTH, HEIGHT
+from fonts import get_font, render_text
+from rng import sim, fx
+
 # Boss classes
 class Boss:
     def __init__(self, x, y):
@@ -41,9 +48,9 @@ class Boss:
         if self.attack_cooldown > 0:
             self.attack_cooldown -= 1
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw boss body
-        pygame.draw.circle(surface, (255, 0, 0), (int(self.x), int(self.y)), self.size)
+        canvas.circle(surface, scale, (255, 0, 0), (int(self.x), int(self.y)), self.size)
         
         # Draw health bar
         health_width = self.size * 2
@@ -52,18 +59,17 @@ class Boss:
         health_y = self.y - self.size - 20
         
         # Background
-        pygame.draw.rect(surface, (100, 100, 100), 
-                        (health_x, health_y, health_width, health_height))
+        canvas.rect(surface, scale, (100, 100, 100), 
+                   (health_x, health_y, health_width, health_height))
         
         # Health
         health_percent = self.health / self.max_health
-        pygame.draw.rect(surface, (255, 0, 0), 
-                        (health_x, health_y, health_width * health_percent, health_height))
+        canvas.rect(surface, scale, (255, 0, 0), 
+                   (health_x, health_y, health_width * health_percent, health_height))
         
         # Draw name
-        font = pygame.font.Font(None, 24)
-        name_text = font.render(self.name, True, (255, 255, 255))
-        surface.blit(name_text, (self.x - name_text.get_width()/2, health_y - 20))
+        name_text = render_text(get_font(24), self.name, (255, 255, 255))
+        canvas.blit(surface, scale, name_text, (self.x - name_text.get_width()/2, health_y - 20))
     
     def attack(self, game_state_data):
         # Override in subclasses
@@ -78,6 +84,13 @@ class Boss:
     def collides_with_luffy(self, luffy):
         distance = math.sqrt((self.x - luffy.x) ** 2 + (self.y - luffy.y) ** 2)
         return distance < (self.size + luffy.radius)
+    
+    def get_draw_rect(self):
+        # Area covered by draw(): body effects, health bar and name label
+        reach = self.size + 50
+        top = self.size + 45
+        bottom = self.size + 25
+        return pygame.Rect(int(self.x) - reach, int(self.y) - top, reach * 2, top + bottom)
 
 class Arlong(Boss):
     def __init__(self, x, y):
@@ -89,13 +102,13 @@ class Arlong(Boss):
         self.color = (0, 100, 200)  # Blue-ish
         self.attack_cooldown_max = 120
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw Arlong body
-        pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), self.size)
+        canvas.circle(surface, scale, self.color, (int(self.x), int(self.y)), self.size)
         
         # Draw shark features
         # Nose
-        pygame.draw.polygon(surface, (0, 50, 150), [
+        canvas.polygon(surface, scale, (0, 50, 150), [
             (self.x, self.y - self.size/2),
             (self.x - self.size/3, self.y - self.size),
             (self.x + self.size/3, self.y - self.size)
@@ -104,12 +117,12 @@ class Arlong(Boss):
         # Teeth
         teeth_width = self.size * 0.8
         teeth_height = self.size * 0.3
-        pygame.draw.rect(surface, (255, 255, 255), 
-                       (self.x - teeth_width/2, self.y, 
-                        teeth_width, teeth_height))
+        canvas.rect(surface, scale, (255, 255, 255), 
+                  (self.x - teeth_width/2, self.y, 
+                   teeth_width, teeth_height))
         
         # Draw health bar and name
-        super().draw(surface)
+        super().draw(surface, scale)
     
     def attack(self, game_state_data):
         if self.attack_cooldown <= 0:
@@ -123,7 +136,7 @@ class Arlong(Boss):
                     dx = math.cos(angle) * 400
                     dy = math.sin(angle) * 400
                     game_state_data['boss_attacks'].append(
-                        WaterShot(self.x, self.y, self.x + dx, self.y + dy)
+                        pools.acquire(WaterShot, self.x, self.y, self.x + dx, self.y + dy)
                     )
             elif self.attack_pattern == 1:
                 # Summon fish-men
@@ -139,7 +152,8 @@ class Arlong(Boss):
             else:
                 # Shark tooth projectile
                 game_state_data['boss_attacks'].append(
-                    SharkToothAttack(self.x, self.y, game_state_data['luffy'].x, game_state_data['luffy'].y)
+                    pools.acquire(SharkToothAttack, self.x, self.y,
+                                  game_state_data['luffy'].x, game_state_data['luffy'].y)
                 )
 
 class Crocodile(Boss):
@@ -162,39 +176,39 @@ class Crocodile(Boss):
                 self.sand_form = False
             
             # Random movement in sand form
-            self.x += random.uniform(-3, 3)
-            self.y += random.uniform(-3, 3)
+            self.x += sim.uniform(-3, 3)
+            self.y += sim.uniform(-3, 3)
         else:
             # Normal movement
             super().update(luffy_x, luffy_y)
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         if self.sand_form:
             # Draw sand cloud
             for _ in range(20):
-                offset_x = random.randint(-self.size, self.size)
-                offset_y = random.randint(-self.size, self.size)
+                offset_x = fx.randint(-self.size, self.size)
+                offset_y = fx.randint(-self.size, self.size)
                 if offset_x**2 + offset_y**2 <= self.size**2:
-                    sand_size = random.randint(5, 15)
-                    pygame.draw.circle(surface, self.color, 
-                                      (int(self.x + offset_x), int(self.y + offset_y)), 
-                                      sand_size)
+                    sand_size = fx.randint(5, 15)
+                    canvas.circle(surface, scale, self.color, 
+                                 (int(self.x + offset_x), int(self.y + offset_y)), 
+                                 sand_size)
         else:
             # Draw Crocodile body
-            pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), self.size)
+            canvas.circle(surface, scale, self.color, (int(self.x), int(self.y)), self.size)
             
             # Draw hook hand
             hook_x = self.x + self.size * 0.8
             hook_y = self.y
-            pygame.draw.line(surface, (200, 200, 200), 
-                            (self.x + self.size/2, self.y), 
-                            (hook_x, hook_y), 5)
-            pygame.draw.arc(surface, (200, 200, 200), 
-                           (hook_x - 10, hook_y - 10, 20, 20), 
-                           math.pi/2, math.pi*3/2, 5)
+            canvas.line(surface, scale, (200, 200, 200), 
+                       (self.x + self.size/2, self.y), 
+                       (hook_x, hook_y), 5)
+            canvas.arc(surface, scale, (200, 200, 200), 
+                      (hook_x - 10, hook_y - 10, 20, 20), 
+                      math.pi/2, math.pi*3/2, 5)
         
         # Draw health bar and name
-        super().draw(surface)
+        super().draw(surface, scale)
     
     def attack(self, game_state_data):
         if self.attack_cooldown <= 0:
@@ -233,28 +247,28 @@ class Enel(Boss):
         if self.teleport_cooldown <= 0:
             self.teleport_cooldown = 180  # 3 seconds
             # Teleport to a random position
-            self.x = random.randint(100, 700)
-            self.y = random.randint(100, 500)
+            self.x = sim.randint(100, WIDTH - 100)
+            self.y = sim.randint(100, HEIGHT - 100)
         else:
             # Normal movement
             super().update(luffy_x, luffy_y)
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw Enel body
-        pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), self.size)
+        canvas.circle(surface, scale, self.color, (int(self.x), int(self.y)), self.size)
         
         # Draw lightning effects
         for _ in range(5):
-            start_x = self.x + random.uniform(-self.size, self.size)
-            start_y = self.y + random.uniform(-self.size, self.size)
-            end_x = start_x + random.uniform(-20, 20)
-            end_y = start_y + random.uniform(-20, 20)
-            pygame.draw.line(surface, (255, 255, 255), 
-                            (start_x, start_y), 
-                            (end_x, end_y), 2)
+            start_x = self.x + fx.uniform(-self.size, self.size)
+            start_y = self.y + fx.uniform(-self.size, self.size)
+            end_x = start_x + fx.uniform(-20, 20)
+            end_y = start_y + fx.uniform(-20, 20)
+            canvas.line(surface, scale, (255, 255, 255), 
+                       (start_x, start_y), 
+                       (end_x, end_y), 2)
         
         # Draw health bar and name
-        super().draw(surface)
+        super().draw(surface, scale)
     
     def attack(self, game_state_data):
         if self.attack_cooldown <= 0:
@@ -274,15 +288,34 @@ class Enel(Boss):
             else:
                 # Multiple lightning bolts
                 for _ in range(5):
-                    x = random.randint(100, 700)
-                    y = random.randint(100, 500)
+                    x = sim.randint(100, WIDTH - 100)
+                    y = sim.randint(100, HEIGHT - 100)
                     game_state_data['boss_attacks'].append(
-                        LightningBolt(x, y)
+                        pools.acquire(LightningBolt, x, y)
                     )
 
+# One crack of a GroundDesiccation, with the angle and length of its tip
+class Crack:
+    __slots__ = ('angle', 'length', 'width', 'tip_angle', 'tip_length', 'has_segments')
+    
+    def __init__(self, angle, width):
+        self.angle = angle
+        self.length = 0
+        self.width = width
+        self.tip_angle = angle
+        self.tip_length = 0
+        self.has_segments = False
+
 # Boss attack classes
 class BossAttack:
+    # Pooled attacks (see pools.py) re-initialize through reset(), which
+    # takes the constructor's arguments
+    __slots__ = ('x', 'y', 'active', 'damage')
+    
     def __init__(self, x, y):
+        self.reset(x, y)
+    
+    def reset(self, x, y):
         self.x = x
         self.y = y
         self.active = True
@@ -291,15 +324,25 @@ class BossAttack:
     def update(self):
         pass
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         pass
     
     def check_collision(self, luffy):
         return False
+    
+    def release_particles(self):
+        # Attacks holding a pooled particle system hand it back here when
+        # they end or the game is reset; later calls do nothing
+        pass
 
 class WaterShot(BossAttack):
+    __slots__ = ('start_x', 'start_y', 'current_x', 'current_y', 'speed', 'radius', 'dx', 'dy')
+    
     def __init__(self, start_x, start_y, end_x, end_y):
-        super().__init__(start_x, start_y)
+        self.reset(start_x, start_y, end_x, end_y)
+    
+    def reset(self, start_x, start_y, end_x, end_y):
+        super().reset(start_x, start_y)
         self.start_x = start_x
         self.start_y = start_y
         self.current_x = start_x
@@ -327,23 +370,23 @@ class WaterShot(BossAttack):
         self.current_y += self.dy
         
         # Check if out of bounds
-        if (self.current_x < 0 or self.current_x > 800 or 
-            self.current_y < 0 or self.current_y > 600):
+        if (self.current_x < 0 or self.current_x > WIDTH or 
+            self.current_y < 0 or self.current_y > HEIGHT):
             self.active = False
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw water projectile
-        pygame.draw.circle(surface, (0, 100, 255), 
-                          (int(self.current_x), int(self.current_y)), 
-                          self.radius)
+        canvas.circle(surface, scale, (0, 100, 255), 
+                     (int(self.current_x), int(self.current_y)), 
+                     self.radius)
         
         # Draw water trail
         for i in range(5):
             trail_x = self.current_x - self.dx * i * 2
             trail_y = self.current_y - self.dy * i * 2
-            pygame.draw.circle(surface, (100, 200, 255), 
-                              (int(trail_x), int(trail_y)), 
-                              self.radius - i * 1.5)
+            canvas.circle(surface, scale, (100, 200, 255), 
+                         (int(trail_x), int(trail_y)), 
+                         self.radius - i * 1.5)
     
     def check_collision(self, luffy):
         distance = math.sqrt((luffy.x - self.current_x)**2 + (luffy.y - self.current_y)**2)
@@ -353,8 +396,14 @@ class WaterShot(BossAttack):
         return False
 
 class SharkToothAttack(BossAttack):
+    __slots__ = ('start_x', 'start_y', 'current_x', 'current_y', 'speed', 'size', 'dx', 'dy',
+                 'rotation', 'rotation_speed')
+    
     def __init__(self, start_x, start_y, end_x, end_y):
-        super().__init__(start_x, start_y)
+        self.reset(start_x, start_y, end_x, end_y)
+    
+    def reset(self, start_x, start_y, end_x, end_y):
+        super().reset(start_x, start_y)
         self.start_x = start_x
         self.start_y = start_y
         self.current_x = start_x
@@ -387,11 +436,11 @@ class SharkToothAttack(BossAttack):
         self.rotation += self.rotation_speed
         
         # Check if out of bounds
-        if (self.current_x < 0 or self.current_x > 800 or 
-            self.current_y < 0 or self.current_y > 600):
+        if (self.current_x < 0 or self.current_x > WIDTH or 
+            self.current_y < 0 or self.current_y > HEIGHT):
             self.active = False
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw shark tooth
         points = []
         for i in range(3):
@@ -400,7 +449,7 @@ class SharkToothAttack(BossAttack):
             y = self.current_y + math.sin(angle) * self.size
             points.append((x, y))
         
-        pygame.draw.polygon(surface, (255, 255, 255), points)
+        canvas.polygon(surface, scale, (255, 255, 255), points)
     
     def check_collision(self, luffy):
         distance = math.sqrt((luffy.x - self.current_x)**2 + (luffy.y - self.current_y)**2)
@@ -410,6 +459,8 @@ class SharkToothAttack(BossAttack):
         return False
 
 class SandTornado(BossAttack):
+    __slots__ = ('radius', 'max_radius', 'expansion_speed', 'lifetime', 'particles')
+    
     def __init__(self, x, y):
         super().__init__(x, y)
         self.radius = 0
@@ -417,27 +468,27 @@ class SandTornado(BossAttack):
         self.expansion_speed = 2
         self.damage = 1
         self.lifetime = 180  # 3 seconds
-        self.particles = []
+        self.particles = particles.acquire(128)
         
         # Create initial particles
         for _ in range(50):
             self.add_particle()
     
     def add_particle(self):
-        angle = random.uniform(0, 2 * math.pi)
-        distance = random.uniform(0, self.radius)
-        speed = random.uniform(1, 3)
-        size = random.uniform(3, 8)
-        
-        self.particles.append({
-            'x': self.x + math.cos(angle) * distance,
-            'y': self.y + math.sin(angle) * distance,
-            'angle': angle,
-            'distance': distance,
-            'speed': speed,
-            'size': size,
-            'rotation': random.uniform(0, 0.2)
-        })
+        angle = sim.uniform(0, 2 * math.pi)
+        distance = sim.uniform(0, self.radius)
+        speed = sim.uniform(1, 3)
+        size = sim.uniform(3, 8)
+        
+        self.particles.emit(
+            x=self.x + math.cos(angle) * distance,
+            y=self.y + math.sin(angle) * distance,
+            angle=angle,
+            distance=distance,
+            speed=speed * 0.1,  # Outward drift per frame
+            size=size,
+            rotation=sim.uniform(0, 0.2)
+        )
     
     def update(self):
         # Expand tornado
@@ -450,35 +501,35 @@ class SandTornado(BossAttack):
             self.active = False
         
         # Add new particles
-        if random.random() < 0.3:
+        if sim.random() < 0.3:
             self.add_particle()
         
-        # Update particles
-        for particle in self.particles[:]:
-            # Rotate particle around center
-            particle['angle'] += particle['rotation']
-            particle['distance'] = min(particle['distance'] + particle['speed'] * 0.1, self.radius)
-            
-            # Update position
-            particle['x'] = self.x + math.cos(particle['angle']) * particle['distance']
-            particle['y'] = self.y + math.sin(particle['angle']) * particle['distance']
-            
-            # Remove particles that go beyond the tornado
-            if particle['distance'] >= self.radius:
-                self.particles.remove(particle)
+        # Rotate particles around center and remove those that go beyond the tornado
+        self.particles.rotate(self.x, self.y, self.radius)
+        self.particles.kill(self.particles.distance >= self.radius)
+        
+        if not self.active:
+            self.release_particles()
     
-    def draw(self, surface):
+    def release_particles(self):
+        if self.particles is not None:
+            particles.release(self.particles)
+            self.particles = None
+    
+    def draw(self, surface, scale=1.0):
         # Draw tornado particles
-        for particle in self.particles:
-            pygame.draw.circle(surface, (200, 180, 140), 
-                              (int(particle['x']), int(particle['y'])), 
-                              int(particle['size']))
+        for x, y, size in zip(*self.particles.snapshot('x', 'y', 'size')):
+            canvas.circle(surface, scale, (200, 180, 140), 
+                         (int(x), int(y)), 
+                         int(size))
     
     def check_collision(self, luffy):
         distance = math.sqrt((luffy.x - self.x)**2 + (luffy.y - self.y)**2)
         return distance < luffy.radius + self.radius
 
 class GroundDesiccation(BossAttack):
+    __slots__ = ('radius', 'max_radius', 'expansion_speed', 'cracks', 'segments')
+    
     def __init__(self, x, y):
         super().__init__(x, y)
         self.radius = 0
@@ -487,72 +538,70 @@ class GroundDesiccation(BossAttack):
         self.damage = 1
         self.cracks = []
         
+        # Crack segment end points, grouped by crack index
+        self.segments = particles.acquire(256)
+        
         # Create cracks
         for _ in range(8):
-            angle = random.uniform(0, 2 * math.pi)
-            self.cracks.append({
-                'angle': angle,
-                'length': 0,
-                'width': random.uniform(2, 5),
-                'segments': []
-            })
+            angle = sim.uniform(0, 2 * math.pi)
+            self.cracks.append(Crack(angle, sim.uniform(2, 5)))
     
     def update(self):
         # Expand effect
         self.radius += self.expansion_speed
         if self.radius >= self.max_radius:
             self.active = False
+            self.release_particles()
+            return
         
         # Update cracks
-        for crack in self.cracks:
-            crack['length'] = self.radius
+        for i, crack in enumerate(self.cracks):
+            crack.length = self.radius
             
             # Create crack segments
-            if not crack['segments'] or crack['segments'][-1]['length'] < crack['length']:
-                prev_segment = crack['segments'][-1] if crack['segments'] else {
-                    'x': self.x,
-                    'y': self.y,
-                    'angle': crack['angle'],
-                    'length': 0
-                }
-                
-                new_length = prev_segment['length'] + random.uniform(10, 30)
-                new_length = min(new_length, crack['length'])
+            if not crack.has_segments or crack.tip_length < crack.length:
+                new_length = crack.tip_length + sim.uniform(10, 30)
+                new_length = min(new_length, crack.length)
                 
-                new_angle = prev_segment['angle'] + random.uniform(-0.3, 0.3)
+                new_angle = crack.tip_angle + sim.uniform(-0.3, 0.3)
                 
-                end_x = self.x + math.cos(new_angle) * new_length
-                end_y = self.y + math.sin(new_angle) * new_length
-                
-                crack['segments'].append({
-                    'x': end_x,
-                    'y': end_y,
-                    'angle': new_angle,
-                    'length': new_length
-                })
-    
-    def draw(self, surface):
+                self.segments.emit(
+                    x=self.x + math.cos(new_angle) * new_length,
+                    y=self.y + math.sin(new_angle) * new_length,
+                    group=i
+                )
+                crack.tip_angle = new_angle
+                crack.tip_length = new_length
+                crack.has_segments = True
+    
+    def release_particles(self):
+        if self.segments is not None:
+            particles.release(self.segments)
+            self.segments = None
+    
+    def draw(self, surface, scale=1.0):
         # Draw dried ground
-        s = pygame.Surface((self.radius*2, self.radius*2), pygame.SRCALPHA)
-        pygame.draw.circle(s, (200, 180, 140, 100), (self.radius, self.radius), self.radius)
-        surface.blit(s, (self.x - self.radius, self.y - self.radius))
+        canvas.blit(surface, scale, sprite_atlas.circle((200, 180, 140, 100), self.radius), 
+                   (self.x - self.radius, self.y - self.radius))
         
         # Draw cracks
-        for crack in self.cracks:
+        for i, crack in enumerate(self.cracks):
             prev_x, prev_y = self.x, self.y
             
-            for segment in crack['segments']:
-                pygame.draw.line(surface, (100, 80, 60), 
-                                (prev_x, prev_y), 
-                                (segment['x'], segment['y']), 
-                                int(crack['width']))
-                prev_x, prev_y = segment['x'], segment['y']
+            for x, y in zip(*self.segments.snapshot('x', 'y', group=i)):
+                canvas.line(surface, scale, (100, 80, 60), 
+                           (prev_x, prev_y), 
+                           (x, y), 
+                           int(crack.width))
+                prev_x, prev_y = x, y
     
     def check_collision(self, luffy):
         distance = math.sqrt((luffy.x - self.x)**2 + (luffy.y - self.y)**2)
         return distance < luffy.radius + self.radius
 
 class ElThor(BossAttack):
+    __slots__ = ('life', 'radius', 'warning_time', 'segments')
+    
     def __init__(self, x, y):
         super().__init__(x, y)
         self.life = 60  # 1 second
@@ -568,8 +617,8 @@ class ElThor(BossAttack):
     def create_lightning(self):
         prev_x, prev_y = self.x, 0  # Start from top of screen
         while prev_y < self.y:
-            next_y = prev_y + random.randint(10, 30)
-            next_x = prev_x + random.randint(-15, 15)
+            next_y = prev_y + sim.randint(10, 30)
+            next_x = prev_x + sim.randint(-15, 15)
             self.segments.append((prev_x, prev_y, next_x, next_y))
             prev_x, prev_y = next_x, next_y
     
@@ -583,22 +632,22 @@ class ElThor(BossAttack):
             if self.life <= 0:
                 self.active = False
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         if self.warning_time > 0:
             # Draw warning circle
-            pygame.draw.circle(surface, (255, 0, 0, 100), 
-                              (int(self.x), int(self.y)), 
-                              self.radius, 2)
+            canvas.circle(surface, scale, (255, 0, 0, 100), 
+                         (int(self.x), int(self.y)), 
+                         self.radius, 2)
         else:
             # Draw lightning bolt
             for i, (x1, y1, x2, y2) in enumerate(self.segments):
                 color = (255, 255, 100) if i % 2 == 0 else (200, 200, 255)
-                pygame.draw.line(surface, color, (x1, y1), (x2, y2), 3)
+                canvas.line(surface, scale, color, (x1, y1), (x2, y2), 3)
             
             # Draw impact circle
-            pygame.draw.circle(surface, (255, 255, 200, 100), 
-                              (int(self.x), int(self.y)), 
-                              self.radius)
+            canvas.circle(surface, scale, (255, 255, 200, 100), 
+                         (int(self.x), int(self.y)), 
+                         self.radius)
     
     def check_collision(self, luffy):
         if self.warning_time <= 0:
@@ -607,6 +656,8 @@ class ElThor(BossAttack):
         return False
 
 class Raigo(BossAttack):
+    __slots__ = ('radius', 'max_radius', 'expansion_rate', 'life', 'lightning_timer')
+    
     def __init__(self, x, y):
         super().__init__(x, y)
         self.radius = 40
@@ -622,13 +673,13 @@ class Raigo(BossAttack):
             self.radius += self.expansion_rate
         
         # Move cloud slightly
-        self.x += random.uniform(-1, 1)
-        self.y += random.uniform(-1, 1)
+        self.x += sim.uniform(-1, 1)
+        self.y += sim.uniform(-1, 1)
         
         # Generate lightning occasionally
         self.lightning_timer -= 1
         if self.lightning_timer <= 0:
-            self.lightning_timer = random.randint(10, 30)
+            self.lightning_timer = sim.randint(10, 30)
             # Lightning would be added to game_state_data['boss_attacks'] in the main game loop
         
         # Update lifetime
@@ -636,39 +687,45 @@ class Raigo(BossAttack):
         if self.life <= 0:
             self.active = False
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw thunder cloud
         for _ in range(10):
-            offset_x = random.randint(-int(self.radius), int(self.radius))
-            offset_y = random.randint(-int(self.radius/2), int(self.radius/2))
+            offset_x = fx.randint(-int(self.radius), int(self.radius))
+            offset_y = fx.randint(-int(self.radius/2), int(self.radius/2))
             if offset_x**2 + offset_y**2 <= self.radius**2:
-                cloud_size = random.randint(int(self.radius/3), int(self.radius/2))
-                pygame.draw.circle(surface, (100, 100, 100), 
-                                  (int(self.x + offset_x), int(self.y + offset_y)), 
-                                  cloud_size)
+                cloud_size = fx.randint(int(self.radius/3), int(self.radius/2))
+                canvas.circle(surface, scale, (100, 100, 100), 
+                             (int(self.x + offset_x), int(self.y + offset_y)), 
+                             cloud_size)
         
         # Draw lightning inside cloud
-        if random.random() < 0.3:
+        if fx.random() < 0.3:
             for _ in range(3):
-                start_x = self.x + random.uniform(-self.radius/2, self.radius/2)
-                start_y = self.y + random.uniform(-self.radius/2, self.radius/2)
-                end_x = start_x + random.uniform(-10, 10)
-                end_y = start_y + random.uniform(-10, 10)
-                pygame.draw.line(surface, (255, 255, 100), 
-                                (start_x, start_y), 
-                                (end_x, end_y), 2)
+                start_x = self.x + fx.uniform(-self.radius/2, self.radius/2)
+                start_y = self.y + fx.uniform(-self.radius/2, self.radius/2)
+                end_x = start_x + fx.uniform(-10, 10)
+                end_y = start_y + fx.uniform(-10, 10)
+                canvas.line(surface, scale, (255, 255, 100), 
+                           (start_x, start_y), 
+                           (end_x, end_y), 2)
     
     def check_collision(self, luffy):
         distance = math.sqrt((luffy.x - self.x)**2 + (luffy.y - self.y)**2)
         return distance < luffy.radius + self.radius
 
 class LightningBolt(BossAttack):
+    __slots__ = ('life', 'warning_time', 'segments')
+    
     def __init__(self, x, y):
-        super().__init__(x, y)
+        self.segments = []
+        self.reset(x, y)
+    
+    def reset(self, x, y):
+        super().reset(x, y)
         self.life = 20
         self.damage = 1
         self.warning_time = 15
-        self.segments = []
+        self.segments.clear()
     
     def update(self):
         if self.warning_time > 0:
@@ -682,22 +739,22 @@ class LightningBolt(BossAttack):
             if not self.segments:
                 prev_x, prev_y = self.x, 0  # Start from top of screen
                 while prev_y < self.y:
-                    next_y = prev_y + random.randint(10, 30)
-                    next_x = prev_x + random.randint(-10, 10)
+                    next_y = prev_y + sim.randint(10, 30)
+                    next_x = prev_x + sim.randint(-10, 10)
                     self.segments.append((prev_x, prev_y, next_x, next_y))
                     prev_x, prev_y = next_x, next_y
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         if self.warning_time > 0:
             # Draw warning indicator
-            pygame.draw.circle(surface, (255, 255, 0), 
-                              (int(self.x), int(self.y)), 
-                              10, 2)
+            canvas.circle(surface, scale, (255, 255, 0), 
+                         (int(self.x), int(self.y)), 
+                         10, 2)
         else:
             # Draw lightning bolt
             for i, (x1, y1, x2, y2) in enumerate(self.segments):
                 color = (255, 255, 100) if i % 2 == 0 else (200, 200, 255)
-                pygame.draw.line(surface, color, (x1, y1), (x2, y2), 2)
+                canvas.line(surface, scale, color, (x1, y1), (x2, y2), 2)
     
     def check_collision(self, luffy):
         if self.warning_time <= 0:
@@ -0,0 +1,177 @@
+import pygame
+from collections import OrderedDict
+
+# Render scale for the windowed game. World coordinates are always
+# WIDTH x HEIGHT units, whatever the pixels: the display Surface is that size
+# and the window (opened with pygame.SCALED) scales it to whatever size the
+# player drags it to, with mouse positions mapped back for us.
+#
+# The game scene (the island, Luffy, pirates, attacks, power-ups and the
+# boss) is drawn into a scene Surface of the world scaled by the canvas'
+# scale, then scaled up into the frame. The HUD and the menus are drawn
+# straight into the frame at full resolution, on top of the scene. The scale
+# can change from one frame to the next; ResolutionController lowers it when
+# frames go over budget and raises it again once they fit.
+RESOLUTION_SCALES = (1.0, 0.75, 0.5)
+
+class Canvas:
+    def __init__(self, frame, scale=1.0):
+        # frame: the display Surface; scale: one of RESOLUTION_SCALES
+        self.frame = frame
+        self.scale = scale
+        self.scenes = {}
+
+    def scene(self):
+        # Surface to draw this frame's scene into: the frame itself at full
+        # scale
+        if self.scale == 1:
+            return self.frame
+        scene = self.scenes.get(self.scale)
+        if scene is None:
+            width, height = self.frame.get_size()
+            scene = pygame.Surface((round(width * self.scale), round(height * self.scale))).convert()
+            self.scenes[self.scale] = scene
+        return scene
+
+    def show_scene(self, scene):
+        # Scale a reduced scene up into the frame
+        if scene is not self.frame:
+            pygame.transform.scale(scene, self.frame.get_size(), self.frame)
+
+# World-to-canvas transform. Entities draw in world coordinates through these
+# functions, which take the same arguments as pygame.draw and Surface.blit
+# after the surface and the scale of the surface (1 for the frame and for
+# sprites baked at full size). Positions, sizes and line widths are
+# multiplied by the scale, keeping outlines at least a pixel wide; blitted
+# images are scaled once, to the nearest pixel so color keys stay exact, and
+# kept until MAX_SCALED_IMAGES is reached.
+MAX_SCALED_IMAGES = 1024
+
+_scaled_images = OrderedDict()
+
+# The arithmetic is written out in each function: effects such as Thunderbolt
+# Tempo draw thousands of lines a frame, and helper calls would cost more
+# than the smaller scene saves.
+def circle(surface, scale, color, center, radius, width=0):
+    if scale != 1:
+        center = (center[0] * scale, center[1] * scale)
+        radius *= scale
+        width = max(1, round(width * scale)) if width else 0
+    return pygame.draw.circle(surface, color, center, radius, width)
+
+def line(surface, scale, color, start, end, width=1):
+    if scale != 1:
+        start = (start[0] * scale, start[1] * scale)
+        end = (end[0] * scale, end[1] * scale)
+        width = max(1, round(width * scale)) if width else 0
+    return pygame.draw.line(surface, color, start, end, width)
+
+def rect(surface, scale, color, rect, width=0):
+    if scale != 1:
+        x, y, w, h = rect
+        rect = (x * scale, y * scale, w * scale, h * scale)
+        width = max(1, round(width * scale)) if width else 0
+    return pygame.draw.rect(surface, color, rect, width)
+
+def ellipse(surface, scale, color, rect, width=0):
+    if scale != 1:
+        x, y, w, h = rect
+        rect = (x * scale, y * scale, w * scale, h * scale)
+        width = max(1, round(width * scale)) if width else 0
+    return pygame.draw.ellipse(surface, color, rect, width)
+
+def arc(surface, scale, color, rect, start_angle, stop_angle, width=1):
+    if scale != 1:
+        x, y, w, h = rect
+        rect = (x * scale, y * scale, w * scale, h * scale)
+        width = max(1, round(width * scale)) if width else 0
+    return pygame.draw.arc(surface, color, rect, start_angle, stop_angle, width)
+
+def polygon(surface, scale, color, points, width=0):
+    if scale != 1:
+        points = [(x * scale, y * scale) for x, y in points]
+        width = max(1, round(width * scale)) if width else 0
+    return pygame.draw.polygon(surface, color, points, width)
+
+def blit(surface, scale, image, pos):
+    if scale != 1:
+        image = scaled_image(image, scale)
+        pos = (pos[0] * scale, pos[1] * scale)
+    return surface.blit(image, pos)
+
+def scaled_image(image, scale):
+    key = (image, scale)
+    scaled = _scaled_images.get(key)
+    if scaled is not None:
+        _scaled_images.move_to_end(key)
+        return scaled
+
+    width, height = image.get_size()
+    scaled = pygame.transform.scale(image, (max(1, round(width * scale)), max(1, round(height * scale))))
+    _scaled_images[key] = scaled
+    if len(_scaled_images) > MAX_SCALED_IMAGES:
+        _scaled_images.popitem(last=False)
+    return scaled
+
+# Dynamic resolution. The controller is fed the time of every game frame
+# (FrameProfiler.end_frame) and looks at them SCALE_WINDOW frames at a time.
+# When the median frame of a window is over budget, the canvas drops one step
+# of RESOLUTION_SCALES. It only goes back up one step after RAISE_WINDOWS
+# windows in a row with the median under RAISE_FRACTION of the budget, which
+# leaves room for the larger scene. The gap between the two thresholds and
+# the wait keep the scale from flapping between two steps.
+#
+# A smaller scene only pays off when drawing is bound by pixels (fog, beams,
+# big effects); a frame spent on many small draw calls also pays for the
+# scale-up. If the first window after a drop is not faster than the one that
+# caused it, the scale goes back up and stays there for HOLD_WINDOWS windows.
+SCALE_WINDOW = 30
+RAISE_WINDOWS = 4
+RAISE_FRACTION = 0.6
+HOLD_WINDOWS = 20
+
+class ResolutionController:
+    def __init__(self, canvas, budget_ms):
+        self.canvas = canvas
+        self.budget_ms = budget_ms
+        self.samples = []
+        self.calm_windows = 0    # Windows in a row that would allow a raise
+        self.dropped_from = None  # Median of the window that caused the last drop
+        self.hold_windows = 0    # Windows left before the scale may drop again
+
+    def update(self, frame_ms):
+        # Returns True when the scale changed
+        self.samples.append(frame_ms)
+        if len(self.samples) < SCALE_WINDOW:
+            return False
+        median = sorted(self.samples)[len(self.samples) // 2]
+        self.samples.clear()
+
+        step = RESOLUTION_SCALES.index(self.canvas.scale)
+        dropped_from, self.dropped_from = self.dropped_from, None
+        if dropped_from is not None and median >= dropped_from:
+            # The drop didn't help
+            self.hold_windows = HOLD_WINDOWS
+            self.calm_windows = 0
+            self.canvas.scale = RESOLUTION_SCALES[step - 1]
+            return True
+        if self.hold_windows:
+            self.hold_windows -= 1
+
+        if median > self.budget_ms:
+            self.calm_windows = 0
+            if step + 1 < len(RESOLUTION_SCALES) and not self.hold_windows:
+                self.dropped_from = median
+                self.canvas.scale = RESOLUTION_SCALES[step + 1]
+                return True
+            return False
+
+        if median < self.budget_ms * RAISE_FRACTION and step > 0:
+            self.calm_windows += 1
+            if self.calm_windows >= RAISE_WINDOWS:
+                self.calm_windows = 0
+                self.canvas.scale = RESOLUTION_SCALES[step - 1]
+                return True
+        else:
+            self.calm_windows = 0
+        return False
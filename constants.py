@@ -0,0 +1,24 @@
+# Shared game constants
+
+# Screen dimensions
+WIDTH, HEIGHT = 800, 600
+FPS = 60
+
+# Colors
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+BROWN = (139, 69, 19)
+STRAW_HAT_RED = (255, 50, 50)
+LUFFY_SKIN = (255, 204, 153)
+LUFFY_BLUE = (0, 102, 204)
+LUFFY_VEST_RED = (255, 0, 0)
+LUFFY_YELLOW = (255, 255, 0)
+OCEAN_BLUE = (0, 105, 148)
+YELLOW = (255, 255, 0)
+COLOR_KEY = (1, 2, 3)  # Transparent color of pre-rendered sprites; nothing is drawn in it
+
+# Route of islands Luffy sails through
+ISLANDS = ["East Blue", "Alabasta", "Skypiea", "Water 7", "Thriller Bark", "Marineford"]
@@ -1,3 +1,9 @@
+import pygame
+import math
+
+import pools
+from special_attacks import SwordSlash, ThunderAttack, FireStar, DiableJambe, RadicalBeam, WaterWave
+
 # Define crew members
 class CrewMember:
     def __init__(self, name, image=None, ability_name="", ability_cooldown=600):
@@ -38,7 +44,7 @@ class Zoro(CrewMember):
             end_x = game_state_data['luffy'].x + dx
             end_y = game_state_data['luffy'].y + dy
             game_state_data['special_attacks'].append(
-                SwordSlash(game_state_data['luffy'].x, game_state_data['luffy'].y, end_x, end_y)
+                pools.acquire(SwordSlash, game_state_data['luffy'].x, game_state_data['luffy'].y, end_x, end_y)
             )
         return True
 
@@ -49,9 +55,9 @@ class Nami(CrewMember):
     
     def ability_effect(self, game_state_data):
         # Create lightning strikes on all pirates
-        for pirate in game_state_data['pirates'][:]:
+        for pirate in game_state_data['pirates']:
             game_state_data['special_attacks'].append(
-                ThunderAttack(pirate.x, pirate.y)
+                pools.acquire(ThunderAttack, pirate.x, pirate.y)
             )
         return True
 
@@ -69,7 +75,7 @@ class Usopp(CrewMember):
             end_x = game_state_data['luffy'].x + dx
             end_y = game_state_data['luffy'].y + dy
             game_state_data['special_attacks'].append(
-                FireStar(game_state_data['luffy'].x, game_state_data['luffy'].y, end_x, end_y)
+                pools.acquire(FireStar, game_state_data['luffy'].x, game_state_data['luffy'].y, end_x, end_y)
             )
         return True
 
@@ -93,7 +99,7 @@ class Chopper(CrewMember):
     def ability_effect(self, game_state_data):
         # Heal Luffy (would be implemented if health system was added)
         # For now, clear all pirates on screen
-        for pirate in game_state_data['pirates'][:]:
+        for pirate in game_state_data['pirates']:
             game_state_data['pirates'].remove(pirate)
             game_state_data['score'] += 1
         return True
@@ -117,7 +123,7 @@ class Franky(CrewMember):
     
     def ability_effect(self, game_state_data):
         # Fire a powerful beam across the screen
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = game_state_data.get('mouse_pos') or pygame.mouse.get_pos()
         game_state_data['special_attacks'].append(
             RadicalBeam(game_state_data['luffy'].x, game_state_data['luffy'].y, 
                        mouse_pos[0], mouse_pos[1])
@@ -0,0 +1,61 @@
+import pygame
+
+# Opt-in renderer that only repaints the parts of the screen that changed.
+# Each frame the caller passes the rects it is about to draw over. The
+# renderer restores the background under those and under last frame's rects,
+# and after drawing pushes just those regions to the display. When an area
+# is unknown or too much of the screen is dirty it falls back to a full
+# redraw and flip.
+MAX_DIRTY_FRACTION = 0.4
+
+class DirtyRectRenderer:
+    def __init__(self, screen, max_dirty_fraction=MAX_DIRTY_FRACTION):
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.max_dirty_area = self.screen_rect.width * self.screen_rect.height * max_dirty_fraction
+        self.previous = None  # Rects painted last frame, None forces a full redraw
+        self.current = None
+        self.dirty = None
+        self.stats = {'partial': 0, 'full': 0}
+
+    def invalidate(self):
+        # The screen was redrawn some other way
+        self.previous = None
+
+    def begin(self, background, rects):
+        # Restore the background under this frame's and last frame's rects.
+        # Returns False when the caller has to redraw the whole screen.
+        self.current = rects
+        self.dirty = None
+        if background is None or rects is None or self.previous is None:
+            return False
+
+        dirty = []
+        area = 0
+        for rect in self.previous + rects:
+            rect = rect.clip(self.screen_rect)
+            if rect.width and rect.height:
+                dirty.append(rect)
+                area += rect.width * rect.height
+        if area > self.max_dirty_area:
+            return False
+
+        for rect in dirty:
+            self.screen.blit(background, rect, rect)
+        self.dirty = dirty
+        return True
+
+    def present(self, extra_rects=()):
+        # Push this frame to the display. extra_rects are areas drawn after
+        # begin() without being passed to it, like the HUD.
+        if self.dirty is None:
+            pygame.display.flip()
+            self.stats['full'] += 1
+        else:
+            pygame.display.update(self.dirty + list(extra_rects))
+            self.stats['partial'] += 1
+
+        if self.current is None:
+            self.previous = None
+        else:
+            self.previous = self.current + list(extra_rects)
@@ -0,0 +1,109 @@
+import pygame
+import threading
+from collections import OrderedDict
+
+# Shared fonts, created on first use so that importing a module never
+# needs pygame.font to be initialized
+_fonts = {}
+
+# Islands are built on a worker thread (see islands.IslandRoute), so font
+# creation and the text cache are guarded by a lock
+_lock = threading.RLock()
+
+def get_font(size):
+    font = _fonts.get(size)
+    if font is None:
+        with _lock:
+            font = _fonts.get(size)
+            if font is None:
+                if not pygame.font.get_init():
+                    pygame.font.init()
+                try:
+                    font = pygame.font.Font(None, size)
+                except:
+                    font = pygame.font.SysFont('Arial', size)
+                _fonts[size] = font
+    return font
+
+# Rendered text surfaces, keyed by (font, text, color, shadow, offset). Text
+# that doesn't change between frames is rendered once and blitted from here;
+# the least recently used entries are dropped once the cache is full.
+TEXT_CACHE_SIZE = 256
+_text_cache = OrderedDict()
+text_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+def render_text(font, text, color, shadow=None, offset=2):
+    # With a shadow color, the returned surface holds the text at (0, 0) and
+    # its shadow `offset` pixels down and to the right, ready for one blit
+    key = (font, text, color, shadow, offset)
+    with _lock:
+        surface = _text_cache.get(key)
+        if surface is not None:
+            _text_cache.move_to_end(key)
+            text_stats['hits'] += 1
+            return surface
+
+        text_stats['misses'] += 1
+        surface = font.render(text, True, color)
+        if shadow is not None:
+            shadow_surface = font.render(text, True, shadow)
+            combined = pygame.Surface((surface.get_width() + offset, surface.get_height() + offset),
+                                      pygame.SRCALPHA)
+            combined.blit(shadow_surface, (offset, offset))
+            combined.blit(surface, (0, 0))
+            surface = combined
+
+        _text_cache[key] = surface
+        if len(_text_cache) > TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)
+            text_stats['evictions'] += 1
+        return surface
+
+def text_cache_info():
+    lookups = text_stats['hits'] + text_stats['misses']
+    info = dict(text_stats)
+    info['size'] = len(_text_cache)
+    info['hit_rate'] = text_stats['hits'] / lookups if lookups else 0.0
+    return info
+
+# Pre-rendered digit glyphs for numbers that change every few frames, like the
+# score. Numbers are composed from the glyphs instead of being re-rendered.
+class DigitAtlas:
+    def __init__(self, font, color, shadow=None, offset=2):
+        self.shadow = shadow
+        self.offset = offset
+        self.glyphs = {}
+        self.shadow_glyphs = {}
+        for char in "0123456789-":
+            self.glyphs[char] = font.render(char, True, color)
+            if shadow is not None:
+                self.shadow_glyphs[char] = font.render(char, True, shadow)
+
+    def width(self, value):
+        return sum(self.glyphs[char].get_width() for char in str(value))
+
+    def draw(self, surface, value, x, y):
+        # Draw all the shadows first so they never cover a digit
+        text = str(value)
+        if self.shadow is not None:
+            shadow_x = x + self.offset
+            for char in text:
+                glyph = self.shadow_glyphs[char]
+                surface.blit(glyph, (shadow_x, y + self.offset))
+                shadow_x += glyph.get_width()
+
+        for char in text:
+            glyph = self.glyphs[char]
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return x
+
+_digit_atlases = {}
+
+def get_digit_atlas(font, color, shadow=None, offset=2):
+    key = (font, color, shadow, offset)
+    atlas = _digit_atlases.get(key)
+    if atlas is None:
+        atlas = DigitAtlas(font, color, shadow, offset)
+        _digit_atlases[key] = atlas
+    return atlas
@@ -1,162 +1,213 @@
 import pygame
-import random
 import math
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import particles
+import rng
+from fonts import get_font, render_text
 
 # Island background classes
 class Island:
-    def __init__(self, width, height):
+    def __init__(self, width, height, rand=None):
+        # rand: the random.Random the scenery is laid out with (rng.fx by
+        # default)
         self.width = width
         self.height = height
+        self.rand = rand if rand is not None else rng.fx
         self.name = "Island"
         self.base_color = (0, 100, 200)  # Ocean blue
         self.elements = []
         self.create_elements()
+        self.bake()
     
     def create_elements(self):
         # Override in subclasses
         pass
     
-    def draw(self, surface):
-        # Draw base ocean
-        surface.fill(self.base_color)
-        
-        # Draw elements
+    def bake(self):
+        # Draw the ocean and every element that never moves into one cached
+        # surface; only the animated elements are updated and drawn per frame
+        self.background = pygame.Surface((self.width, self.height))
+        self.background.fill(self.base_color)
         for element in self.elements:
-            element.draw(surface)
+            if not element.animated:
+                element.draw(self.background)
+        if pygame.display.get_surface() is not None:
+            self.background = self.background.convert()
+        self.scaled_backgrounds = {}
+        
+        self.animated_elements = [element for element in self.elements if element.animated]
+    
+    def draw(self, surface, scale=1.0):
+        # Draw baked background
+        surface.blit(self.scaled_background(scale), (0, 0))
+        self.draw_elements(surface, scale)
+    
+    def scaled_background(self, scale):
+        # The baked background for a scene drawn at scale (see canvas.py),
+        # scaled once per scale
+        if scale == 1:
+            return self.background
+        background = self.scaled_backgrounds.get(scale)
+        if background is None:
+            size = (round(self.width * scale), round(self.height * scale))
+            background = pygame.transform.smoothscale(self.background, size)
+            self.scaled_backgrounds[scale] = background
+        return background
+    
+    def draw_elements(self, surface, scale=1.0):
+        # Draw animated elements
+        for element in self.animated_elements:
+            element.draw(surface, scale)
+    
+    def draw_rects(self):
+        # Screen areas draw_elements() will paint, for the dirty-rect renderer
+        return [element.get_draw_rect() for element in self.animated_elements]
     
     def update(self):
-        for element in self.elements:
-            element.update()
+        for element in self.animated_elements:
+            element.update(self.width, self.height)
 
 class EastBlue(Island):
-    def __init__(self, width, height):
+    def __init__(self, width, height, rand=None):
         self.name = "East Blue"
         self.base_color = (0, 120, 200)  # Bright blue ocean
-        super().__init__(width, height)
+        super().__init__(width, height, rand)
     
     def create_elements(self):
+        rand = self.rand
         # Create clouds
         for _ in range(10):
             self.elements.append(Cloud(
-                random.randint(0, self.width),
-                random.randint(20, self.height//3),
-                random.randint(80, 200),
-                random.randint(40, 80),
-                random.uniform(0.2, 0.8)
+                rand.randint(0, self.width),
+                rand.randint(20, self.height//3),
+                rand.randint(80, 200),
+                rand.randint(40, 80),
+                rand.uniform(0.2, 0.8)
             ))
         
         # Create small islands
         for _ in range(3):
             self.elements.append(SmallIsland(
-                random.randint(100, self.width - 100),
-                random.randint(100, self.height - 100),
-                random.randint(50, 100)
+                rand.randint(100, self.width - 100),
+                rand.randint(100, self.height - 100),
+                rand.randint(50, 100)
             ))
 
 class Alabasta(Island):
-    def __init__(self, width, height):
+    def __init__(self, width, height, rand=None):
         self.name = "Alabasta"
         self.base_color = (200, 180, 140)  # Desert sand color
-        super().__init__(width, height)
+        super().__init__(width, height, rand)
     
     def create_elements(self):
+        rand = self.rand
         # Create sand dunes
         for _ in range(5):
             self.elements.append(SandDune(
-                random.randint(0, self.width),
-                random.randint(self.height//2, self.height),
-                random.randint(100, 300),
-                random.randint(50, 100)
+                rand.randint(0, self.width),
+                rand.randint(self.height//2, self.height),
+                rand.randint(100, 300),
+                rand.randint(50, 100)
             ))
         
         # Create palm trees
         for _ in range(8):
             self.elements.append(PalmTree(
-                random.randint(50, self.width - 50),
-                random.randint(self.height//2, self.height - 50),
-                random.randint(30, 50)
+                rand.randint(50, self.width - 50),
+                rand.randint(self.height//2, self.height - 50),
+                rand.randint(30, 50)
             ))
 
 class Skypiea(Island):
-    def __init__(self, width, height):
+    def __init__(self, width, height, rand=None):
         self.name = "Skypiea"
         self.base_color = (135, 206, 235)  # Sky blue
-        super().__init__(width, height)
+        super().__init__(width, height, rand)
     
     def create_elements(self):
+        rand = self.rand
         # Create cloud islands
         for _ in range(4):
             self.elements.append(CloudIsland(
-                random.randint(100, self.width - 100),
-                random.randint(100, self.height - 100),
-                random.randint(80, 150)
+                rand.randint(100, self.width - 100),
+                rand.randint(100, self.height - 100),
+                rand.randint(80, 150),
+                rand
             ))
         
         # Create more clouds
         for _ in range(15):
             self.elements.append(Cloud(
-                random.randint(0, self.width),
-                random.randint(20, self.height - 100),
-                random.randint(60, 150),
-                random.randint(30, 60),
-                random.uniform(0.1, 0.5)
+                rand.randint(0, self.width),
+                rand.randint(20, self.height - 100),
+                rand.randint(60, 150),
+                rand.randint(30, 60),
+                rand.uniform(0.1, 0.5)
             ))
 
 class WaterSeven(Island):
-    def __init__(self, width, height):
+    def __init__(self, width, height, rand=None):
         self.name = "Water 7"
         self.base_color = (0, 80, 150)  # Deep blue water
-        super().__init__(width, height)
+        super().__init__(width, height, rand)
     
     def create_elements(self):
+        rand = self.rand
         # Create buildings
         for _ in range(10):
             self.elements.append(Building(
-                random.randint(50, self.width - 50),
-                random.randint(self.height//2, self.height - 50),
-                random.randint(30, 80),
-                random.randint(80, 150)
+                rand.randint(50, self.width - 50),
+                rand.randint(self.height//2, self.height - 50),
+                rand.randint(30, 80),
+                rand.randint(80, 150)
             ))
         
         # Create water canals
         for _ in range(5):
             self.elements.append(Canal(
-                random.randint(0, self.width),
-                random.randint(self.height//2, self.height),
-                random.randint(100, 300),
-                random.randint(20, 40)
+                rand.randint(0, self.width),
+                rand.randint(self.height//2, self.height),
+                rand.randint(100, 300),
+                rand.randint(20, 40),
+                rand
             ))
 
 class ThrillerBark(Island):
-    def __init__(self, width, height):
+    def __init__(self, width, height, rand=None):
         self.name = "Thriller Bark"
         self.base_color = (50, 50, 70)  # Dark, spooky color
-        super().__init__(width, height)
+        super().__init__(width, height, rand)
     
     def create_elements(self):
+        rand = self.rand
         # Create spooky trees
         for _ in range(15):
             self.elements.append(SpookyTree(
-                random.randint(50, self.width - 50),
-                random.randint(self.height//2, self.height - 50),
-                random.randint(40, 80)
+                rand.randint(50, self.width - 50),
+                rand.randint(self.height//2, self.height - 50),
+                rand.randint(40, 80),
+                rand
             ))
         
         # Create fog patches
         for _ in range(8):
             self.elements.append(FogPatch(
-                random.randint(0, self.width),
-                random.randint(0, self.height),
-                random.randint(100, 200)
+                rand.randint(0, self.width),
+                rand.randint(0, self.height),
+                rand.randint(100, 200),
+                rand
             ))
 
 class Marineford(Island):
-    def __init__(self, width, height):
+    def __init__(self, width, height, rand=None):
         self.name = "Marineford"
         self.base_color = (0, 100, 180)  # Ocean blue
-        super().__init__(width, height)
+        super().__init__(width, height, rand)
     
     def create_elements(self):
+        rand = self.rand
         # Create marine headquarters
         self.elements.append(MarineHQ(
             self.width // 2,
@@ -168,44 +219,108 @@ class Marineford(Island):
         # Create marine ships
         for _ in range(6):
             self.elements.append(Ship(
-                random.randint(50, self.width - 50),
-                random.randint(50, self.height - 50),
-                random.randint(40, 80),
-                (200, 200, 200)  # White for marine ships
+                rand.randint(50, self.width - 50),
+                rand.randint(50, self.height - 50),
+                rand.randint(40, 80),
+                (200, 200, 200),  # White for marine ships
+                rand
             ))
 
+# The islands of the route, built on demand instead of all at startup. get()
+# returns the island Luffy is on, building it if it isn't ready, and starts
+# building the next island of the route on a worker thread, so the Log Pose
+# transition finds it finished. Built islands are kept for when the route
+# comes around again.
+#
+# Each island's scenery draws from its own random.Random, seeded from one
+# value the route takes from rng.fx when it is created. The worker thread
+# never touches rng.fx, which the main thread keeps using, and a seeded game
+# gets the same island layouts every run.
+class IslandRoute:
+    def __init__(self, island_classes, width, height, prefetch=True):
+        self.island_classes = island_classes
+        self.width = width
+        self.height = height
+        self.built = {}
+        self.pending = {}  # Index -> Future of an island being built
+        self.seed = rng.fx.getrandbits(64)
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="island") if prefetch else None
+    
+    def __len__(self):
+        return len(self.island_classes)
+    
+    def build(self, index):
+        rand = random.Random(self.seed ^ index)
+        return self.island_classes[index](self.width, self.height, rand)
+    
+    def get(self, index):
+        island = self.built.get(index)
+        if island is None:
+            future = self.pending.pop(index, None)
+            island = future.result() if future is not None else self.build(index)
+            self.built[index] = island
+            self.prefetch((index + 1) % len(self))
+        return island
+    
+    def prefetch(self, index):
+        # Start building an island in the background
+        if self.executor is None or index in self.built or index in self.pending:
+            return
+        self.pending[index] = self.executor.submit(self.build, index)
+    
+    def shutdown(self):
+        # Finish the build in progress, if any, and drop the queued ones
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+ROUTE = [EastBlue, Alabasta, Skypiea, WaterSeven, ThrillerBark, Marineford]
+
 # Background element classes
 class BackgroundElement:
+    __slots__ = ('x', 'y')
+    animated = False  # Static elements are baked into the island background
+    
     def __init__(self, x, y):
         self.x = x
         self.y = y
     
-    def update(self):
+    def update(self, width, height):
+        # Animated elements move within the island's width x height
         pass
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
+        # Static elements are only drawn once, into the baked background;
+        # animated ones also draw into scenes of the island at scale
         pass
 
 class Cloud(BackgroundElement):
+    __slots__ = ('width', 'height', 'speed')
+    animated = True
+    
     def __init__(self, x, y, width, height, speed):
         super().__init__(x, y)
         self.width = width
         self.height = height
         self.speed = speed
     
-    def update(self):
+    def update(self, width, height):
         self.x += self.speed
-        if self.x > 800 + self.width:
+        if self.x > width + self.width:
             self.x = -self.width
     
-    def draw(self, surface):
+    def get_draw_rect(self):
+        return pygame.Rect(int(self.x) - 1, int(self.y) - 1, self.width + 2, self.height + 2)
+    
+    def draw(self, surface, scale=1.0):
         pygame.draw.ellipse(surface, (230, 230, 230), 
-                          (self.x, self.y, self.width, self.height))
+                          (self.x * scale, self.y * scale, self.width * scale, self.height * scale))
         pygame.draw.ellipse(surface, (200, 200, 200), 
-                          (self.x + self.width//4, self.y + self.height//4, 
-                           self.width//2, self.height//2))
+                          ((self.x + self.width//4) * scale, (self.y + self.height//4) * scale, 
+                           self.width//2 * scale, self.height//2 * scale))
 
 class SmallIsland(BackgroundElement):
+    __slots__ = ('size', 'color')
+    
     def __init__(self, x, y, size):
         super().__init__(x, y)
         self.size = size
@@ -219,6 +334,8 @@ class SmallIsland(BackgroundElement):
         pygame.draw.circle(surface, (240, 220, 130), (self.x, self.y), self.size, 10)
 
 class SandDune(BackgroundElement):
+    __slots__ = ('width', 'height', 'color')
+    
     def __init__(self, x, y, width, height):
         super().__init__(x, y)
         self.width = width
@@ -241,6 +358,8 @@ class SandDune(BackgroundElement):
         pygame.draw.polygon(surface, self.color, points)
 
 class PalmTree(BackgroundElement):
+    __slots__ = ('size', 'trunk_color', 'leaf_color')
+    
     def __init__(self, x, y, size):
         super().__init__(x, y)
         self.size = size
@@ -268,17 +387,20 @@ class PalmTree(BackgroundElement):
             ])
 
 class CloudIsland(BackgroundElement):
-    def __init__(self, x, y, size):
+    __slots__ = ('size', 'cloud_color', 'dirt_color', 'puffs')
+    
+    def __init__(self, x, y, size, rand=None):
         super().__init__(x, y)
+        rand = rand if rand is not None else rng.fx
         self.size = size
         self.cloud_color = (255, 255, 255)
         self.dirt_color = (150, 100, 50)
+        self.puffs = [(rand.randint(-size//2, size//2), rand.randint(-size//4, size//4))
+                      for _ in range(5)]
     
     def draw(self, surface):
         # Draw cloud base
-        for i in range(5):
-            offset_x = random.randint(-self.size//2, self.size//2)
-            offset_y = random.randint(-self.size//4, self.size//4)
+        for offset_x, offset_y in self.puffs:
             pygame.draw.circle(surface, self.cloud_color, 
                               (self.x + offset_x, self.y + offset_y), 
                               self.size//2)
@@ -294,6 +416,8 @@ class CloudIsland(BackgroundElement):
                            self.size, self.size//2), 5)
 
 class Building(BackgroundElement):
+    __slots__ = ('width', 'height', 'color', 'window_color')
+    
     def __init__(self, x, y, width, height):
         super().__init__(x, y)
         self.width = width
@@ -317,12 +441,18 @@ class Building(BackgroundElement):
                                  window_size, window_size))
 
 class Canal(BackgroundElement):
-    def __init__(self, x, y, length, width):
+    __slots__ = ('length', 'width', 'color', 'angle', 'ripples')
+    
+    def __init__(self, x, y, length, width, rand=None):
         super().__init__(x, y)
+        rand = rand if rand is not None else rng.fx
         self.length = length
         self.width = width
         self.color = (0, 100, 200)  # Blue for water
-        self.angle = random.uniform(0, math.pi)
+        self.angle = rand.uniform(0, math.pi)
+        # Offset across the canal, position along it and radius of each ripple
+        self.ripples = [(rand.randint(-width//2, width//2), rand.random(), rand.randint(2, 5))
+                        for _ in range(5)]
     
     def draw(self, surface):
         # Calculate end points
@@ -338,27 +468,28 @@ class Canal(BackgroundElement):
                         self.width)
         
         # Draw ripples
-        for _ in range(5):
-            offset = random.randint(-self.width//2, self.width//2)
-            pos = random.random()
+        for offset, pos, radius in self.ripples:
             ripple_x = start_x + (end_x - start_x) * pos + math.sin(self.angle) * offset
             ripple_y = start_y + (end_y - start_y) * pos - math.cos(self.angle) * offset
             
             pygame.draw.circle(surface, (100, 200, 255), 
                               (int(ripple_x), int(ripple_y)), 
-                              random.randint(2, 5))
+                              radius)
 
 class SpookyTree(BackgroundElement):
-    def __init__(self, x, y, height):
+    __slots__ = ('height', 'trunk_color', 'branches')
+    
+    def __init__(self, x, y, height, rand=None):
         super().__init__(x, y)
         self.height = height
         self.trunk_color = (50, 30, 20)  # Dark brown
         self.branches = []
         
         # Create branches
-        self.create_branches(self.x, self.y, -self.height, 0, self.height//4, 3)
+        self.create_branches(rand if rand is not None else rng.fx,
+                             self.x, self.y, -self.height, 0, self.height//4, 3)
     
-    def create_branches(self, x, y, dx, dy, length, depth):
+    def create_branches(self, rand, x, y, dx, dy, length, depth):
         if depth <= 0:
             return
         
@@ -368,18 +499,18 @@ class SpookyTree(BackgroundElement):
         self.branches.append((x, y, end_x, end_y, length//2))
         
         # Create sub-branches
-        angle1 = math.atan2(dy, dx) + random.uniform(0.3, 0.8)
-        angle2 = math.atan2(dy, dx) - random.uniform(0.3, 0.8)
+        angle1 = math.atan2(dy, dx) + rand.uniform(0.3, 0.8)
+        angle2 = math.atan2(dy, dx) - rand.uniform(0.3, 0.8)
         
-        length_factor = random.uniform(0.6, 0.8)
+        length_factor = rand.uniform(0.6, 0.8)
         new_length = length * length_factor
         
-        self.create_branches(end_x, end_y, 
+        self.create_branches(rand, end_x, end_y, 
                            math.cos(angle1) * new_length, 
                            math.sin(angle1) * new_length, 
                            new_length, depth - 1)
         
-        self.create_branches(end_x, end_y, 
+        self.create_branches(rand, end_x, end_y, 
                            math.cos(angle2) * new_length, 
                            math.sin(angle2) * new_length, 
                            new_length, depth - 1)
@@ -395,54 +526,63 @@ class SpookyTree(BackgroundElement):
             pygame.draw.line(surface, self.trunk_color, 
                             (x1, y1), 
                             (x2, y2), 
-                            max(1, width//2))
+                            max(1, int(width//2)))
 
 class FogPatch(BackgroundElement):
-    def __init__(self, x, y, size):
+    __slots__ = ('size', 'color', 'particles', 'surface')
+    animated = True
+    
+    def __init__(self, x, y, size, rand=None):
         super().__init__(x, y)
+        rand = rand if rand is not None else rng.fx
         self.size = size
         self.color = (200, 200, 200, 100)  # Semi-transparent gray
-        self.particles = []
+        self.particles = particles.ParticleSystem(20)
+        self.surface = None
         
         # Create fog particles
         for _ in range(20):
-            self.particles.append({
-                'x': self.x + random.uniform(-self.size/2, self.size/2),
-                'y': self.y + random.uniform(-self.size/2, self.size/2),
-                'size': random.randint(20, 50),
-                'dx': random.uniform(-0.5, 0.5),
-                'dy': random.uniform(-0.2, 0.2)
-            })
+            self.particles.emit(
+                x=self.x + rand.uniform(-self.size/2, self.size/2),
+                y=self.y + rand.uniform(-self.size/2, self.size/2),
+                size=rand.randint(20, 50),
+                dx=rand.uniform(-0.5, 0.5),
+                dy=rand.uniform(-0.2, 0.2)
+            )
     
-    def update(self):
-        for particle in self.particles:
-            particle['x'] += particle['dx']
-            particle['y'] += particle['dy']
-            
-            # Wrap around if out of bounds
-            if particle['x'] > self.x + self.size/2:
-                particle['x'] = self.x - self.size/2
-            elif particle['x'] < self.x - self.size/2:
-                particle['x'] = self.x + self.size/2
-            
-            if particle['y'] > self.y + self.size/2:
-                particle['y'] = self.y - self.size/2
-            elif particle['y'] < self.y - self.size/2:
-                particle['y'] = self.y + self.size/2
+    def update(self, width, height):
+        self.particles.integrate()
+        
+        # Wrap around if out of bounds
+        self.particles.wrap(self.x - self.size/2, self.y - self.size/2,
+                            self.x + self.size/2, self.y + self.size/2)
     
-    def draw(self, surface):
-        # Create a surface with alpha for transparency
-        s = pygame.Surface((800, 600), pygame.SRCALPHA)
+    def get_draw_rect(self):
+        # The patch plus the largest particle
+        return pygame.Rect(int(self.x - self.size//2) - 52, int(self.y - self.size//2) - 52, 
+                           self.size + 104, self.size + 104)
+    
+    def draw(self, surface, scale=1.0):
+        # Reuse one transparent surface covering the patch plus the largest
+        # particle, remade when the scale changes
+        side = round((self.size + 104) * scale)
+        if self.surface is None or self.surface.get_width() != side:
+            self.surface = pygame.Surface((side, side), pygame.SRCALPHA)
+        rect = self.get_draw_rect()
+        left, top = int(rect.left * scale), int(rect.top * scale)
+        self.surface.fill((0, 0, 0, 0))
         
         # Draw fog particles
-        for particle in self.particles:
-            pygame.draw.circle(s, self.color, 
-                              (int(particle['x']), int(particle['y'])), 
-                              particle['size'])
+        for x, y, size in zip(*self.particles.snapshot('x', 'y', 'size')):
+            pygame.draw.circle(self.surface, self.color, 
+                              (int(x * scale) - left, int(y * scale) - top), 
+                              int(size * scale))
         
-        surface.blit(s, (0, 0))
+        surface.blit(self.surface, (left, top))
 
 class MarineHQ(BackgroundElement):
+    __slots__ = ('width', 'height', 'building_color', 'roof_color')
+    
     def __init__(self, x, y, width, height):
         super().__init__(x, y)
         self.width = width
@@ -473,47 +613,56 @@ class MarineHQ(BackgroundElement):
                           symbol_size - 5)
         
         # Draw "MARINE" text
-        font = pygame.font.Font(None, 36)
-        text = font.render("MARINE", True, (0, 0, 100))
+        text = render_text(get_font(36), "MARINE", (0, 0, 100))
         surface.blit(text, (self.x - text.get_width()//2, 
                            self.y - self.height//2 - text.get_height()//2))
 
 class Ship(BackgroundElement):
-    def __init__(self, x, y, size, color):
+    __slots__ = ('size', 'color', 'angle', 'speed')
+    animated = True
+    
+    def __init__(self, x, y, size, color, rand=None):
         super().__init__(x, y)
+        rand = rand if rand is not None else rng.fx
         self.size = size
         self.color = color
-        self.angle = random.uniform(0, 2*math.pi)
-        self.speed = random.uniform(0.2, 0.5)
+        self.angle = rand.uniform(0, 2*math.pi)
+        self.speed = rand.uniform(0.2, 0.5)
     
-    def update(self):
+    def update(self, width, height):
         self.x += math.cos(self.angle) * self.speed
         self.y += math.sin(self.angle) * self.speed
         
         # Wrap around if out of bounds
         if self.x < -self.size:
-            self.x = 800 + self.size
-        elif self.x > 800 + self.size:
+            self.x = width + self.size
+        elif self.x > width + self.size:
             self.x = -self.size
         
         if self.y < -self.size:
-            self.y = 600 + self.size
-        elif self.y > 600 + self.size:
+            self.y = height + self.size
+        elif self.y > height + self.size:
             self.y = -self.size
     
-    def draw(self, surface):
+    def get_draw_rect(self):
+        # Hull below, sail and mast above
+        top = int(self.size * 1.5) + 1
+        return pygame.Rect(int(self.x) - self.size - 1, int(self.y) - top, 
+                           self.size * 2 + 2, top + self.size//2 + 2)
+    
+    def draw(self, surface, scale=1.0):
         # Draw ship hull
         pygame.draw.ellipse(surface, self.color, 
-                          (self.x - self.size, self.y - self.size//2, 
-                           self.size*2, self.size))
+                          ((self.x - self.size) * scale, (self.y - self.size//2) * scale, 
+                           self.size*2 * scale, self.size * scale))
         
         # Draw sail
         sail_height = self.size * 1.5
         pygame.draw.rect(surface, (255, 255, 255), 
-                        (self.x - self.size//4, self.y - sail_height, 
-                         self.size//2, sail_height))
+                        ((self.x - self.size//4) * scale, (self.y - sail_height) * scale, 
+                         self.size//2 * scale, sail_height * scale))
         
         # Draw mast
         pygame.draw.rect(surface, (139, 69, 19), 
-                        (self.x - 2, self.y - sail_height, 
-                         4, sail_height))
+                        ((self.x - 2) * scale, (self.y - sail_height) * scale, 
+                         4 * scale, sail_height * scale))
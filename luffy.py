@@ -0,0 +1,517 @@
+import pygame
+import math
+
+import canvas
+from constants import *
+from fonts import get_font, render_text
+import particles
+import sprite_atlas
+from rng import sim, fx
+
+# Luffy's body is drawn from pre-rendered frames: one per whole-pixel bob
+# offset for the normal pose, and GEAR_FOURTH_VARIANTS per offset for Gear
+# Fourth, whose haki pattern and steam flicker between them. Frames are
+# rendered all at once the first time Luffy is drawn, and shared by every
+# Luffy with the same look. F4 in game flips use_cached_frames to compare
+# with drawing him procedurally every frame.
+BOB_PIXELS = 3  # Luffy bobs by sin(frame) * 3
+GEAR_FOURTH_VARIANTS = 4
+
+use_cached_frames = True
+_frames = {}  # Luffy.appearance() -> {(gear_fourth, bob, variant): (sprite, half size)}
+
+class Luffy:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.radius = 35  # Increased size
+        self.skin_color = LUFFY_SKIN
+        self.hat_color = STRAW_HAT_RED
+        self.vest_color = LUFFY_VEST_RED
+        self.cooldown = 0
+        self.max_cooldown = 8  # Faster punches
+        self.special_cooldown = 0
+        self.max_special_cooldown = 240  # 4 seconds cooldown
+        self.has_devil_fruit = True
+        self.scar_under_eye = True
+        self.combo_count = 0
+        self.combo_timer = 0
+        self.combo_max_time = 60  # 1 second to continue combo
+        self.current_attack = 0  # 0: normal punch, 1: gatling, 2: bazooka, 3: rifle
+        
+        # Animation variables
+        self.frame = 0
+        self.animation_speed = 0.1
+        
+        # Gear Fourth state (granted by the Devil Fruit power-up)
+        self.gear_fourth_active = False
+        self.gear_fourth_time = 0
+        
+    def draw(self, surface, scale=1.0):
+        # Animate slight bobbing
+        bob = math.sin(self.frame) * BOB_PIXELS
+        
+        if use_cached_frames:
+            variant = int(self.frame * 10) % GEAR_FOURTH_VARIANTS if self.gear_fourth_active else 0
+            sprite, half = self.cached_frame(self.gear_fourth_active, round(bob), variant)
+            canvas.blit(surface, scale, sprite, (int(self.x) - half, int(self.y) - half))
+        # Check if in Gear Fourth mode
+        elif self.gear_fourth_active:
+            self.draw_gear_fourth(surface, bob, scale)
+        else:
+            self.draw_normal(surface, bob, scale)
+        
+        # Draw cooldown indicators
+        if self.special_cooldown > 0:
+            cooldown_percent = self.special_cooldown / self.max_special_cooldown
+            canvas.rect(surface, scale, RED, (self.x - 30, self.y - self.radius*2 - 20 + bob, 60, 10))
+            canvas.rect(surface, scale, GREEN, (self.x - 30, self.y - self.radius*2 - 20 + bob, 
+                                       60 * (1 - cooldown_percent), 10))
+            gear_text = render_text(get_font(32), "GEAR", WHITE)
+            canvas.blit(surface, scale, gear_text, (self.x - gear_text.get_width()//2, self.y - self.radius*2 - 40 + bob))
+        
+        # Draw combo counter if active
+        if self.combo_count > 0 and self.combo_timer > 0:
+            combo_text = render_text(get_font(32), f"{self.combo_count} Hit Combo!", YELLOW)
+            canvas.blit(surface, scale, combo_text, (self.x - combo_text.get_width()//2, self.y - self.radius*2 - 70 + bob))
+    
+    def get_draw_rect(self):
+        # Area covered by draw(), including Gear Fourth, the cooldown bar and
+        # the combo counter above Luffy's head
+        reach = self.radius * 3 + 10
+        top = self.radius * 2 + 80
+        bottom = int(self.radius * 2.5) + 10
+        return pygame.Rect(int(self.x) - reach, int(self.y) - top, reach * 2, top + bottom)
+    
+    def appearance(self):
+        return (self.radius, self.skin_color, self.hat_color, self.vest_color, self.scar_under_eye)
+    
+    def cached_frame(self, gear_fourth, bob, variant):
+        frames = _frames.get(self.appearance())
+        if frames is None:
+            frames = _frames[self.appearance()] = self.render_frames()
+        return frames[gear_fourth, bob, variant]
+    
+    def render_frames(self):
+        # Draw every frame into its own color-keyed sprite centered on Luffy,
+        # moving him to the sprite's center while drawing
+        frames = {}
+        x, y = self.x, self.y
+        try:
+            for gear_fourth, variants, half in ((False, 1, int(self.radius * 2.5) + 5),
+                                                (True, GEAR_FOURTH_VARIANTS, self.radius * 3)):
+                for bob in range(-BOB_PIXELS, BOB_PIXELS + 1):
+                    for variant in range(variants):
+                        sprite = pygame.Surface((half * 2, half * 2))
+                        sprite.fill(COLOR_KEY)
+                        self.x = self.y = half
+                        if gear_fourth:
+                            self.draw_gear_fourth(sprite, bob)
+                        else:
+                            self.draw_normal(sprite, bob)
+                        if pygame.display.get_surface() is not None:
+                            sprite = sprite.convert()
+                        sprite.set_colorkey(COLOR_KEY, pygame.RLEACCEL)
+                        frames[gear_fourth, bob, variant] = (sprite, half)
+        finally:
+            self.x, self.y = x, y
+        return frames
+    
+    def draw_normal(self, surface, bob, scale=1.0):
+        # Draw Luffy's legs
+        canvas.rect(surface, scale, BLUE, 
+                   (self.x - self.radius//1.5, self.y + self.radius//2, 
+                    self.radius//1.5, self.radius*1.2))
+        canvas.rect(surface, scale, BLUE, 
+                   (self.x, self.y + self.radius//2, 
+                    self.radius//1.5, self.radius*1.2))
+        
+        # Draw Luffy's body/torso
+        canvas.circle(surface, scale, self.skin_color, (self.x, self.y + bob), self.radius)
+        
+        # Draw Luffy's red vest - more detailed
+        vest_rect = pygame.Rect(self.x - self.radius, self.y - self.radius + bob, 
+                               self.radius * 2, self.radius * 2)
+        canvas.arc(surface, scale, self.vest_color, vest_rect,
+                  math.pi/4, math.pi*7/4, self.radius//1)
+        
+        # Draw vest details - yellow buttons
+        for i in range(3):
+            button_y = self.y + (i - 1) * self.radius//2 + bob
+            canvas.circle(surface, scale, LUFFY_YELLOW, (self.x, button_y), 4)
+        
+        # Draw Luffy's neck
+        canvas.rect(surface, scale, self.skin_color, 
+                   (self.x - self.radius//4, self.y - self.radius//2 + bob, 
+                    self.radius//2, self.radius//2))
+        
+        # Draw Luffy's head
+        canvas.circle(surface, scale, self.skin_color, 
+                     (self.x, self.y - self.radius//1.2 + bob), self.radius)
+        
+        # Draw Luffy's straw hat
+        hat_y = self.y - self.radius*1.5 + bob
+        canvas.ellipse(surface, scale, LUFFY_YELLOW, 
+                     (self.x - self.radius*1.3, hat_y - self.radius//2, 
+                      self.radius*2.6, self.radius))
+        canvas.circle(surface, scale, self.hat_color, 
+                     (self.x, hat_y), self.radius - 5)
+        canvas.rect(surface, scale, self.hat_color, 
+                   (self.x - self.radius - 10, hat_y - 2, 
+                    (self.radius + 5) * 2, 5))
+        
+        # Draw hat string
+        canvas.line(surface, scale, BROWN, 
+                   (self.x, hat_y + self.radius//2), 
+                   (self.x, self.y - self.radius//4 + bob), 3)
+        
+        # Draw Luffy's face
+        # Eyes
+        eye_offset = self.radius * 0.4
+        canvas.circle(surface, scale, WHITE, 
+                     (self.x - eye_offset, self.y - self.radius//1.2 + bob), 8)
+        canvas.circle(surface, scale, WHITE, 
+                     (self.x + eye_offset, self.y - self.radius//1.2 + bob), 8)
+        canvas.circle(surface, scale, BLACK, 
+                     (self.x - eye_offset, self.y - self.radius//1.2 + bob), 4)
+        canvas.circle(surface, scale, BLACK, 
+                     (self.x + eye_offset, self.y - self.radius//1.2 + bob), 4)
+        
+        # Scar under eye
+        if self.scar_under_eye:
+            canvas.line(surface, scale, RED, 
+                      (self.x - eye_offset - 8, self.y - self.radius//1.5 + bob), 
+                      (self.x - eye_offset + 8, self.y - self.radius//1.5 + bob), 4)
+        
+        # Luffy's smile
+        smile_rect = pygame.Rect(self.x - self.radius//2, self.y - self.radius//1.2 + self.radius//3 + bob, 
+                                self.radius, self.radius//3)
+        canvas.arc(surface, scale, BLACK, smile_rect, 0, math.pi, 3)
+        
+        # Draw arms
+        arm_width = self.radius // 2
+        canvas.line(surface, scale, self.skin_color, 
+                   (self.x - self.radius, self.y + bob), 
+                   (self.x - self.radius*1.5, self.y + self.radius//2 + bob), arm_width)
+        canvas.line(surface, scale, self.skin_color, 
+                   (self.x + self.radius, self.y + bob), 
+                   (self.x + self.radius*1.5, self.y + self.radius//2 + bob), arm_width)
+        
+        # Draw hands
+        canvas.circle(surface, scale, self.skin_color, 
+                     (self.x - self.radius*1.5, self.y + self.radius//2 + bob), arm_width)
+        canvas.circle(surface, scale, self.skin_color, 
+                     (self.x + self.radius*1.5, self.y + self.radius//2 + bob), arm_width)
+    
+    def draw_gear_fourth(self, surface, bob, scale=1.0):
+        # Draw Luffy's legs - larger in Gear Fourth
+        canvas.rect(surface, scale, BLUE, 
+                   (self.x - self.radius//1.2, self.y + self.radius//2, 
+                    self.radius//1.2, self.radius*1.5))
+        canvas.rect(surface, scale, BLUE, 
+                   (self.x, self.y + self.radius//2, 
+                    self.radius//1.2, self.radius*1.5))
+        
+        # Draw Luffy's body/torso - larger and with haki pattern
+        canvas.circle(surface, scale, (50, 0, 0), (self.x, self.y + bob), self.radius * 1.3)
+        
+        # Draw haki pattern
+        for _ in range(10):
+            angle = fx.uniform(0, 2 * math.pi)
+            distance = fx.uniform(0, self.radius)
+            size = fx.uniform(3, 8)
+            
+            pattern_x = self.x + math.cos(angle) * distance
+            pattern_y = self.y + bob + math.sin(angle) * distance
+            
+            canvas.circle(surface, scale, BLACK, 
+                         (int(pattern_x), int(pattern_y)), 
+                         int(size))
+        
+        # Draw Luffy's red vest - torn in Gear Fourth
+        vest_rect = pygame.Rect(self.x - self.radius*1.3, self.y - self.radius*1.3 + bob, 
+                               self.radius * 2.6, self.radius * 2.6)
+        canvas.arc(surface, scale, self.vest_color, vest_rect,
+                  math.pi/4, math.pi*7/4, self.radius//1)
+        
+        # Draw Luffy's neck - thicker
+        canvas.rect(surface, scale, (50, 0, 0), 
+                   (self.x - self.radius//3, self.y - self.radius//2 + bob, 
+                    self.radius//1.5, self.radius//2))
+        
+        # Draw Luffy's head - with haki
+        canvas.circle(surface, scale, (50, 0, 0), 
+                     (self.x, self.y - self.radius//1.2 + bob), self.radius*1.2)
+        
+        # Draw Luffy's straw hat
+        hat_y = self.y - self.radius*1.8 + bob
+        canvas.ellipse(surface, scale, LUFFY_YELLOW, 
+                     (self.x - self.radius*1.3, hat_y - self.radius//2, 
+                      self.radius*2.6, self.radius))
+        canvas.circle(surface, scale, self.hat_color, 
+                     (self.x, hat_y), self.radius - 5)
+        canvas.rect(surface, scale, self.hat_color, 
+                   (self.x - self.radius - 10, hat_y - 2, 
+                    (self.radius + 5) * 2, 5))
+        
+        # Draw hat string
+        canvas.line(surface, scale, BROWN, 
+                   (self.x, hat_y + self.radius//2), 
+                   (self.x, self.y - self.radius//4 + bob), 3)
+        
+        # Draw Luffy's face - angry in Gear Fourth
+        # Eyes
+        eye_offset = self.radius * 0.5
+        canvas.circle(surface, scale, WHITE, 
+                     (self.x - eye_offset, self.y - self.radius//1.2 + bob), 10)
+        canvas.circle(surface, scale, WHITE, 
+                     (self.x + eye_offset, self.y - self.radius//1.2 + bob), 10)
+        canvas.circle(surface, scale, BLACK, 
+                     (self.x - eye_offset, self.y - self.radius//1.2 + bob), 5)
+        canvas.circle(surface, scale, BLACK, 
+                     (self.x + eye_offset, self.y - self.radius//1.2 + bob), 5)
+        
+        # Scar under eye
+        if self.scar_under_eye:
+            canvas.line(surface, scale, RED, 
+                      (self.x - eye_offset - 10, self.y - self.radius//1.5 + bob), 
+                      (self.x - eye_offset + 10, self.y - self.radius//1.5 + bob), 5)
+        
+        # Luffy's angry mouth
+        canvas.line(surface, scale, BLACK, 
+                   (self.x - self.radius//2, self.y - self.radius//1.2 + self.radius//2 + bob), 
+                   (self.x + self.radius//2, self.y - self.radius//1.2 + self.radius//2 + bob), 3)
+        
+        # Draw steam effects
+        for _ in range(10):
+            offset_x = fx.randint(-self.radius*2, self.radius*2)
+            offset_y = fx.randint(-self.radius*2, self.radius*2)
+            if offset_x**2 + offset_y**2 <= (self.radius*2)**2:
+                steam_size = fx.randint(5, 15)
+                canvas.circle(surface, scale, (255, 255, 255, 100), 
+                             (int(self.x + offset_x), int(self.y + offset_y + bob)), 
+                             steam_size)
+        
+        # Draw arms - larger and with haki
+        arm_width = int(self.radius // 1.5)
+        canvas.line(surface, scale, (50, 0, 0), 
+                   (self.x - self.radius*1.3, self.y + bob), 
+                   (self.x - self.radius*2, self.y + self.radius//2 + bob), arm_width)
+        canvas.line(surface, scale, (50, 0, 0), 
+                   (self.x + self.radius*1.3, self.y + bob), 
+                   (self.x + self.radius*2, self.y + self.radius//2 + bob), arm_width)
+        
+        # Draw hands - larger
+        canvas.circle(surface, scale, (50, 0, 0), 
+                     (self.x - self.radius*2, self.y + self.radius//2 + bob), arm_width*1.2)
+        canvas.circle(surface, scale, (50, 0, 0), 
+                     (self.x + self.radius*2, self.y + self.radius//2 + bob), arm_width*1.2)
+    
+    def update(self):
+        # Update combo timer
+        if self.combo_timer > 0:
+            self.combo_timer -= 1
+            if self.combo_timer <= 0:
+                self.combo_count = 0
+
+class RubberPunch:
+    __slots__ = ('start_x', 'start_y', 'end_x', 'end_y', 'life', 'active', 'fist_size', 'fist_color',
+                 'length', 'dx', 'dy', 'current_length', 'max_length', 'extending', 'extension_speed',
+                 'current_fist_x', 'current_fist_y', 'stretch_points')
+    
+    def __init__(self, start_x, start_y, end_x, end_y):
+        self.stretch_points = [0.0] * 5
+        self.reset(start_x, start_y, end_x, end_y)
+    
+    def reset(self, start_x, start_y, end_x, end_y):
+        # Re-initialize a pooled punch (see pools.py)
+        self.start_x = start_x
+        self.start_y = start_y
+        self.end_x = end_x
+        self.end_y = end_y
+        self.life = 20  # Punch disappears after 20 frames
+        self.active = True
+        self.fist_size = 20
+        self.fist_color = LUFFY_SKIN
+        
+        # Calculate direction vector
+        dx = end_x - start_x
+        dy = end_y - start_y
+        self.length = math.sqrt(dx * dx + dy * dy)
+        
+        # Normalize direction
+        if self.length > 0:
+            self.dx = dx / self.length
+            self.dy = dy / self.length
+        else:
+            self.dx = 0
+            self.dy = 0
+            
+        # Animation variables
+        self.current_length = 0
+        self.max_length = self.length
+        self.extending = True  # True when extending, False when retracting
+        self.extension_speed = 25
+        self.current_fist_x = start_x
+        self.current_fist_y = start_y
+        
+        # Visual effect variables, filled in place
+        for i in range(5):
+            self.stretch_points[i] = sim.uniform(0.1, 0.9)
+        self.stretch_points.sort()
+    
+    def update(self):
+        if self.extending:
+            # Extend the punch
+            self.current_length = min(self.current_length + self.extension_speed, self.max_length)
+            if self.current_length >= self.max_length:
+                self.extending = False
+        else:
+            # Retract the punch
+            self.current_length = max(self.current_length - self.extension_speed, 0)
+            if self.current_length <= 0:
+                self.active = False
+        
+        # Update fist position
+        self.current_fist_x = self.start_x + self.dx * self.current_length
+        self.current_fist_y = self.start_y + self.dy * self.current_length
+    
+    def draw(self, surface, scale=1.0):
+        # Draw stretching arm with bulges to show rubber effect
+        last_x, last_y = self.start_x, self.start_y
+        
+        for i, point in enumerate(self.stretch_points):
+            # Calculate position along the arm
+            pos_x = self.start_x + self.dx * self.current_length * point
+            pos_y = self.start_y + self.dy * self.current_length * point
+            
+            # Draw segment
+            canvas.line(surface, scale, self.fist_color, (last_x, last_y), (pos_x, pos_y), 12)
+            
+            # Draw bulge at joint
+            bulge_size = 8 if i % 2 == 0 else 6
+            canvas.circle(surface, scale, self.fist_color, (int(pos_x), int(pos_y)), bulge_size)
+            
+            last_x, last_y = pos_x, pos_y
+        
+        # Draw final segment
+        canvas.line(surface, scale, self.fist_color, (last_x, last_y), 
+                    (self.current_fist_x, self.current_fist_y), 12)
+        
+        # Draw fist
+        canvas.circle(surface, scale, self.fist_color, 
+                     (int(self.current_fist_x), int(self.current_fist_y)), self.fist_size)
+        
+        # Draw knuckles
+        knuckle_offset = self.fist_size * 0.5
+        for i in range(4):
+            angle = math.atan2(self.dy, self.dx) + math.pi/2
+            offset_x = math.cos(angle) * (i - 1.5) * knuckle_offset * 0.5
+            offset_y = math.sin(angle) * (i - 1.5) * knuckle_offset * 0.5
+            canvas.circle(surface, scale, (220, 170, 130),  # Slightly darker skin for knuckles
+                         (int(self.current_fist_x + offset_x), 
+                          int(self.current_fist_y + offset_y)), 4)
+    
+    def get_draw_rect(self):
+        # Area covered by draw(): the arm from Luffy to the fist
+        reach = self.fist_size + 4
+        left = min(self.start_x, self.current_fist_x) - reach
+        top = min(self.start_y, self.current_fist_y) - reach
+        right = max(self.start_x, self.current_fist_x) + reach
+        bottom = max(self.start_y, self.current_fist_y) + reach
+        return pygame.Rect(int(left), int(top), int(right - left) + 2, int(bottom - top) + 2)
+    
+    def get_bounds(self):
+        # Bounding box of the fist, used by the collision broad phase
+        return (self.current_fist_x - self.fist_size, self.current_fist_y - self.fist_size,
+                self.current_fist_x + self.fist_size, self.current_fist_y + self.fist_size)
+    
+    def collides_with_pirate(self, pirate):
+        # Check if the fist hits the pirate
+        distance = math.sqrt((self.current_fist_x - pirate.x)**2 + (self.current_fist_y - pirate.y)**2)
+        return distance < (self.fist_size + pirate.size)
+
+class GearSecond:
+    __slots__ = ('x', 'y', 'radius', 'life', 'active', 'color', 'steam_particles')
+    
+    def __init__(self, luffy_x, luffy_y):
+        self.x = luffy_x
+        self.y = luffy_y
+        self.radius = 200
+        self.life = 240  # 4 seconds at 60 FPS
+        self.active = True
+        self.color = (255, 100, 100, 100)  # Red with transparency
+        self.steam_particles = particles.acquire(128)
+        
+        # Create initial steam particles
+        for _ in range(30):
+            self.add_steam_particle()
+    
+    def add_steam_particle(self):
+        angle = sim.uniform(0, 2 * math.pi)
+        distance = sim.uniform(0, self.radius)
+        speed = sim.uniform(1, 3)
+        size = sim.uniform(5, 15)
+        lifetime = sim.randint(20, 60)
+        
+        self.steam_particles.emit(
+            x=self.x + math.cos(angle) * distance,
+            y=self.y + math.sin(angle) * distance,
+            dx=math.cos(angle) * speed,
+            dy=math.sin(angle) * speed,
+            size=size,
+            life=lifetime
+        )
+    
+    def update(self):
+        self.life -= 1
+        if self.life <= 0:
+            self.active = False
+        
+        # Add new steam particles
+        if sim.random() < 0.3:
+            self.add_steam_particle()
+        
+        # Update steam particles
+        self.steam_particles.integrate()
+        self.steam_particles.age()
+        
+        if not self.active:
+            self.release_particles()
+    
+    def release_particles(self):
+        # Hand the steam buffer back to the particle pool when the move ends
+        # or the game is reset; later calls do nothing
+        if self.steam_particles is not None:
+            particles.release(self.steam_particles)
+            self.steam_particles = None
+    
+    def draw(self, surface, scale=1.0):
+        # Translucent aura from the sprite atlas
+        canvas.blit(surface, scale, sprite_atlas.circle(self.color, self.radius), 
+                   (self.x - self.radius, self.y - self.radius))
+        
+        # Draw steam particles
+        xs, ys, sizes, lives, max_lives = self.steam_particles.snapshot('x', 'y', 'size', 'life', 'max_life')
+        for x, y, size, life, max_life in zip(xs, ys, sizes, lives, max_lives):
+            alpha = int(255 * (life / max_life))
+            color = (255, 255, 255, alpha)
+            
+            canvas.blit(surface, scale, sprite_atlas.circle(color, size), 
+                       (int(x - size), 
+                        int(y - size)))
+        
+        # Draw "GEAR SECOND" text
+        if self.life > 200:  # Only show text at the beginning
+            text = render_text(get_font(72), "GEAR SECOND!", RED, BLACK, 3)
+            
+            # Draw text with its shadow
+            canvas.blit(surface, scale, text, (self.x - (text.get_width() - 3)//2, self.y - 100))
+    
+    def get_bounds(self):
+        return (self.x - self.radius, self.y - self.radius,
+                self.x + self.radius, self.y + self.radius)
+    
+    def collides_with_pirate(self, pirate):
+        distance = math.sqrt((self.x - pirate.x)**2 + (self.y - pirate.y)**2)
+        return distance < self.radius
@@ -0,0 +1,304 @@
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import rng
+from world import World
+
+# Gym-style environments for bots and soak tests, on top of the headless
+# World. LuffyEnv runs one game: reset(seed) starts it and returns the first
+# observation, step(action) advances it by one 60 Hz frame. VectorEnv steps
+# many LuffyEnvs in worker processes, which write their observations straight
+# into shared memory.
+#
+# An action is a sequence of ACTION_SIZE numbers:
+#   0 punch:        punch when > 0.5
+#   1 direction:    punch direction in radians (0 is right, pi/2 down); crew
+#                   abilities that aim (Franky's Radical Beam) use it too
+#   2 gear_second:  activate Gear Second when > 0.5
+#   3 crew_ability: use the crew ability when > 0.5; the crew member who
+#                   joined last is the active one
+# Like a click, an action only does something when its cooldown allows.
+#
+# An observation is a flat float32 array of OBSERVATION_SIZE; observation()
+# gives named views of it (or of a batch of them):
+#   luffy:        x, y, punch cooldown, Gear Second cooldown (frames)
+#   boss:         present, x, y, health
+#   pirates:      MAX_PIRATES rows of present, x, y, size, nearest to Luffy
+#                 first; rows past the last pirate are zero
+#   boss_attacks: MAX_BOSS_ATTACKS rows of present, x, y, nearest first
+# The reward of a step is the score it gained. A game is terminated when
+# Luffy is caught and truncated after max_steps.
+#
+# With pixels=(width, height), envs also render low-resolution frames through
+# pixel_capture.PixelCapture every pixel_every steps; LuffyEnv.pixels and
+# VectorEnv.pixels hold the latest ones as (width, height, 3) uint8 arrays.
+
+ACTION_SIZE = 4
+PUNCH_REACH = 100  # Distance of the punch target from Luffy
+
+MAX_PIRATES = 64
+MAX_BOSS_ATTACKS = 16
+OBSERVATION_FIELDS = [
+    ('luffy', (4,)),
+    ('boss', (4,)),
+    ('pirates', (MAX_PIRATES, 4)),
+    ('boss_attacks', (MAX_BOSS_ATTACKS, 3)),
+]
+OBSERVATION_SIZE = sum(math.prod(shape) for _, shape in OBSERVATION_FIELDS)
+MAX_STEPS = 60 * 60 * 10  # Ten minutes of play
+
+# The game logic draws from the shared rng.sim stream, so envs in one process
+# take turns with it: each env's stream state is saved when another env steps
+# and restored when it steps again. A lone env never swaps. The cosmetic fx
+# stream is left shared.
+_rng_owner = None
+
+def observation(buffer):
+    # Dict of named views into one observation, or into a batch of them
+    # (shape (..., OBSERVATION_SIZE))
+    views = {}
+    offset = 0
+    for name, shape in OBSERVATION_FIELDS:
+        size = math.prod(shape)
+        views[name] = buffer[..., offset:offset + size].reshape(buffer.shape[:-1] + shape)
+        offset += size
+    return views
+
+class LuffyEnv:
+    def __init__(self, difficulty="MEDIUM", max_steps=MAX_STEPS, swarm=False, buffer=None,
+                 pixels=None, pixel_every=1):
+        # buffer: float32 array of OBSERVATION_SIZE to write observations
+        # into, such as a row of shared memory
+        self.capture = None
+        self.pixels = None
+        if pixels is not None:
+            from pixel_capture import PixelCapture
+            self.capture = PixelCapture(pixels, pixel_every)
+            self.pixels = self.capture.pixels
+        self.difficulty = difficulty
+        self.max_steps = max_steps
+        self.swarm = swarm
+        self.buffer = buffer if buffer is not None else np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+        self.views = observation(self.buffer)
+        self.world = None
+        self.steps = 0
+        self.rng_state = None
+
+    def take_rng(self):
+        global _rng_owner
+        if _rng_owner is self:
+            return
+        if _rng_owner is not None:
+            _rng_owner.rng_state = rng.sim.getstate()
+        if self.rng_state is not None:
+            rng.sim.setstate(self.rng_state)
+        _rng_owner = self
+
+    def reset(self, seed=None):
+        # Start a new game and return its first observation
+        self.take_rng()
+        if seed is not None:
+            rng.seed(seed)
+        self.world = World(self.difficulty, swarm=self.swarm)
+        self.steps = 0
+        if self.capture:
+            self.capture.reset(self.world)
+        return self.observe()
+
+    def step(self, action):
+        # Returns (observation, reward, terminated, truncated, info)
+        world = self.world
+        luffy = world.luffy
+        inputs = {}
+        direction = float(action[1])
+        target = (luffy.x + math.cos(direction) * PUNCH_REACH,
+                  luffy.y + math.sin(direction) * PUNCH_REACH)
+        if action[0] > 0.5:
+            inputs['punch'] = target
+        if action[2] > 0.5:
+            inputs['gear_second'] = True
+        if action[3] > 0.5:
+            inputs['crew_ability'] = True
+            inputs['mouse_pos'] = target
+            unlocked = [member for member in world.crew_members if member.unlocked]
+            if unlocked:
+                world.active_crew_member = unlocked[-1]
+
+        score = world.score
+        self.take_rng()
+        world.step(inputs)
+        self.steps += 1
+        info = {'score': world.score, 'frame': world.frame}
+        if self.capture:
+            info['captured'] = self.capture.update(world)
+        return (self.observe(), world.score - score, world.game_over,
+                self.steps >= self.max_steps and not world.game_over, info)
+
+    def observe(self):
+        world = self.world
+        luffy = world.luffy
+        views = self.views
+        views['luffy'][:] = (luffy.x, luffy.y, luffy.cooldown, luffy.special_cooldown)
+
+        boss = world.boss
+        if world.boss_battle and boss is not None and not boss.defeated:
+            views['boss'][:] = (1, boss.x, boss.y, boss.health)
+        else:
+            views['boss'][:] = 0
+
+        self.fill_nearest(views['pirates'], [(1, pirate.x, pirate.y, pirate.size)
+                                             for pirate in world.pirates], luffy)
+        self.fill_nearest(views['boss_attacks'], [(1, attack.x, attack.y)
+                                                  for attack in world.boss_attacks], luffy)
+        return self.buffer
+
+    def fill_nearest(self, rows, entries, luffy):
+        # Write the entries nearest to Luffy into rows, zeroing the rest
+        entries.sort(key=lambda e: (e[1] - luffy.x) ** 2 + (e[2] - luffy.y) ** 2)
+        del entries[len(rows):]
+        count = len(entries)
+        if count:
+            rows[:count] = entries
+        rows[count:] = 0
+
+def _worker(connection, names, shapes, start, count, difficulty, max_steps, swarm, pixels, pixel_every):
+    # Runs envs start..start+count of a VectorEnv, reading actions from and
+    # writing results to its shared arrays
+    blocks = [shared_memory.SharedMemory(name) for name in names]
+    observations, actions, rewards, terminated, truncated, *shared_pixels = VectorEnv.arrays(blocks, shapes)
+    envs = [LuffyEnv(difficulty, max_steps, swarm, observations[start + i], pixels, pixel_every)
+            for i in range(count)]
+    seeds = [None] * count
+    try:
+        while True:
+            command, argument = connection.recv()
+            if command == 'reset':
+                for i, env in enumerate(envs):
+                    seeds[i] = None if argument is None else argument + start + i
+                    env.reset(seeds[i])
+                    if shared_pixels:
+                        shared_pixels[0][start + i] = env.pixels
+                connection.send(None)
+            elif command == 'step':
+                infos = {}
+                for i, env in enumerate(envs):
+                    k = start + i
+                    _, rewards[k], terminated[k], truncated[k], info = env.step(actions[k])
+                    captured = info.get('captured')
+                    if terminated[k] or truncated[k]:
+                        # Start the next game right away; its first
+                        # observation replaces the last one
+                        infos[k] = info
+                        if seeds[i] is not None:
+                            seeds[i] += argument
+                        env.reset(seeds[i])
+                        captured = env.capture is not None
+                    if captured:
+                        shared_pixels[0][k] = env.pixels
+                connection.send(infos)
+            elif command == 'close':
+                break
+    finally:
+        # The arrays must go before the memory under them can be closed
+        del envs, observations, actions, rewards, terminated, truncated, shared_pixels
+        for block in blocks:
+            block.close()
+
+class VectorEnv:
+    # num_envs LuffyEnvs split over worker processes. Observations, actions,
+    # rewards and done flags live in shared memory, so a step only sends a
+    # short message to each worker. Envs whose game ends are reset right
+    # away: step() returns the new game's first observation, and the finished
+    # game's info in infos. reset(seed) gives env i seed + i and its later
+    # games seed + i + num_envs, seed + i + 2 * num_envs, ...
+    #
+    # With pixels, each worker copies its envs' captures into the shared
+    # (num_envs, width, height, 3) array self.pixels.
+    def __init__(self, num_envs, difficulty="MEDIUM", max_steps=MAX_STEPS, swarm=False, workers=None,
+                 pixels=None, pixel_every=1):
+        self.num_envs = num_envs
+        workers = min(num_envs, workers or multiprocessing.cpu_count())
+
+        shapes = self.shapes(num_envs, pixels)
+        self.blocks = [shared_memory.SharedMemory(create=True, size=math.prod(shape) * np.dtype(dtype).itemsize)
+                       for shape, dtype in shapes]
+        (self.observations, self.actions, self.rewards,
+         self.terminated, self.truncated, *shared_pixels) = self.arrays(self.blocks, shapes)
+        self.pixels = shared_pixels[0] if shared_pixels else None
+        self.views = observation(self.observations)
+
+        self.connections = []
+        self.processes = []
+        names = [block.name for block in self.blocks]
+        for w in range(workers):
+            start = num_envs * w // workers
+            count = num_envs * (w + 1) // workers - start
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker, args=(child, names, shapes, start, count, difficulty, max_steps, swarm,
+                                      pixels, pixel_every),
+                daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    @staticmethod
+    def shapes(num_envs, pixels=None):
+        # (shape, dtype) of each shared array: observations, actions, rewards,
+        # terminated, truncated and, with pixels, the pixel captures
+        shapes = [((num_envs, OBSERVATION_SIZE), np.float32), ((num_envs, ACTION_SIZE), np.float32),
+                  ((num_envs,), np.float32), ((num_envs,), np.bool_), ((num_envs,), np.bool_)]
+        if pixels is not None:
+            shapes.append(((num_envs, pixels[0], pixels[1], 3), np.uint8))
+        return shapes
+
+    @staticmethod
+    def arrays(blocks, shapes):
+        return [np.ndarray(shape, dtype, buffer=block.buf) for block, (shape, dtype) in zip(blocks, shapes)]
+
+    def reset(self, seed=None):
+        for connection in self.connections:
+            connection.send(('reset', seed))
+        for connection in self.connections:
+            connection.recv()
+        return self.observations
+
+    def step(self, actions):
+        # actions: (num_envs, ACTION_SIZE). Returns (observations, rewards,
+        # terminated, truncated, infos), where infos maps the index of each
+        # env whose game just ended to that game's last info. The arrays are
+        # the shared buffers, overwritten by the next step; copy them to
+        # keep them.
+        self.actions[:] = actions
+        for connection in self.connections:
+            connection.send(('step', self.num_envs))
+        infos = {}
+        for connection in self.connections:
+            infos.update(connection.recv())
+        return self.observations, self.rewards, self.terminated, self.truncated, infos
+
+    def close(self):
+        if not self.connections:
+            return
+        for connection in self.connections:
+            connection.send(('close', None))
+        for process in self.processes:
+            process.join()
+        for connection in self.connections:
+            connection.close()
+        self.connections = []
+        del self.observations, self.actions, self.rewards, self.terminated, self.truncated, self.views
+        self.pixels = None
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,110 @@
+import numpy as np
+
+# Array-backed particle engine shared by the game's visual effects. Each
+# emitter owns one ParticleSystem: a fixed-capacity ring buffer whose size is
+# the emitter's particle budget. Emitting into a full buffer overwrites the
+# oldest particle, dead particles are only flagged, and motion, rotation and
+# ageing are integrated for the whole buffer at once. Systems are pooled by
+# capacity so short-lived effects don't allocate new arrays.
+
+FIELDS = ['x', 'y', 'dx', 'dy', 'angle', 'distance', 'speed', 'rotation',
+          'size', 'life', 'max_life', 'group']
+
+class ParticleSystem:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        for name in FIELDS:
+            setattr(self, name, np.zeros(capacity))
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.head = 0
+
+    def reset(self):
+        self.alive[:] = False
+        self.head = 0
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def emit(self, x=0.0, y=0.0, dx=0.0, dy=0.0, angle=0.0, distance=0.0, speed=0.0,
+             rotation=0.0, size=1.0, life=np.inf, group=0):
+        # Add a particle, replacing the oldest one when the budget is used up.
+        # Particles live for `life` frames, forever by default.
+        i = self.head
+        self.head = (i + 1) % self.capacity
+        self.x[i] = x
+        self.y[i] = y
+        self.dx[i] = dx
+        self.dy[i] = dy
+        self.angle[i] = angle
+        self.distance[i] = distance
+        self.speed[i] = speed
+        self.rotation[i] = rotation
+        self.size[i] = size
+        self.life[i] = life
+        self.max_life[i] = life
+        self.group[i] = group
+        self.alive[i] = True
+        return i
+
+    # Vectorized integration
+
+    def integrate(self):
+        # Move particles along their velocity
+        self.x += self.dx
+        self.y += self.dy
+
+    def rotate(self, center_x, center_y, max_distance=np.inf):
+        # Spin particles around a center while drifting outwards
+        self.angle += self.rotation
+        self.distance += self.speed
+        np.minimum(self.distance, max_distance, out=self.distance)
+        np.cos(self.angle, out=self.x)
+        self.x *= self.distance
+        self.x += center_x
+        np.sin(self.angle, out=self.y)
+        self.y *= self.distance
+        self.y += center_y
+
+    def age(self):
+        # Count down lifetimes and retire particles that run out
+        self.life -= 1
+        self.alive &= self.life > 0
+
+    def kill(self, mask):
+        self.alive &= ~mask
+
+    def wrap(self, left, top, right, bottom):
+        # Particles leaving the box re-enter on the opposite side
+        for values, low, high in ((self.x, left, right), (self.y, top, bottom)):
+            over = values > high
+            under = values < low
+            values[over] = low
+            values[under] = high
+
+    # Reading particles back for drawing
+
+    def order(self):
+        # Indices of live particles, oldest first
+        indices = np.roll(np.arange(self.capacity), -self.head)
+        return indices[self.alive[indices]]
+
+    def snapshot(self, *fields, group=None):
+        # Plain lists of the requested fields for live particles, oldest first
+        indices = self.order()
+        if group is not None:
+            indices = indices[self.group[indices] == group]
+        return [getattr(self, name)[indices].tolist() for name in fields]
+
+# Pool of released systems, keyed by capacity
+_pool = {}
+
+def acquire(capacity):
+    free = _pool.get(capacity)
+    if free:
+        system = free.pop()
+        system.reset()
+        return system
+    return ParticleSystem(capacity)
+
+def release(system):
+    _pool.setdefault(system.capacity, []).append(system)
@@ -0,0 +1,252 @@
+import math
+import random
+from collections import OrderedDict
+
+import pygame
+
+from constants import *
+from rng import fx
+
+# Pre-rendered pirates. Drawing a pirate from primitives takes a dozen or more
+# draw calls (and eight random flame circles for logia pirates), so each
+# appearance is baked once into a sprite and every pirate is drawn with two
+# blits: its figure, bobbing with the walk cycle, and its health dots and
+# immobilized line, which don't bob. draw() hands all of a crowd's blits to a
+# single Surface.blits call.
+#
+# Figures are keyed by type, size, color quantized to COLOR_STEP, the frozen
+# overlay and a variant: the rotation step of the paramecia blobs, or one of
+# FLAME_FRAMES pre-drawn flame patterns that logia pirates loop through. The
+# least recently used sprites are dropped once MAX_SPRITES is reached.
+#
+# Pirates are drawn without translucency, so sprites are color-keyed and RLE
+# encoded rather than per-pixel alpha, which blits several times faster.
+#
+# For scenes drawn at a reduced resolution (see canvas.py) every sprite also
+# has scaled-down copies, kept in the same cache under (key, scale).
+COLOR_STEP = 32
+BLOB_STEPS = 6       # Rotations of the paramecia blobs over a third of a turn
+FLAME_FRAMES = 4
+MAX_SPRITES = 2048   # Enough for every appearance in a crowd of 500
+
+enabled = True  # False draws every pirate from primitives, as before the cache
+_sprites = OrderedDict()
+stats = {'bakes': 0, 'hits': 0, 'evictions': 0}
+
+def quantize_color(color):
+    return tuple(min(255, (c + COLOR_STEP // 2) // COLOR_STEP * COLOR_STEP) for c in color)
+
+def draw_figure(surface, x, y, pirate_type, color, size, frozen, blob_angle, flames):
+    # The pirate's body and features centered on (x, y). flames are the
+    # (offset_x, offset_y, size) circles of a logia pirate's fire.
+
+    # If frozen, draw ice effect
+    if frozen:
+        pygame.draw.circle(surface, (150, 200, 255), (int(x), int(y)), size + 5)
+
+    # Draw pirate body
+    pygame.draw.circle(surface, color, (int(x), int(y)), size)
+
+    # Draw pirate features based on type
+    if pirate_type == "normal":
+        # Draw pirate hat
+        hat_width = size * 2
+        hat_height = size * 0.8
+        pygame.draw.ellipse(surface, BLACK,
+                            (x - hat_width//2, y - size - hat_height//2, hat_width, hat_height))
+
+        # Draw skull and crossbones on hat
+        skull_size = hat_height * 0.6
+        pygame.draw.circle(surface, WHITE, (int(x), int(y - size)), int(skull_size))
+
+    elif pirate_type == "logia":
+        # Draw fire-like effect
+        for offset_x, offset_y, flame_size in flames:
+            pygame.draw.circle(surface, (255, 255, 0),
+                               (int(x + offset_x), int(y + offset_y)), flame_size)
+
+        # Draw logia user face
+        pygame.draw.circle(surface, (255, 200, 150), (int(x), int(y)), int(size * 0.7))
+
+    elif pirate_type == "paramecia":
+        # Draw special ability indicator - weird body shape
+        for i in range(3):
+            offset = size * 0.6
+            angle = blob_angle + i * (2 * math.pi / 3)
+            blob_x = x + math.cos(angle) * offset
+            blob_y = y + math.sin(angle) * offset
+            pygame.draw.circle(surface, (255, 0, 255), (int(blob_x), int(blob_y)), int(size * 0.6))
+
+    elif pirate_type == "zoan":
+        # Draw animal features - horns or claws
+        horn_length = size * 0.8
+
+        pygame.draw.polygon(surface, (0, 100, 0),
+                            [(x, y - size),
+                             (x - size//2, y - size - horn_length),
+                             (x + size//2, y - size - horn_length)])
+
+        # Draw beast-like teeth
+        teeth_width = size * 0.8
+        teeth_height = size * 0.3
+        pygame.draw.rect(surface, WHITE, (x - teeth_width//2, y, teeth_width, teeth_height))
+
+        # Draw teeth lines
+        for i in range(1, 4):
+            line_x = x - teeth_width//2 + i * teeth_width//4
+            pygame.draw.line(surface, BLACK, (line_x, y), (line_x, y + teeth_height), 2)
+
+    # Draw eyes for all pirates
+    eye_size = max(3, size // 4)
+    eye_offset = size * 0.4
+    for eye_x in (x - eye_offset, x + eye_offset):
+        pygame.draw.circle(surface, WHITE, (int(eye_x), int(y - size/3)), eye_size)
+        pygame.draw.circle(surface, BLACK, (int(eye_x), int(y - size/3)), eye_size//2)
+
+    # Draw angry eyebrows
+    pygame.draw.line(surface, BLACK,
+                     (x - eye_offset - eye_size, y - size/2 - eye_size/2),
+                     (x - eye_offset + eye_size, y - size/2), 2)
+    pygame.draw.line(surface, BLACK,
+                     (x + eye_offset - eye_size, y - size/2),
+                     (x + eye_offset + eye_size, y - size/2 - eye_size/2), 2)
+
+def draw_status(surface, x, y, size, health, immobilized):
+    # Health dots and the immobilized line above a pirate centered on (x, y)
+    for i in range(health):
+        pygame.draw.circle(surface, RED, (int(x - size + i*10), int(y - size - 15)), 4)
+
+    if immobilized:
+        pygame.draw.line(surface, (255, 0, 0),
+                         (x - size, y - size - 25), (x + size, y - size - 25), 3)
+
+def random_flames(size, rand):
+    flames = []
+    for _ in range(8):
+        offset_x = rand.randint(-size//2, size//2)
+        offset_y = rand.randint(-size//2, size//2)
+        flames.append((offset_x, offset_y, rand.randint(size//3, size//2)))
+    return flames
+
+def _new_sprite(width, height):
+    sprite = pygame.Surface((width, height))
+    sprite.fill(COLOR_KEY)
+    return sprite
+
+def _store(key, sprite, offset):
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert()
+    sprite.set_colorkey(COLOR_KEY, pygame.RLEACCEL)
+    entry = _sprites[key] = (sprite, offset)
+    if len(_sprites) > MAX_SPRITES:
+        _sprites.popitem(last=False)
+        stats['evictions'] += 1
+    return entry
+
+def _cached(key):
+    entry = _sprites.get(key)
+    if entry is not None:
+        _sprites.move_to_end(key)
+        stats['hits'] += 1
+    return entry
+
+def figure(pirate_type, color, size, frozen, variant):
+    # (sprite, center) of a pirate's figure; variant is the blob rotation
+    # step of a paramecia pirate or the flame frame of a logia pirate
+    key = (pirate_type, size, color, frozen, variant)
+    entry = _cached(key)
+    if entry is not None:
+        return entry
+
+    stats['bakes'] += 1
+    half_width = int(size * 1.2) + 6
+    above = int(size * 1.8) + 4
+    sprite = _new_sprite(half_width * 2, above + half_width)
+    blob_angle = variant * (2 * math.pi / 3) / BLOB_STEPS
+    flames = random_flames(size, random.Random(size * FLAME_FRAMES + variant)) if pirate_type == "logia" else ()
+    draw_figure(sprite, half_width, above, pirate_type, color, size, frozen, blob_angle, flames)
+    return _store(key, sprite, (half_width, above))
+
+def status(size, health, immobilized):
+    # (sprite, top-left offset from the pirate's position) of the health
+    # dots and immobilized line, or None when there is nothing to show
+    if health <= 0 and not immobilized:
+        return None
+    key = ('status', size, health, immobilized)
+    entry = _cached(key)
+    if entry is not None:
+        return entry
+
+    stats['bakes'] += 1
+    left = size + 4
+    top = size + 27
+    width = left + max(size + 2, (health - 1) * 10 - size + 5)
+    sprite = _new_sprite(width, 17)
+    draw_status(sprite, left, top, size, health, immobilized)
+    return _store(key, sprite, (-left, -top))
+
+def scaled(key, scale, bake):
+    # (sprite, offset) of a cached sprite shrunk to scale, nearest pixel so
+    # the color key stays exact; bake() gives the full-size one on a miss
+    scaled_key = (key, scale)
+    entry = _cached(scaled_key)
+    if entry is not None:
+        return entry
+
+    sprite, (ox, oy) = bake()
+    width, height = sprite.get_size()
+    sprite = pygame.transform.scale(sprite, (max(1, round(width * scale)), max(1, round(height * scale))))
+    return _store(scaled_key, sprite, (round(ox * scale), round(oy * scale)))
+
+def variant(pirate):
+    if pirate.type == "paramecia":
+        return int(pirate.frame * 0.2 / (2 * math.pi / 3) * BLOB_STEPS) % BLOB_STEPS
+    if pirate.type == "logia":
+        # Pirates with different colors flicker out of step
+        return (int(pirate.frame * 5) + pirate.color[1]) % FLAME_FRAMES
+    return 0
+
+def blits(pirate, sequence, scale=1.0):
+    # Append the (sprite, position) pairs drawing a pirate to sequence, for
+    # a surface of the world at scale
+    x, y, size = pirate.x, pirate.y, pirate.size
+    bob_offset = math.sin(pirate.frame * math.pi) * 2
+    look = (pirate.type, quantize_color(pirate.color), size, pirate.frozen, variant(pirate))
+    if scale == 1:
+        sprite, (cx, cy) = figure(*look)
+    else:
+        sprite, (cx, cy) = scaled(look, scale, lambda: figure(*look))
+    sequence.append((sprite, (int(x * scale) - cx, int((y + bob_offset) * scale) - cy)))
+
+    badge = (size, int(pirate.health), pirate.immobilized)
+    if badge[1] <= 0 and not pirate.immobilized:
+        return
+    if scale == 1:
+        sprite, (ox, oy) = status(*badge)
+    else:
+        sprite, (ox, oy) = scaled(('status',) + badge, scale, lambda: status(*badge))
+    sequence.append((sprite, (int(x * scale) + ox, int(y * scale) + oy)))
+
+def draw_shapes(surface, pirate):
+    # Draw a pirate from primitives, with fresh random flames
+    bob_offset = math.sin(pirate.frame * math.pi) * 2
+    flames = random_flames(pirate.size, fx) if pirate.type == "logia" else ()
+    draw_figure(surface, pirate.x, pirate.y + bob_offset, pirate.type, pirate.color, pirate.size,
+                pirate.frozen, pirate.frame * 0.2, flames)
+    draw_status(surface, pirate.x, pirate.y, pirate.size, int(pirate.health), pirate.immobilized)
+
+def draw(surface, pirates, scale=1.0):
+    # scale < 1 draws into a scene of the world at that scale, always from
+    # sprites: primitives are only drawn at full size
+    if not enabled and scale == 1:
+        for pirate in pirates:
+            draw_shapes(surface, pirate)
+        return
+
+    sequence = []
+    for pirate in pirates:
+        blits(pirate, sequence, scale)
+    surface.blits(sequence, False)
+
+def clear():
+    _sprites.clear()
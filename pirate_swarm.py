@@ -0,0 +1,258 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from pirates import Pirate
+
+# Array-backed pirate store. Positions, velocities, sizes, health, type and
+# status timers of every pirate live in contiguous NumPy arrays so the whole
+# crowd can be stepped in one vectorized call. The swarm still behaves like
+# the pirate list the rest of the game expects: iterating it yields Pirate
+# objects whose fields read and write the arrays. Like registry.EntityList,
+# remove() is deferred: the pirate is skipped from then on and flush() takes
+# it out at the end of the tick, swapping the last pirate into the freed slot,
+# so the order of pirates is not preserved.
+
+TYPE_CODES = {"normal": 0, "logia": 1, "paramecia": 2, "zoan": 3, "fishman": 4}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+
+# Array-backed fields and their storage types
+FIELDS = {
+    'x': 'float64',
+    'y': 'float64',
+    'dx': 'float64',
+    'dy': 'float64',
+    'size': 'int32',
+    'health': 'float64',
+    'type_code': 'int8',
+    'immobilized': 'bool',
+    'immobilize_time': 'int32',
+    'frozen': 'bool',
+    'freeze_time': 'int32',
+    'frame': 'float64',
+    'animation_speed': 'float64',
+}
+
+def swarm_available():
+    return np is not None
+
+def _field_property(name, convert):
+    def get(self):
+        return convert(self._swarm.arrays[name][self._index])
+
+    def set(self, value):
+        self._swarm.arrays[name][self._index] = value
+
+    return property(get, set)
+
+class SwarmPirate(Pirate):
+    # A pirate whose state lives in a PirateSwarm. Pirates are switched to
+    # this class when added to a swarm and back to Pirate when removed, so
+    # code holding a reference keeps working either way. It adds no slots of
+    # its own: its properties shadow Pirate's fields while in the swarm.
+    __slots__ = ()
+    x = _field_property('x', float)
+    y = _field_property('y', float)
+    dx = _field_property('dx', float)
+    dy = _field_property('dy', float)
+    size = _field_property('size', int)
+    health = _field_property('health', float)
+    immobilized = _field_property('immobilized', bool)
+    immobilize_time = _field_property('immobilize_time', int)
+    frozen = _field_property('frozen', bool)
+    freeze_time = _field_property('freeze_time', int)
+    frame = _field_property('frame', float)
+    animation_speed = _field_property('animation_speed', float)
+
+    @property
+    def type(self):
+        return TYPE_NAMES[int(self._swarm.arrays['type_code'][self._index])]
+
+    @type.setter
+    def type(self, value):
+        self._swarm.arrays['type_code'][self._index] = TYPE_CODES[value]
+
+    @property
+    def walk_cycle(self):
+        return int(self.frame) % 4
+
+    @walk_cycle.setter
+    def walk_cycle(self, value):
+        pass  # Derived from frame
+
+    def update(self):
+        self._swarm.update_one(self._index)
+
+class PirateSwarm:
+    def __init__(self, capacity=64, registry=None):
+        if np is None:
+            raise ImportError("PirateSwarm requires numpy")
+        self.registry = registry
+        self.count = 0
+        self.dense = []   # Pirates in array order, including ones marked dead
+        self.dead = {}    # Removed this tick, in removal order; taken out by flush()
+        self.arrays = {name: np.zeros(capacity, dtype=dtype) for name, dtype in FIELDS.items()}
+
+    @property
+    def capacity(self):
+        return len(self.arrays['x'])
+
+    def view(self, name):
+        # Live array of one field for every pirate in the arrays, including
+        # the ones removed this tick, in the order of self.dense
+        return self.arrays[name][:self.count]
+
+    # List-like API used by the rest of the game
+
+    def __len__(self):
+        return self.count - len(self.dead)
+
+    def __iter__(self):
+        dead = self.dead
+        for pirate in self.dense:
+            if dead and pirate in dead:
+                continue
+            yield pirate
+
+    def __contains__(self, pirate):
+        return getattr(pirate, '_swarm', None) is self and pirate not in self.dead
+
+    def __bool__(self):
+        return self.count > len(self.dead)
+
+    def append(self, pirate):
+        if getattr(pirate, '_swarm', None) is self:
+            return
+        if self.count == self.capacity:
+            self._grow()
+
+        # Copy the pirate's fields into the arrays, then make it a view
+        index = self.count
+        arrays = self.arrays
+        for name in FIELDS:
+            if name != 'type_code':
+                arrays[name][index] = getattr(pirate, name)
+        arrays['type_code'][index] = TYPE_CODES[pirate.type]
+
+        pirate._swarm = self
+        pirate._index = index
+        pirate.__class__ = SwarmPirate
+        self.dense.append(pirate)
+        self.count += 1
+        if self.registry is not None:
+            return self.registry.spawn(pirate)
+
+    def extend(self, pirates):
+        for pirate in pirates:
+            self.append(pirate)
+
+    def remove(self, pirate):
+        if pirate not in self:
+            raise ValueError("pirate is not in this swarm")
+        self.dead[pirate] = None
+
+    def flush(self):
+        # Take out the pirates removed this tick and return them
+        removed = list(self.dead)
+        self.dead.clear()
+        for pirate in removed:
+            self._take_out(pirate)
+        return removed
+
+    def clear(self):
+        # Remove every pirate right away and return them
+        removed = self.dense[::-1]
+        self.dead.clear()
+        for pirate in removed:
+            self._take_out(pirate)
+        return removed
+
+    def _take_out(self, pirate):
+        index = pirate._index
+        last = self.count - 1
+
+        # Give the pirate its own copy of the fields again
+        values = {name: getattr(pirate, name) for name in FIELDS if name != 'type_code'}
+        pirate_type = pirate.type
+        pirate.__class__ = Pirate
+        del pirate._swarm
+        del pirate._index
+        for name, value in values.items():
+            setattr(pirate, name, value)
+        pirate.type = pirate_type
+        pirate.walk_cycle = int(pirate.frame) % 4
+
+        # Swap the last pirate into the freed slot
+        if index != last:
+            for array in self.arrays.values():
+                array[index] = array[last]
+            moved = self.dense[last]
+            moved._index = index
+            self.dense[index] = moved
+        self.dense.pop()
+        self.count -= 1
+        if self.registry is not None:
+            self.registry.kill(pirate)
+
+    def _grow(self):
+        for name, array in self.arrays.items():
+            grown = np.zeros(len(array) * 2, dtype=array.dtype)
+            grown[:len(array)] = array
+            self.arrays[name] = grown
+
+    # Simulation
+
+    def update(self):
+        # Vectorized Pirate.update for the whole crowd
+        n = self.count
+        if n == 0:
+            return
+        a = self.arrays
+        immobilized = a['immobilized'][:n]
+        immobilize_time = a['immobilize_time'][:n]
+        frozen = a['frozen'][:n]
+        freeze_time = a['freeze_time'][:n]
+
+        # Status effects hold a pirate in place for the frame they run out on
+        held = immobilized.copy()
+        immobilize_time[held] -= 1
+        immobilized[held] = immobilize_time[held] > 0
+
+        freezing = frozen & ~held
+        freeze_time[freezing] -= 1
+        frozen[freezing] = freeze_time[freezing] > 0
+        held |= freezing
+
+        # Normal movement and animation
+        moving = ~held
+        a['x'][:n][moving] += a['dx'][:n][moving]
+        a['y'][:n][moving] += a['dy'][:n][moving]
+        a['frame'][:n][moving] += a['animation_speed'][:n][moving]
+
+    def collides_with_circle(self, x, y, radius):
+        # Boolean mask of the pirates touching a circle, in the order of
+        # self.dense
+        n = self.count
+        a = self.arrays
+        distance = np.sqrt((a['x'][:n] - x) ** 2 + (a['y'][:n] - y) ** 2)
+        return distance < a['size'][:n] + radius
+
+    def update_one(self, index):
+        # Scalar update of a single pirate, matching update()
+        a = self.arrays
+        if a['immobilized'][index]:
+            a['immobilize_time'][index] -= 1
+            if a['immobilize_time'][index] <= 0:
+                a['immobilized'][index] = False
+            return
+
+        if a['frozen'][index]:
+            a['freeze_time'][index] -= 1
+            if a['freeze_time'][index] <= 0:
+                a['frozen'][index] = False
+            return
+
+        a['x'][index] += a['dx'][index]
+        a['y'][index] += a['dy'][index]
+        a['frame'][index] += a['animation_speed'][index]
@@ -0,0 +1,137 @@
+import pygame
+import math
+
+from constants import *
+from rng import sim
+import pirate_sprites
+
+class Pirate:
+    # Slotted to keep large crowds small. _swarm and _index are only set
+    # while the pirate lives in a PirateSwarm; they are declared here because
+    # SwarmPirate must share Pirate's layout to switch classes.
+    __slots__ = ('x', 'y', 'dx', 'dy', 'speed', 'size', 'health', 'has_devil_fruit', 'type', 'color',
+                 'frame', 'animation_speed', 'walk_cycle', 'immobilized', 'immobilize_time',
+                 'frozen', 'freeze_time', '_swarm', '_index')
+    
+    def __init__(self, difficulty="MEDIUM", pirates=(), score=0):
+        # Randomly determine which edge the pirate will spawn from
+        edge = sim.randint(0, 3)  # 0: top, 1: right, 2: bottom, 3: left
+        
+        self.size = sim.randint(15, 25)
+        
+        # Adjust pirate parameters based on difficulty
+        if difficulty == "EASY":
+            self.speed = sim.uniform(0.5, 1.2)
+            self.health = sim.randint(1, 2)
+            devil_fruit_chance = 0.05  # 5% chance
+        elif difficulty == "MEDIUM":
+            self.speed = sim.uniform(0.8, 1.8)
+            self.health = sim.randint(1, 2)
+            devil_fruit_chance = 0.15  # 15% chance
+        else:  # HARD
+            self.speed = sim.uniform(1.0, 2.2)
+            self.health = sim.randint(1, 3)
+            devil_fruit_chance = 0.25  # 25% chance
+        
+        # Check if there are already strong pirates on screen
+        strong_pirates_exist = False
+        for p in pirates:
+            if p.has_devil_fruit:
+                strong_pirates_exist = True
+                break
+        
+        # If strong pirates exist and score is low, don't spawn another strong pirate
+        if strong_pirates_exist and score < 10:
+            self.has_devil_fruit = False
+        else:
+            self.has_devil_fruit = sim.random() < devil_fruit_chance
+        
+        # Determine pirate type and color
+        if self.has_devil_fruit:
+            pirate_types = ["logia", "paramecia", "zoan"]
+            weights = [0.33, 0.33, 0.34]
+            self.type = sim.choices(pirate_types, weights=weights)[0]
+        else:
+            self.type = "normal"
+        
+        if self.type == "normal":
+            self.color = (sim.randint(100, 200), sim.randint(100, 200), sim.randint(100, 200))
+        elif self.type == "logia":
+            self.color = (255, sim.randint(100, 200), 0)  # Orange/fire-like
+            self.health += 1
+        elif self.type == "paramecia":
+            self.color = (sim.randint(100, 200), 0, sim.randint(100, 200))  # Purple-ish
+            self.speed *= 1.2  # Reduced speed boost
+        elif self.type == "zoan":
+            self.color = (0, sim.randint(100, 150), 0)  # Green-ish
+            self.size += 10
+            self.health += 1  # Reduced health boost
+        
+        if edge == 0:  # Top edge
+            self.x = sim.randint(0, WIDTH)
+            self.y = 0
+        elif edge == 1:  # Right edge
+            self.x = WIDTH
+            self.y = sim.randint(0, HEIGHT)
+        elif edge == 2:  # Bottom edge
+            self.x = sim.randint(0, WIDTH)
+            self.y = HEIGHT
+        else:  # Left edge
+            self.x = 0
+            self.y = sim.randint(0, HEIGHT)
+        
+        # Calculate direction vector towards Luffy
+        dx = WIDTH // 2 - self.x
+        dy = HEIGHT // 2 - self.y
+        distance = max(1, math.sqrt(dx * dx + dy * dy))  # Avoid division by zero
+        self.dx = dx / distance * self.speed
+        self.dy = dy / distance * self.speed
+        
+        # Animation variables
+        self.frame = 0
+        self.animation_speed = 0.2
+        self.walk_cycle = 0
+        
+        # Status effects
+        self.immobilized = False
+        self.immobilize_time = 0
+        self.frozen = False
+        self.freeze_time = 0
+    
+    def update(self):
+        # Check status effects
+        if self.immobilized:
+            self.immobilize_time -= 1
+            if self.immobilize_time <= 0:
+                self.immobilized = False
+            return
+        
+        if self.frozen:
+            self.freeze_time -= 1
+            if self.freeze_time <= 0:
+                self.frozen = False
+            return
+        
+        # Normal movement
+        self.x += self.dx
+        self.y += self.dy
+        
+        # Update animation
+        self.frame += self.animation_speed
+        self.walk_cycle = int(self.frame) % 4
+    
+    def draw(self, surface, scale=1.0):
+        # Blit the pirate from the sprite cache (see pirate_sprites.py)
+        pirate_sprites.draw(surface, (self,), scale)
+    
+    def get_draw_rect(self):
+        # Area covered by draw(): body, ice ring and bobbing below, horns,
+        # health dots and the immobilized line above
+        reach = self.size + 8
+        top = int(self.size * 1.8) + 28
+        right = max(reach, int(self.health) * 10 - self.size + 6)
+        return pygame.Rect(int(self.x) - reach, int(self.y) - top, reach + right, top + reach)
+    
+    def collides_with_luffy(self, luffy):
+        distance = math.sqrt((self.x - luffy.x) ** 2 + (self.y - luffy.y) ** 2)
+        return distance < (self.size + luffy.radius)
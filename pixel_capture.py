@@ -0,0 +1,58 @@
+import pygame
+
+from constants import WIDTH, HEIGHT, OCEAN_BLUE
+from islands import IslandRoute, ROUTE
+
+# Offscreen pixel observations of a headless World, for bots and visual
+# regression tests. A capture draws the frame at full size with the game's
+# own paths (Island.draw, then World.draw, which draws Luffy, the pirates and
+# the boss), without the HUD, and scales it down into a small Surface.
+# `pixels` is a pygame.surfarray.pixels3d view of that Surface: a uint8 array
+# of shape (width, height, 3) that reads the Surface's memory directly, so it
+# changes in place with every capture and is never copied.
+#
+# update() is called after every World.step(). It keeps the island animated
+# and captures every `every` steps; in between, `pixels` keeps the last
+# capture. Islands are built when the world first reaches them, without a
+# display.
+class PixelCapture:
+    def __init__(self, size=(84, 84), every=1, smooth=True, width=WIDTH, height=HEIGHT):
+        self.size = tuple(size)
+        self.every = max(1, every)
+        self.smooth = smooth
+        self.frame = pygame.Surface((width, height))
+        self.surface = pygame.Surface(self.size)
+        # Holding the view keeps the Surface locked; it is only scaled into,
+        # which works on a locked Surface
+        self.pixels = pygame.surfarray.pixels3d(self.surface)
+        self.islands = IslandRoute(ROUTE, width, height, prefetch=False)
+        self.steps = 0
+        self.captures = 0
+
+    def island(self, world):
+        return self.islands.get(world.current_island % len(self.islands))
+
+    def reset(self, world):
+        # Capture the first frame of a new game
+        self.steps = 0
+        self.capture(world)
+
+    def update(self, world):
+        # Returns True when this step was captured
+        self.island(world).update()
+        self.steps += 1
+        if self.steps % self.every:
+            return False
+        self.capture(world)
+        return True
+
+    def capture(self, world):
+        frame = self.frame
+        frame.fill(OCEAN_BLUE)
+        self.island(world).draw(frame)
+        world.draw(frame)
+        if self.smooth:
+            pygame.transform.smoothscale(frame, self.size, self.surface)
+        else:
+            pygame.transform.scale(frame, self.size, self.surface)
+        self.captures += 1
@@ -0,0 +1,58 @@
+# Free lists for short-lived entities (punches, crew and boss projectiles,
+# power-ups). Instead of allocating a new object for every shot and dropping
+# it a few frames later, acquire() hands back a released instance re-initialized
+# through its reset() method, which takes the same arguments as the
+# constructor. Each class gets its own pool the first time it is acquired.
+#
+# Objects must not be used after release(); the World defers releasing until
+# the end of a step, so nothing still holds on to them (see
+# World.apply_despawns).
+
+class Pool:
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.in_use = 0
+        self.high_water = 0  # Most objects of this class alive at once
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args):
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args)
+            self.reused += 1
+        else:
+            obj = self.cls(*args)
+            self.created += 1
+        self.in_use += 1
+        self.high_water = max(self.high_water, self.in_use)
+        return obj
+
+    def release(self, obj):
+        self.in_use -= 1
+        self.free.append(obj)
+
+_pools = {}
+
+def acquire(cls, *args):
+    pool = _pools.get(cls)
+    if pool is None:
+        pool = _pools[cls] = Pool(cls)
+    return pool.acquire(*args)
+
+def release(obj):
+    # Objects of classes that were never acquired from a pool are ignored
+    pool = _pools.get(type(obj))
+    if pool is not None:
+        pool.release(obj)
+
+def stats():
+    # Per-class counters, for profiling long sessions
+    return {cls.__name__: {'in_use': pool.in_use, 'free': len(pool.free),
+                           'high_water': pool.high_water, 'created': pool.created,
+                           'reused': pool.reused}
+            for cls, pool in _pools.items()}
+
+def clear():
+    _pools.clear()
@@ -1,10 +1,18 @@
 import pygame
-import random
 import math
 
+import canvas
+from rng import sim
+
 # Power-up classes
 class PowerUp:
+    # Power-ups are pooled (see pools.py) and re-initialize through reset()
+    __slots__ = ('x', 'y', 'radius', 'collected', 'bob_offset', 'bob_speed', 'bob_direction', 'lifetime')
+    
     def __init__(self, x, y):
+        self.reset(x, y)
+    
+    def reset(self, x, y):
         self.x = x
         self.y = y
         self.radius = 15
@@ -25,7 +33,7 @@ class PowerUp:
         if self.lifetime <= 0:
             self.collected = True
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         pass
     
     def apply_effect(self, game_state_data):
@@ -34,60 +42,73 @@ class PowerUp:
     def check_collision(self, luffy):
         distance = math.sqrt((self.x - luffy.x)**2 + (self.y - luffy.y)**2)
         return distance < self.radius + luffy.radius
+    
+    def get_draw_rect(self):
+        # Area covered by draw() anywhere in the bobbing range
+        return pygame.Rect(int(self.x - self.radius) - 4, int(self.y - self.radius * 1.5) - 8, 
+                           self.radius * 2 + 8, self.radius * 3 + 16)
 
 class MeatPowerUp(PowerUp):
-    def __init__(self, x, y):
-        super().__init__(x, y)
+    __slots__ = ('color',)
+    
+    def reset(self, x, y):
+        super().reset(x, y)
         self.color = (200, 100, 100)  # Meat color
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw meat
-        pygame.draw.circle(surface, self.color, 
-                          (int(self.x), int(self.y + self.bob_offset)), 
-                          self.radius)
-        pygame.draw.circle(surface, (255, 200, 200), 
-                          (int(self.x - self.radius/3), int(self.y + self.bob_offset - self.radius/3)), 
-                          self.radius/4)
+        canvas.circle(surface, scale, self.color, 
+                     (int(self.x), int(self.y + self.bob_offset)), 
+                     self.radius)
+        canvas.circle(surface, scale, (255, 200, 200), 
+                     (int(self.x - self.radius/3), int(self.y + self.bob_offset - self.radius/3)), 
+                     self.radius/4)
         
         # Draw bone
-        pygame.draw.rect(surface, (255, 255, 255), 
-                        (self.x - self.radius/2, self.y + self.bob_offset - self.radius, 
-                         self.radius/4, self.radius*1.5))
+        canvas.rect(surface, scale, (255, 255, 255), 
+                   (self.x - self.radius/2, self.y + self.bob_offset - self.radius, 
+                    self.radius/4, self.radius*1.5))
     
     def apply_effect(self, game_state_data):
         # Clear all pirates (like a screen clear)
-        for pirate in game_state_data['pirates'][:]:
+        for pirate in game_state_data['pirates']:
             game_state_data['pirates'].remove(pirate)
             game_state_data['score'] += 1
         return "Meat Power-Up: All pirates defeated!"
 
 class DevilFruitPowerUp(PowerUp):
+    __slots__ = ('color', 'pattern')
+    
     def __init__(self, x, y):
-        super().__init__(x, y)
-        self.color = (random.randint(100, 255), random.randint(100, 255), random.randint(100, 255))
         self.pattern = []
+        super().__init__(x, y)
+    
+    def reset(self, x, y):
+        super().reset(x, y)
+        self.color = (sim.randint(100, 255), sim.randint(100, 255), sim.randint(100, 255))
+        self.pattern.clear()
         
-        # Create swirl pattern
+        # Create swirl pattern of (angle, distance, size) spots
         for i in range(10):
-            self.pattern.append({
-                'angle': random.uniform(0, 2*math.pi),
-                'distance': random.uniform(0, self.radius*0.8),
-                'size': random.randint(3, 6)
-            })
+            self.pattern.append((
+                sim.uniform(0, 2*math.pi),
+                sim.uniform(0, self.radius*0.8),
+                sim.randint(3, 6)
+            ))
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw devil fruit
-        pygame.draw.circle(surface, self.color, 
-                          (int(self.x), int(self.y + self.bob_offset)), 
-                          self.radius)
+        canvas.circle(surface, scale, self.color, 
+                     (int(self.x), int(self.y + self.bob_offset)), 
+                     self.radius)
         
         # Draw swirl pattern
-        for p in self.pattern:
-            px = self.x + math.cos(p['angle']) * p['distance']
-            py = self.y + self.bob_offset + math.sin(p['angle']) * p['distance']
-            pygame.draw.circle(surface, (50, 50, 50), 
-                              (int(px), int(py)), 
-                              p['size'])
+        for angle, distance, size in self.pattern:
+            px = self.x + math.cos(angle) * distance
+            py = self.y + self.bob_offset + math.sin(angle) * distance
+            canvas.circle(surface, scale, (50, 50, 50), 
+                         (int(px), int(py)), 
+                         size)
     
     def apply_effect(self, game_state_data):
         # Activate Gear Fourth for Luffy (temporary power boost)
@@ -96,25 +117,27 @@ class DevilFruitPowerUp(PowerUp):
         return "Devil Fruit Power-Up: Gear Fourth activated!"
 
 class LogPosePowerUp(PowerUp):
+    __slots__ = ()
+    
     def __init__(self, x, y):
         super().__init__(x, y)
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw log pose (compass)
-        pygame.draw.circle(surface, (200, 200, 200), 
-                          (int(self.x), int(self.y + self.bob_offset)), 
-                          self.radius)
-        pygame.draw.circle(surface, (255, 255, 255), 
-                          (int(self.x), int(self.y + self.bob_offset)), 
-                          self.radius - 3)
+        canvas.circle(surface, scale, (200, 200, 200), 
+                     (int(self.x), int(self.y + self.bob_offset)), 
+                     self.radius)
+        canvas.circle(surface, scale, (255, 255, 255), 
+                     (int(self.x), int(self.y + self.bob_offset)), 
+                     self.radius - 3)
         
         # Draw needle
         angle = pygame.time.get_ticks() / 1000
         end_x = self.x + math.cos(angle) * (self.radius - 5)
         end_y = self.y + self.bob_offset + math.sin(angle) * (self.radius - 5)
-        pygame.draw.line(surface, (255, 0, 0), 
-                        (self.x, self.y + self.bob_offset), 
-                        (end_x, end_y), 2)
+        canvas.line(surface, scale, (255, 0, 0), 
+                   (self.x, self.y + self.bob_offset), 
+                   (end_x, end_y), 2)
     
     def apply_effect(self, game_state_data):
         # Advance to next island
@@ -127,47 +150,51 @@ class LogPosePowerUp(PowerUp):
         return f"Log Pose Power-Up: Navigating to {game_state_data['islands'][game_state_data['current_island']]}!"
 
 class TreasurePowerUp(PowerUp):
+    __slots__ = ()
+    
     def __init__(self, x, y):
         super().__init__(x, y)
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw treasure chest
-        pygame.draw.rect(surface, (139, 69, 19), 
-                        (self.x - self.radius, self.y + self.bob_offset - self.radius/2, 
-                         self.radius*2, self.radius), 0)
-        pygame.draw.rect(surface, (255, 215, 0), 
-                        (self.x - self.radius + 2, self.y + self.bob_offset - self.radius/2 + 2, 
-                         self.radius*2 - 4, self.radius - 4), 0)
+        canvas.rect(surface, scale, (139, 69, 19), 
+                   (self.x - self.radius, self.y + self.bob_offset - self.radius/2, 
+                    self.radius*2, self.radius), 0)
+        canvas.rect(surface, scale, (255, 215, 0), 
+                   (self.x - self.radius + 2, self.y + self.bob_offset - self.radius/2 + 2, 
+                    self.radius*2 - 4, self.radius - 4), 0)
         
         # Draw lock
-        pygame.draw.rect(surface, (100, 100, 100), 
-                        (self.x - self.radius/4, self.y + self.bob_offset - self.radius/2 - self.radius/4, 
-                         self.radius/2, self.radius/2), 0)
+        canvas.rect(surface, scale, (100, 100, 100), 
+                   (self.x - self.radius/4, self.y + self.bob_offset - self.radius/2 - self.radius/4, 
+                    self.radius/2, self.radius/2), 0)
     
     def apply_effect(self, game_state_data):
         # Add bonus points
-        bonus = random.randint(5, 15)
+        bonus = sim.randint(5, 15)
         game_state_data['score'] += bonus
         return f"Treasure Power-Up: Found {bonus} bonus points!"
 
 class RumbleBallPowerUp(PowerUp):
+    __slots__ = ()
+    
     def __init__(self, x, y):
         super().__init__(x, y)
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw rumble ball (yellow pill)
-        pygame.draw.circle(surface, (255, 255, 0), 
-                          (int(self.x), int(self.y + self.bob_offset)), 
-                          self.radius)
-        pygame.draw.line(surface, (200, 200, 0), 
-                        (self.x - self.radius, self.y + self.bob_offset), 
-                        (self.x + self.radius, self.y + self.bob_offset), 2)
+        canvas.circle(surface, scale, (255, 255, 0), 
+                     (int(self.x), int(self.y + self.bob_offset)), 
+                     self.radius)
+        canvas.line(surface, scale, (200, 200, 0), 
+                   (self.x - self.radius, self.y + self.bob_offset), 
+                   (self.x + self.radius, self.y + self.bob_offset), 2)
     
     def apply_effect(self, game_state_data):
         # Unlock a random crew member if not already unlocked
         unlockable_crew = [cm for cm in game_state_data['crew_members'] if not cm.unlocked]
         if unlockable_crew:
-            crew_member = random.choice(unlockable_crew)
+            crew_member = sim.choice(unlockable_crew)
             crew_member.unlocked = True
             return f"Rumble Ball Power-Up: {crew_member.name} joined your crew!"
         else:
@@ -0,0 +1,190 @@
+import time
+from collections import deque
+from contextlib import nullcontext
+
+import pygame
+
+from fonts import get_font, text_cache_info, TEXT_CACHE_SIZE
+
+# In-game frame profiler. The main loop and the World wrap each phase of a
+# frame in `with profiler.phase(name, kind):`; while the profiler is enabled
+# (F3 in game) the time spent in every phase is summed per frame and kept for
+# the last WINDOW frames, and draw() shows rolling averages and percentiles,
+# entity counts, the text cache's hit rate and a sparkline of recent frame times. While disabled,
+# phase() returns a shared no-op context.
+WINDOW = 120          # Frames the rolling statistics cover
+REFRESH_FRAMES = 15   # The panel is re-rendered this often
+BUDGET_MS = 1000 / 60
+
+# Rows of the overlay, in the order a frame runs them
+PHASES = ['island', 'punches', 'special_moves', 'special_attacks', 'boss_attacks',
+          'power_ups', 'luffy', 'pirates', 'boss', 'canvas', 'hud']
+
+_no_phase = nullcontext()
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+class _Phase:
+    def __init__(self, profiler, key):
+        self.profiler = profiler
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        totals = self.profiler.frame_totals
+        totals[self.key] = totals.get(self.key, 0.0) + (time.perf_counter() - self.start) * 1000
+        return False
+
+class FrameProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.phases = {}
+        self.reset()
+
+    def reset(self):
+        self.samples = {}  # (phase, kind) -> per-frame ms of the last WINDOW frames
+        self.frame_times = deque(maxlen=WINDOW)
+        self.frame_totals = {}
+        self.frame_start = None
+        self.frames = 0
+        self.panel = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.reset()
+
+    def phase(self, name, kind='update'):
+        # kind is 'update' or 'draw'. Phases that run several times in a frame
+        # (the update of each fixed step) add up.
+        if not self.enabled:
+            return _no_phase
+        key = (name, kind)
+        phase = self.phases.get(key)
+        if phase is None:
+            phase = self.phases[key] = _Phase(self, key)
+        return phase
+
+    def begin_frame(self):
+        # Frames are timed even while disabled, for the render scale (see
+        # canvas.ResolutionController)
+        self.frame_totals = {}
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        # Call once the frame is drawn, before waiting for the next one.
+        # Returns the frame's time in ms, or None if no frame was begun.
+        if self.frame_start is None:
+            return None
+        frame_ms = (time.perf_counter() - self.frame_start) * 1000
+        self.frame_start = None
+        if not self.enabled:
+            return frame_ms
+        self.frame_times.append(frame_ms)
+        for key in self.frame_totals:
+            if key not in self.samples:
+                self.samples[key] = deque(maxlen=WINDOW)
+        for key, samples in self.samples.items():
+            samples.append(self.frame_totals.get(key, 0.0))
+        self.frames += 1
+        return frame_ms
+
+    def stats(self, key):
+        # (mean, p95) in ms over the window, or None if the phase never ran
+        samples = self.samples.get(key)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return sum(ordered) / len(ordered), percentile(ordered, 0.95)
+
+    def draw(self, surface, counts, pos=(10, 190)):
+        # Draw the overlay and return the area it covers. counts maps entity
+        # names to how many are alive. The panel only changes every
+        # REFRESH_FRAMES frames, so its numbers don't churn the text cache.
+        if self.panel is None or self.frames % REFRESH_FRAMES == 0:
+            self.panel = self.render_panel(counts)
+        return surface.blit(self.panel, pos)
+
+    def render_panel(self, counts):
+        font = get_font(20)
+        line = font.get_linesize()
+        columns = [0, 130, 195, 260, 325]
+        width = 400
+        sparkline_height = 40
+        height = line * (len(PHASES) + 6) + sparkline_height + 16
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+
+        # Text is rendered straight from the font, not through render_text:
+        # numbers that change every refresh would only push the HUD's text
+        # out of the shared cache
+        def text(value, x, y, color=(255, 255, 255)):
+            panel.blit(font.render(value, True, color), (6 + x, y))
+
+        y = 4
+        frame = sorted(self.frame_times)
+        if frame:
+            mean = sum(frame) / len(frame)
+            p95 = percentile(frame, 0.95)
+            color = (255, 80, 80) if p95 > BUDGET_MS else (120, 255, 120)
+            text(f"frame {mean:.2f} ms  p95 {p95:.2f}  max {frame[-1]:.2f}", 0, y, color)
+        else:
+            text("frame: collecting...", 0, y)
+        y += line
+
+        for x, label in zip(columns, ["phase", "upd", "p95", "draw", "p95"]):
+            text(label, x, y, (180, 180, 180))
+        y += line
+
+        # The costliest phase is highlighted; phases that alone use more than
+        # a quarter of the frame budget at p95 are red
+        totals = {}
+        for name in PHASES:
+            totals[name] = sum(stats[0] for stats in
+                               (self.stats((name, 'update')), self.stats((name, 'draw'))) if stats)
+        costliest = max(totals, key=totals.get)
+        accounted = 0.0
+        for name in PHASES:
+            values = []
+            worst = 0.0
+            for kind in ('update', 'draw'):
+                stats = self.stats((name, kind))
+                if stats is None:
+                    values += ["-", "-"]
+                else:
+                    values += [f"{stats[0]:.2f}", f"{stats[1]:.2f}"]
+                    accounted += stats[0]
+                    worst = max(worst, stats[1])
+            color = (255, 255, 255)
+            if worst > BUDGET_MS / 4:
+                color = (255, 80, 80)
+            elif name == costliest and totals[name] > 0:
+                color = (255, 230, 80)
+            for x, value in zip(columns, [name] + values):
+                text(value, x, y, color)
+            y += line
+
+        if frame:
+            text(f"other {max(0.0, sum(frame) / len(frame) - accounted):.2f}", 0, y, (180, 180, 180))
+        y += line
+        text("  ".join(f"{name} {count}" for name, count in counts.items()), 0, y)
+        y += line
+        cache = text_cache_info()
+        text(f"text cache {cache['hit_rate']:.1%} hits  {cache['size']}/{TEXT_CACHE_SIZE} entries  "
+             f"{cache['evictions']} evicted", 0, y, (180, 180, 180))
+        y += line + 4
+
+        # Frame time sparkline, newest on the right, with the 60 FPS budget
+        scale = sparkline_height / max(BUDGET_MS * 2, max(frame, default=0))
+        bar_width = (width - 12) / WINDOW
+        base = y + sparkline_height
+        for i, ms in enumerate(self.frame_times):
+            bar_height = max(1, int(ms * scale))
+            color = (255, 80, 80) if ms > BUDGET_MS else (120, 255, 120)
+            pygame.draw.rect(panel, color, (6 + int(i * bar_width), base - bar_height,
+                                            max(1, int(bar_width)), bar_height))
+        budget_y = base - int(BUDGET_MS * scale)
+        pygame.draw.line(panel, (255, 230, 80), (6, budget_y), (width - 6, budget_y))
+        return panel
@@ -0,0 +1,118 @@
+# Entity storage for the World. Every live entity gets a generational handle
+# from the Registry: an int packing a slot number and the slot's generation.
+# Slots are reused once their entity is gone, but with a new generation, so
+# a handle kept across ticks either finds its own entity or None, never a
+# newer entity in the same slot (or a pooled object reused for something
+# else). Code that holds on to an entity beyond the current tick should keep
+# its handle rather than the object.
+#
+# EntityList keeps one kind of entity in a dense list with O(1) membership
+# tests and swap-remove. Removals are deferred: remove() only marks the
+# entity, iteration skips marked entities, and flush() takes them out at the
+# end of the tick. Loops can therefore kill entities, even from nested
+# collision loops, without iterating over copies. Swap-remove does not keep
+# insertion order.
+INDEX_BITS = 20
+INDEX_MASK = (1 << INDEX_BITS) - 1
+
+class Registry:
+    def __init__(self):
+        self.generations = []  # Current generation of each slot
+        self.entities = []     # Entity in each slot, None when free
+        self.free = []
+        self.handles = {}      # Entity -> handle
+
+    def spawn(self, entity):
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = len(self.entities)
+            self.entities.append(None)
+            self.generations.append(0)
+        self.entities[slot] = entity
+        handle = self.generations[slot] << INDEX_BITS | slot
+        self.handles[entity] = handle
+        return handle
+
+    def kill(self, entity):
+        handle = self.handles.pop(entity, None)
+        if handle is None:
+            return
+        slot = handle & INDEX_MASK
+        self.generations[slot] += 1
+        self.entities[slot] = None
+        self.free.append(slot)
+
+    def get(self, handle):
+        # The entity a handle was given for, or None if it has despawned
+        slot = handle & INDEX_MASK
+        if slot < len(self.entities) and self.generations[slot] == handle >> INDEX_BITS:
+            return self.entities[slot]
+        return None
+
+    def handle(self, entity):
+        return self.handles.get(entity)
+
+    def __len__(self):
+        return len(self.handles)
+
+class EntityList:
+    def __init__(self, registry=None):
+        self.registry = registry if registry is not None else Registry()
+        self.dense = []   # Entities in storage order, including ones marked dead
+        self.index = {}   # Entity -> position in dense
+        self.dead = {}    # Removed this tick, in removal order; taken out by flush()
+
+    def append(self, entity):
+        # Returns the entity's handle
+        self.index[entity] = len(self.dense)
+        self.dense.append(entity)
+        return self.registry.spawn(entity)
+
+    def extend(self, entities):
+        for entity in entities:
+            self.append(entity)
+
+    def remove(self, entity):
+        if entity not in self:
+            raise ValueError("entity is not in this list")
+        self.dead[entity] = None
+
+    def flush(self):
+        # Take out the entities removed this tick and return them
+        removed = list(self.dead)
+        for entity in removed:
+            index = self.index.pop(entity)
+            last = self.dense.pop()
+            if last is not entity:
+                self.dense[index] = last
+                self.index[last] = index
+            self.registry.kill(entity)
+        self.dead.clear()
+        return removed
+
+    def clear(self):
+        # Remove everything right away and return what was stored
+        removed = self.dense
+        for entity in removed:
+            self.registry.kill(entity)
+        self.dense = []
+        self.index = {}
+        self.dead.clear()
+        return removed
+
+    def __iter__(self):
+        dead = self.dead
+        for entity in self.dense:
+            if dead and entity in dead:
+                continue
+            yield entity
+
+    def __len__(self):
+        return len(self.dense) - len(self.dead)
+
+    def __bool__(self):
+        return len(self.dense) > len(self.dead)
+
+    def __contains__(self, entity):
+        return entity in self.index and entity not in self.dead
@@ -0,0 +1,127 @@
+import struct
+import time
+
+import rng
+from world import World
+
+# Compact binary recordings of a play session. A recording stores the seed
+# and difficulty, then one small record per input, tagged with the number of
+# simulation steps run before it. Replaying seeds the shared RNG the same way
+# and feeds the inputs back to a headless World at the same steps, which
+# reproduces the session step for step.
+#
+# Layout (little endian):
+#   header: magic b'LGA1', seed (uint32, see rng.parse_seed), difficulty (uint8)
+#   event:  step (uint32), kind (uint8), x (int16), y (int16)
+#   end:    an END event followed by the final score (int32)
+
+MAGIC = b'LGA1'
+HEADER = struct.Struct('<4sIB')
+EVENT = struct.Struct('<IBhh')
+SCORE = struct.Struct('<i')
+
+DIFFICULTIES = ["EASY", "MEDIUM", "HARD"]
+
+# Event kinds
+PUNCH = 1         # x, y: click target
+GEAR_SECOND = 2   # x, y: cursor position
+CREW_ABILITY = 3  # x, y: cursor position, used to aim Franky's Radical Beam
+PAUSE = 4         # P pressed; no steps run while paused
+CREW_SELECT = 5   # x: index of the crew member made active
+RESET = 6         # x: difficulty index of the new game
+END = 7
+
+class InputRecorder:
+    def __init__(self, path, seed, difficulty):
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, seed, DIFFICULTIES.index(difficulty)))
+        self.step = 0
+
+    def _write(self, kind, x=0, y=0):
+        self.file.write(EVENT.pack(self.step, kind, int(x), int(y)))
+
+    def record_step(self, inputs):
+        # Call with the inputs of every World.step(), just before it runs
+        if 'punch' in inputs:
+            self._write(PUNCH, *inputs['punch'])
+        if inputs.get('gear_second'):
+            self._write(GEAR_SECOND, *inputs['mouse_pos'])
+        if inputs.get('crew_ability'):
+            self._write(CREW_ABILITY, *inputs['mouse_pos'])
+        self.step += 1
+
+    def record_pause(self):
+        self._write(PAUSE)
+
+    def record_crew_select(self, index):
+        self._write(CREW_SELECT, index)
+
+    def record_reset(self, difficulty):
+        self._write(RESET, DIFFICULTIES.index(difficulty))
+
+    def close(self, score):
+        if self.file.closed:
+            return
+        self._write(END)
+        self.file.write(SCORE.pack(score))
+        self.file.close()
+
+def load_recording(path):
+    # Returns (seed, difficulty, events, steps, final score). steps and score
+    # are None for recordings cut off before their END record.
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    magic, seed, difficulty = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a game recording")
+
+    events = []
+    steps = score = None
+    offset = HEADER.size
+    while offset + EVENT.size <= len(data):
+        step, kind, x, y = EVENT.unpack_from(data, offset)
+        offset += EVENT.size
+        if kind == END:
+            steps = step
+            score = SCORE.unpack_from(data, offset)[0]
+            break
+        events.append((step, kind, x, y))
+
+    if steps is None:
+        steps = events[-1][0] + 1 if events else 0
+    return seed, DIFFICULTIES[difficulty], events, steps, score
+
+def run_replay(path, swarm=False):
+    # Feed a recording back to a headless World and report how it ended
+    seed, difficulty, events, steps, recorded_score = load_recording(path)
+    rng.seed(seed)
+    world = World(difficulty, swarm=swarm)
+
+    next_event = 0
+    start = time.perf_counter()
+    for step in range(steps):
+        inputs = {}
+        while next_event < len(events) and events[next_event][0] == step:
+            _, kind, x, y = events[next_event]
+            next_event += 1
+            if kind == PUNCH:
+                inputs['punch'] = (x, y)
+            elif kind == GEAR_SECOND:
+                inputs['gear_second'] = True
+                inputs['mouse_pos'] = (x, y)
+            elif kind == CREW_ABILITY:
+                inputs['crew_ability'] = True
+                inputs['mouse_pos'] = (x, y)
+            elif kind == CREW_SELECT:
+                world.active_crew_member = world.crew_members[x]
+            elif kind == RESET:
+                world.reset(DIFFICULTIES[x])
+        world.step(inputs)
+    elapsed = time.perf_counter() - start
+
+    print(f"Replayed {steps} steps in {elapsed:.3f}s - "
+          f"{steps / max(elapsed, 1e-9):.0f} steps/s, final score {world.score}")
+    if recorded_score is not None and recorded_score != world.score:
+        print(f"Warning: the recorded session ended with score {recorded_score}")
+    return world
@@ -0,0 +1,23 @@
+import random
+
+# Shared random number streams. Everything that can change how a game plays
+# out draws from `sim`; purely cosmetic randomness (draw-time flicker, island
+# scenery) draws from `fx`. Seeding both makes a run reproducible, and since
+# rendering never touches `sim`, a headless replay of the same inputs follows
+# the same game as the windowed run did.
+sim = random.Random()
+fx = random.Random()
+
+def seed(value):
+    sim.seed(value)
+    fx.seed(value)
+
+def parse_seed(text):
+    # argparse type for --seed. Any integer is accepted and wrapped into the
+    # 32 bits a recording stores (replay.HEADER), before the streams are
+    # seeded with it, so a recorded game replays exactly.
+    return int(text) % 2**32
+
+def new_seed():
+    # A fresh seed for runs that should be reproducible but weren't given one
+    return random.SystemRandom().randrange(2**31)
@@ -0,0 +1,81 @@
+# Uniform-grid spatial hash used as the collision broad phase. Attacks are
+# inserted into every cell their shape overlaps (grown by a margin, normally
+# the size of the largest pirate), so a pirate only has to be tested against
+# the attacks listed in the one cell containing its center. Each cell keeps
+# attacks in insertion order, which preserves "first attack in the list wins"
+# when the exact tests are run in cell order.
+class SpatialHash:
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def _add(self, key, item):
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [item]
+        else:
+            bucket.append(item)
+
+    def insert_rect(self, item, left, top, right, bottom):
+        cell_size = self.cell_size
+        for cx in range(int(left // cell_size), int(right // cell_size) + 1):
+            for cy in range(int(top // cell_size), int(bottom // cell_size) + 1):
+                self._add((cx, cy), item)
+
+    def insert_segment(self, item, x1, y1, x2, y2, reach=0):
+        # Insert into the cells within reach of the segment
+        cell_size = self.cell_size
+        seg_dx = x2 - x1
+        seg_dy = y2 - y1
+        length_squared = max(0.001, seg_dx * seg_dx + seg_dy * seg_dy)
+        cell_reach = reach + cell_size * 0.7072  # Plus half a cell diagonal
+        cell_reach_squared = cell_reach * cell_reach
+
+        for cx in range(int((min(x1, x2) - reach) // cell_size),
+                        int((max(x1, x2) + reach) // cell_size) + 1):
+            center_x = (cx + 0.5) * cell_size
+            for cy in range(int((min(y1, y2) - reach) // cell_size),
+                            int((max(y1, y2) + reach) // cell_size) + 1):
+                # Distance from the cell center to the closest point on the segment
+                center_y = (cy + 0.5) * cell_size
+                t = ((center_x - x1) * seg_dx + (center_y - y1) * seg_dy) / length_squared
+                t = max(0.0, min(1.0, t))
+                offset_x = center_x - (x1 + t * seg_dx)
+                offset_y = center_y - (y1 + t * seg_dy)
+                if offset_x * offset_x + offset_y * offset_y <= cell_reach_squared:
+                    self._add((cx, cy), item)
+
+    def insert_attack(self, attack, margin=0):
+        # Insert an attack exposing get_segment() or get_bounds(). Returns
+        # False when the attack cannot be bounded and was not inserted.
+        get_segment = getattr(attack, 'get_segment', None)
+        segment = get_segment() if get_segment is not None else None
+        if segment is not None:
+            x1, y1, x2, y2, reach = segment
+            self.insert_segment(attack, x1, y1, x2, y2, reach + margin)
+            return True
+
+        get_bounds = getattr(attack, 'get_bounds', None)
+        bounds = get_bounds() if get_bounds is not None else None
+        if bounds is None:
+            return False
+        left, top, right, bottom = bounds
+        self.insert_rect(attack, left - margin, top - margin, right + margin, bottom + margin)
+        return True
+
+    def build(self, attacks, margin=0):
+        # Rebuild the grid from a list of attacks. Returns False if any attack
+        # is unbounded, in which case the grid must not be used.
+        self.clear()
+        for attack in attacks:
+            if not self.insert_attack(attack, margin):
+                return False
+        return True
+
+    def query_point(self, x, y):
+        # Attacks that may touch something centered at (x, y), in insertion order
+        cell_size = self.cell_size
+        return self.cells.get((int(x // cell_size), int(y // cell_size)), ())
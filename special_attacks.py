@@ -1,10 +1,31 @@
 import pygame
 import math
-import random
+
+import canvas
+import particles
+import sprite_atlas
+from constants import WIDTH, HEIGHT
+from rng import sim, fx
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def _distances(xs, ys, x, y):
+    # Distance from every point in (xs, ys) to (x, y)
+    return np.sqrt((xs - x)**2 + (ys - y)**2)
 
 # Special attack classes
 class SpecialAttack:
+    # Pooled attacks (see pools.py) re-initialize through reset(), which
+    # takes the constructor's arguments
+    __slots__ = ('x', 'y', 'active', 'damage')
+    
     def __init__(self, x, y):
+        self.reset(x, y)
+    
+    def reset(self, x, y):
         self.x = x
         self.y = y
         self.active = True
@@ -13,15 +34,45 @@ class SpecialAttack:
     def update(self):
         pass
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         pass
     
+    def get_bounds(self):
+        # Bounding box (left, top, right, bottom) used by the collision broad
+        # phase; None means the attack has to be tested against every pirate
+        return None
+    
+    def get_segment(self):
+        # (x1, y1, x2, y2, reach) for attacks shaped like a thick line
+        return None
+    
     def check_collision(self, pirate):
         return False
+    
+    def check_collision_batch(self, xs, ys, sizes):
+        # Vectorized check_collision for a whole crowd given as NumPy arrays
+        # of positions and sizes. Returns a boolean hit mask and has no side
+        # effects; call apply_hit() for each pirate a hit is applied to.
+        return np.zeros(len(xs), dtype=bool)
+    
+    def apply_hit(self, pirate):
+        # Side effects check_collision has when it reports a hit
+        pass
+    
+    def release_particles(self):
+        # Attacks holding a pooled particle system hand it back here when
+        # they end, are reused or the game is reset; later calls do nothing
+        pass
 
 class SwordSlash(SpecialAttack):
+    __slots__ = ('start_x', 'start_y', 'end_x', 'end_y', 'life', 'width', 'color', 'length', 'dx', 'dy',
+                 'current_length', 'max_length', 'extending', 'extension_speed')
+    
     def __init__(self, start_x, start_y, end_x, end_y):
-        super().__init__(start_x, start_y)
+        self.reset(start_x, start_y, end_x, end_y)
+    
+    def reset(self, start_x, start_y, end_x, end_y):
+        super().reset(start_x, start_y)
         self.start_x = start_x
         self.start_y = start_y
         self.end_x = end_x
@@ -65,22 +116,27 @@ class SwordSlash(SpecialAttack):
             if self.current_length <= 0:
                 self.active = False
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         end_x = self.start_x + self.dx * self.current_length
         end_y = self.start_y + self.dy * self.current_length
         
         # Draw slash line
-        pygame.draw.line(surface, self.color, (self.start_x, self.start_y), 
-                         (end_x, end_y), self.width)
+        canvas.line(surface, scale, self.color, (self.start_x, self.start_y), 
+                    (end_x, end_y), self.width)
         
         # Draw slash effect
         for _ in range(5):
-            offset = random.randint(5, 15)
-            offset_x = random.uniform(-offset, offset)
-            offset_y = random.uniform(-offset, offset)
-            pygame.draw.line(surface, (255, 255, 255), 
-                            (self.start_x + offset_x, self.start_y + offset_y), 
-                            (end_x + offset_x, end_y + offset_y), 2)
+            offset = fx.randint(5, 15)
+            offset_x = fx.uniform(-offset, offset)
+            offset_y = fx.uniform(-offset, offset)
+            canvas.line(surface, scale, (255, 255, 255), 
+                       (self.start_x + offset_x, self.start_y + offset_y), 
+                       (end_x + offset_x, end_y + offset_y), 2)
+    
+    def get_segment(self):
+        return (self.start_x, self.start_y,
+                self.start_x + self.dx * self.current_length,
+                self.start_y + self.dy * self.current_length, self.width)
     
     def check_collision(self, pirate):
         # Vector from start to end of slash
@@ -119,20 +175,47 @@ class SwordSlash(SpecialAttack):
         distance = math.sqrt((pirate.x - closest_x)**2 + (pirate.y - closest_y)**2)
         
         return distance < pirate.size + self.width
+    
+    def check_collision_batch(self, xs, ys, sizes):
+        slash_dx = self.dx * self.current_length
+        slash_dy = self.dy * self.current_length
+        pirate_dx = xs - self.start_x
+        pirate_dy = ys - self.start_y
+        dot_product = pirate_dx * slash_dx + pirate_dy * slash_dy
+        slash_length_squared = slash_dx**2 + slash_dy**2
+        
+        # Pirates behind the start point or beyond the end point are tested
+        # against that point, the rest against the slash line
+        behind = _distances(xs, ys, self.start_x, self.start_y) < sizes
+        beyond = _distances(xs, ys, self.start_x + slash_dx, self.start_y + slash_dy) < sizes
+        
+        projection = dot_product / max(0.001, slash_length_squared)
+        closest_x = self.start_x + projection * slash_dx
+        closest_y = self.start_y + projection * slash_dy
+        alongside = np.sqrt((xs - closest_x)**2 + (ys - closest_y)**2) < sizes + self.width
+        
+        return np.where(dot_product < 0, behind,
+                        np.where(dot_product > slash_length_squared, beyond, alongside))
 
 class ThunderAttack(SpecialAttack):
+    __slots__ = ('life', 'radius', 'segments')
+    
     def __init__(self, x, y):
-        super().__init__(x, y)
+        self.segments = []
+        self.reset(x, y)
+    
+    def reset(self, x, y):
+        super().reset(x, y)
         self.life = 30
         self.radius = 30
         self.damage = 3
-        self.segments = []
+        self.segments.clear()
         
         # Create lightning segments
         prev_x, prev_y = x, 0  # Start from top of screen
         while prev_y < y:
-            next_y = prev_y + random.randint(10, 30)
-            next_x = prev_x + random.randint(-15, 15)
+            next_y = prev_y + sim.randint(10, 30)
+            next_x = prev_x + sim.randint(-15, 15)
             self.segments.append((prev_x, prev_y, next_x, next_y))
             prev_x, prev_y = next_x, next_y
     
@@ -141,24 +224,37 @@ class ThunderAttack(SpecialAttack):
         if self.life <= 0:
             self.active = False
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw lightning bolt
         for i, (x1, y1, x2, y2) in enumerate(self.segments):
             color = (255, 255, 100) if i % 2 == 0 else (200, 200, 255)
-            pygame.draw.line(surface, color, (x1, y1), (x2, y2), 3)
+            canvas.line(surface, scale, color, (x1, y1), (x2, y2), 3)
         
         # Draw impact circle
         if self.life > 20:
             radius = (30 - self.life) * 2
-            pygame.draw.circle(surface, (255, 255, 200, 100), (self.x, self.y), radius)
+            canvas.circle(surface, scale, (255, 255, 200, 100), (self.x, self.y), radius)
+    
+    def get_bounds(self):
+        return (self.x - self.radius, self.y - self.radius,
+                self.x + self.radius, self.y + self.radius)
     
     def check_collision(self, pirate):
         distance = math.sqrt((pirate.x - self.x)**2 + (pirate.y - self.y)**2)
         return distance < pirate.size + self.radius
+    
+    def check_collision_batch(self, xs, ys, sizes):
+        return _distances(xs, ys, self.x, self.y) < sizes + self.radius
 
 class FireStar(SpecialAttack):
+    __slots__ = ('start_x', 'start_y', 'current_x', 'current_y', 'speed', 'radius', 'dx', 'dy', 'particles')
+    
     def __init__(self, start_x, start_y, end_x, end_y):
-        super().__init__(start_x, start_y)
+        self.particles = None
+        self.reset(start_x, start_y, end_x, end_y)
+    
+    def reset(self, start_x, start_y, end_x, end_y):
+        super().reset(start_x, start_y)
         self.start_x = start_x
         self.start_y = start_y
         self.current_x = start_x
@@ -166,7 +262,10 @@ class FireStar(SpecialAttack):
         self.speed = 10
         self.radius = 8
         self.damage = 1
-        self.particles = []
+        
+        # Fire trail: one particle a frame, living at most 15 frames
+        self.release_particles()
+        self.particles = particles.acquire(16)
         
         # Calculate direction
         dx = end_x - start_x
@@ -187,47 +286,60 @@ class FireStar(SpecialAttack):
         self.current_y += self.dy
         
         # Add fire particles
-        self.particles.append({
-            'x': self.current_x,
-            'y': self.current_y,
-            'size': random.randint(3, 6),
-            'life': random.randint(5, 15)
-        })
+        self.particles.emit(x=self.current_x, y=self.current_y,
+                            size=sim.randint(3, 6), life=sim.randint(5, 15))
         
         # Update particles
-        for particle in self.particles[:]:
-            particle['life'] -= 1
-            if particle['life'] <= 0:
-                self.particles.remove(particle)
+        self.particles.age()
         
         # Check if out of bounds
-        if (self.current_x < 0 or self.current_x > 800 or 
-            self.current_y < 0 or self.current_y > 600):
+        if (self.current_x < 0 or self.current_x > WIDTH or 
+            self.current_y < 0 or self.current_y > HEIGHT):
             self.active = False
+        
+        # A star that hit a pirate stopped on the last collision pass; either
+        # way it is removed after this update
+        if not self.active:
+            self.release_particles()
+    
+    def release_particles(self):
+        if self.particles is not None:
+            particles.release(self.particles)
+            self.particles = None
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw fire particles
-        for particle in self.particles:
-            size = particle['size']
-            alpha = min(255, particle['life'] * 20)
-            color = (255, min(255, 100 + particle['life'] * 10), 0, alpha)
+        for x, y, size, life in zip(*self.particles.snapshot('x', 'y', 'size', 'life')):
+            size = int(size)
+            life = int(life)
+            alpha = min(255, life * 20)
+            color = (255, min(255, 100 + life * 10), 0, alpha)
             
-            # Create a surface for the particle with alpha
-            particle_surface = pygame.Surface((size*2, size*2), pygame.SRCALPHA)
-            pygame.draw.circle(particle_surface, color, (size, size), size)
-            surface.blit(particle_surface, (particle['x'] - size, particle['y'] - size))
+            canvas.blit(surface, scale, sprite_atlas.circle(color, size), (x - size, y - size))
         
         # Draw main projectile
-        pygame.draw.circle(surface, (255, 200, 0), (int(self.current_x), int(self.current_y)), self.radius)
+        canvas.circle(surface, scale, (255, 200, 0), (int(self.current_x), int(self.current_y)), self.radius)
+    
+    def get_bounds(self):
+        return (self.current_x - self.radius, self.current_y - self.radius,
+                self.current_x + self.radius, self.current_y + self.radius)
     
     def check_collision(self, pirate):
         distance = math.sqrt((pirate.x - self.current_x)**2 + (pirate.y - self.current_y)**2)
         if distance < pirate.size + self.radius:
-            self.active = False
+            self.apply_hit(pirate)
             return True
         return False
+    
+    def check_collision_batch(self, xs, ys, sizes):
+        return _distances(xs, ys, self.current_x, self.current_y) < sizes + self.radius
+    
+    def apply_hit(self, pirate):
+        self.active = False
 
 class DiableJambe(SpecialAttack):
+    __slots__ = ('radius', 'max_radius', 'expansion_speed', 'color')
+    
     def __init__(self, x, y):
         super().__init__(x, y)
         self.radius = 0
@@ -241,28 +353,37 @@ class DiableJambe(SpecialAttack):
         if self.radius >= self.max_radius:
             self.active = False
     
-    def draw(self, surface):
-        # Create a surface with alpha for transparency
-        s = pygame.Surface((self.radius*2, self.radius*2), pygame.SRCALPHA)
-        pygame.draw.circle(s, self.color, (self.radius, self.radius), self.radius)
-        surface.blit(s, (self.x - self.radius, self.y - self.radius))
+    def draw(self, surface, scale=1.0):
+        # Translucent blast from the sprite atlas
+        canvas.blit(surface, scale, sprite_atlas.circle(self.color, self.radius), 
+                   (self.x - self.radius, self.y - self.radius))
         
         # Draw fire effects
         for _ in range(10):
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.uniform(0.7, 1.0) * self.radius
-            size = random.randint(5, 15)
+            angle = fx.uniform(0, 2 * math.pi)
+            distance = fx.uniform(0.7, 1.0) * self.radius
+            size = fx.randint(5, 15)
             
             flame_x = self.x + math.cos(angle) * distance
             flame_y = self.y + math.sin(angle) * distance
             
-            pygame.draw.circle(surface, (255, 200, 0), (int(flame_x), int(flame_y)), size)
+            canvas.circle(surface, scale, (255, 200, 0), (int(flame_x), int(flame_y)), size)
+    
+    def get_bounds(self):
+        return (self.x - self.radius, self.y - self.radius,
+                self.x + self.radius, self.y + self.radius)
     
     def check_collision(self, pirate):
         distance = math.sqrt((pirate.x - self.x)**2 + (pirate.y - self.y)**2)
         return distance < pirate.size + self.radius
+    
+    def check_collision_batch(self, xs, ys, sizes):
+        return _distances(xs, ys, self.x, self.y) < sizes + self.radius
 
 class RadicalBeam(SpecialAttack):
+    __slots__ = ('start_x', 'start_y', 'end_x', 'end_y', 'width', 'max_width', 'life', 'dx', 'dy',
+                 'beam_end_x', 'beam_end_y')
+    
     def __init__(self, start_x, start_y, end_x, end_y):
         super().__init__(start_x, start_y)
         self.start_x = start_x
@@ -302,23 +423,26 @@ class RadicalBeam(SpecialAttack):
         if self.life <= 0:
             self.active = False
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw beam
-        pygame.draw.line(surface, (0, 200, 255), 
-                        (self.start_x, self.start_y), 
-                        (self.beam_end_x, self.beam_end_y), 
-                        self.width)
+        canvas.line(surface, scale, (0, 200, 255), 
+                   (self.start_x, self.start_y), 
+                   (self.beam_end_x, self.beam_end_y), 
+                   self.width)
         
         # Draw core of beam
-        pygame.draw.line(surface, (255, 255, 255), 
-                        (self.start_x, self.start_y), 
-                        (self.beam_end_x, self.beam_end_y), 
-                        self.width // 3)
+        canvas.line(surface, scale, (255, 255, 255), 
+                   (self.start_x, self.start_y), 
+                   (self.beam_end_x, self.beam_end_y), 
+                   self.width // 3)
         
         # Draw impact point
-        pygame.draw.circle(surface, (0, 200, 255), 
-                          (self.start_x, self.start_y), 
-                          self.width // 2)
+        canvas.circle(surface, scale, (0, 200, 255), 
+                     (self.start_x, self.start_y), 
+                     self.width // 2)
+    
+    def get_segment(self):
+        return (self.start_x, self.start_y, self.beam_end_x, self.beam_end_y, self.width / 2)
     
     def check_collision(self, pirate):
         # Vector from start to end of beam
@@ -348,8 +472,24 @@ class RadicalBeam(SpecialAttack):
         distance = math.sqrt((pirate.x - closest_x)**2 + (pirate.y - closest_y)**2)
         
         return distance < pirate.size + self.width/2
+    
+    def check_collision_batch(self, xs, ys, sizes):
+        pirate_dx = xs - self.start_x
+        pirate_dy = ys - self.start_y
+        dot_product = pirate_dx * self.dx + pirate_dy * self.dy
+        
+        beam_length_squared = self.dx**2 + self.dy**2
+        projection = dot_product / max(0.001, beam_length_squared)
+        closest_x = self.start_x + projection * self.dx
+        closest_y = self.start_y + projection * self.dy
+        distance = np.sqrt((xs - closest_x)**2 + (ys - closest_y)**2)
+        
+        # Pirates behind the start point are never hit
+        return (dot_product >= 0) & (distance < sizes + self.width/2)
 
 class WaterWave(SpecialAttack):
+    __slots__ = ('radius', 'max_radius', 'expansion_speed', 'push_strength')
+    
     def __init__(self, x, y):
         super().__init__(x, y)
         self.radius = 0
@@ -363,30 +503,38 @@ class WaterWave(SpecialAttack):
         if self.radius >= self.max_radius:
             self.active = False
     
-    def draw(self, surface):
+    def draw(self, surface, scale=1.0):
         # Draw wave circles
         for r in range(int(self.radius), 0, -20):
             alpha = max(0, 150 - r * 150 // self.max_radius)
             color = (0, 100, 255, alpha)
             
-            # Create a surface with alpha for transparency
-            s = pygame.Surface((r*2, r*2), pygame.SRCALPHA)
-            pygame.draw.circle(s, color, (r, r), r, 10)
-            surface.blit(s, (self.x - r, self.y - r))
+            canvas.blit(surface, scale, sprite_atlas.circle(color, r, 10), (self.x - r, self.y - r))
+    
+    def get_bounds(self):
+        return (self.x - self.radius, self.y - self.radius,
+                self.x + self.radius, self.y + self.radius)
     
     def check_collision(self, pirate):
         distance = math.sqrt((pirate.x - self.x)**2 + (pirate.y - self.y)**2)
         
         # If pirate is within the wave radius
         if self.radius - 20 < distance < self.radius:
-            # Calculate push direction (away from center)
-            if distance > 0:
-                push_dx = (pirate.x - self.x) / distance * self.push_strength
-                push_dy = (pirate.y - self.y) / distance * self.push_strength
-                
-                # Apply push effect
-                pirate.x += push_dx
-                pirate.y += push_dy
-            
+            self.apply_hit(pirate)
             return True
         return False
+    
+    def check_collision_batch(self, xs, ys, sizes):
+        distance = _distances(xs, ys, self.x, self.y)
+        return (self.radius - 20 < distance) & (distance < self.radius)
+    
+    def apply_hit(self, pirate):
+        # Calculate push direction (away from center)
+        distance = math.sqrt((pirate.x - self.x)**2 + (pirate.y - self.y)**2)
+        if distance > 0:
+            push_dx = (pirate.x - self.x) / distance * self.push_strength
+            push_dy = (pirate.y - self.y) / distance * self.push_strength
+            
+            # Apply push effect
+            pirate.x += push_dx
+            pirate.y += push_dy
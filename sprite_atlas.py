@@ -0,0 +1,46 @@
+import pygame
+from collections import OrderedDict
+
+# Pre-rendered translucent circles and rings. Effects that used to build a
+# fresh SRCALPHA surface for every circle every frame blit from here instead.
+# Sprites are keyed by color, radius and ring width, with alpha quantized to
+# ALPHA_STEP so fading effects reuse a small set of sprites; the least
+# recently used sprites are dropped once MAX_SPRITES is reached.
+ALPHA_STEP = 8
+MAX_SPRITES = 512
+
+enabled = True  # False renders every sprite from scratch, as before the atlas
+_sprites = OrderedDict()
+stats = {'allocations': 0, 'hits': 0, 'evictions': 0}
+
+def quantize_alpha(alpha):
+    return min(255, int(alpha + ALPHA_STEP // 2) // ALPHA_STEP * ALPHA_STEP)
+
+def circle(color, radius, width=0):
+    # A (2*radius)-pixel square sprite with the circle centered in it.
+    # width > 0 draws a ring of that thickness, like pygame.draw.circle.
+    radius = int(radius)
+    r, g, b, alpha = color
+    key = (r, g, b, quantize_alpha(alpha), radius, width)
+    sprite = _sprites.get(key) if enabled else None
+    if sprite is not None:
+        _sprites.move_to_end(key)
+        stats['hits'] += 1
+        return sprite
+
+    stats['allocations'] += 1
+    sprite = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, key[:4], (radius, radius), radius, width)
+    if not enabled:
+        return sprite
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()
+
+    _sprites[key] = sprite
+    if len(_sprites) > MAX_SPRITES:
+        _sprites.popitem(last=False)
+        stats['evictions'] += 1
+    return sprite
+
+def clear():
+    _sprites.clear()